@@ -6,6 +6,7 @@ Follow the guide here: https://help.sumologic.com/Manage/Security/Access-Keys#ma
 """
 
 import requests
+import requests.adapters
 
 # Encode the credentials
 import base64
@@ -20,14 +21,2625 @@ import pprint
 import json
 import jsonschema
 
+# Compiled schema validation is optional, and is only used when fastjsonschema is installed.
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
 
-class SumoClient:
+# Running the asyncio client
+import asyncio
+import inspect
+
+# Pacing requests across threads and tasks
+import collections
+import threading
+import time
+
+# Retrying failed requests
+import email.utils
+import random
+import re
+
+# Caching resolved endpoints on disk
+import os
+import tempfile
+
+# Fetching pages in the background
+import concurrent.futures
+
+# Running batches of calls
+import itertools
+
+# Mirroring listings locally
+import sqlite3
+
+# Parsing large responses as they arrive
+import codecs
+
+# Downloading responses to disk
+import hashlib
+import zlib
+import bz2
+import lzma
+
+# The asyncio client is optional, and is only available when aiohttp is installed.
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+# # # ==================================================
+# # #
+# # # RATE LIMITING
+# # # https://help.sumologic.com/APIs/General-API-Information#rate-limiting
+# # #
+# # # Sumo Logic throttles each access key to a few requests per second and a small number of concurrent requests.
+# # # Requests beyond that are rejected with 429, so the client paces itself rather than relying on the API to do so.
+
+class SumoRateLimiter:
+    """Token bucket plus concurrency cap for the requests made with one access key.
+
+    A single limiter can be shared by any number of clients, threads and asyncio tasks. Requests are spaced evenly at
+    the configured rate, so bursts are smoothed out rather than sent at once and then throttled by the API.
+    """
+    __shared        = {}
+    __shared_lock   = threading.Lock()
+
+    def __init__(self, requests_per_second = 4, burst = 1, max_concurrent = 10):
+        """
+        Args:
+            requests_per_second: float, the sustained number of requests allowed each second.
+            burst: int, how many requests may be sent back to back after a quiet period.
+            max_concurrent: int, the maximum number of requests in flight at once, or None for no limit.
+        """
+        if requests_per_second <= 0:
+            raise ValueError('SumoRateLimiter: requests_per_second must be greater than 0.')
+        if burst < 1:
+            raise ValueError('SumoRateLimiter: burst must be at least 1.')
+
+        self.__interval         = 1.0 / requests_per_second
+        self.__tolerance        = (burst - 1) * self.__interval
+        self.__max_concurrent   = max_concurrent
+        self.__lock             = threading.Lock()
+        self.__next_start       = 0.0
+        self.__in_flight        = 0
+        self.__waiters          = collections.deque()
+
+    @classmethod
+    def shared(cls, access_id):
+        """Get the limiter shared by every client in this process using the given access ID."""
+        with cls.__shared_lock:
+            if access_id not in cls.__shared:
+                cls.__shared[access_id] = cls()
+            return cls.__shared[access_id]
+
+    @classmethod
+    def configure(cls, access_id, requests_per_second = 4, burst = 1, max_concurrent = 10):
+        """Replace the shared limiter for the given access ID with one using different limits.
+
+        Clients created afterwards with that access ID use the new limiter.
+        """
+        limiter = cls(requests_per_second, burst, max_concurrent)
+        with cls.__shared_lock:
+            cls.__shared[access_id] = limiter
+        return limiter
+
+    @property
+    def in_flight(self):
+        return self.__in_flight
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent. Every acquire must be paired with a release."""
+        slot_ready = threading.Event()
+        if not self.__take_slot(slot_ready.set):
+            slot_ready.wait()
+        time.sleep(self.__reserve_start())
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent."""
+        loop        = asyncio.get_running_loop()
+        slot_ready  = loop.create_future()
+
+        def hand_over():
+            # Runs on the event loop; a waiter that gave up passes the slot straight on.
+            if slot_ready.cancelled():
+                self.release()
+            else:
+                slot_ready.set_result(None)
+
+        if not self.__take_slot(lambda: loop.call_soon_threadsafe(hand_over)):
+            try:
+                await slot_ready
+            except asyncio.CancelledError:
+                if slot_ready.done() and not slot_ready.cancelled():
+                    self.release()
+                raise
+        try:
+            await asyncio.sleep(self.__reserve_start())
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    def release(self):
+        """Return a concurrency slot, handing it to the longest waiting request if there is one."""
+        with self.__lock:
+            while self.__waiters:
+                wake = self.__waiters.popleft()
+                try:
+                    wake()
+                    return
+                except RuntimeError:
+                    # The waiter's event loop has already been closed.
+                    continue
+            self.__in_flight -= 1
+
+    def __take_slot(self, wake):
+        # Either take a free concurrency slot now, or queue up to be woken when one is released.
+        with self.__lock:
+            if self.__max_concurrent is None or (self.__in_flight < self.__max_concurrent and not self.__waiters):
+                self.__in_flight += 1
+                return True
+            self.__waiters.append(wake)
+            return False
+
+    def __reserve_start(self):
+        # Reserve the next send time and return how long to wait for it. Reservations are handed out in order and
+        # spaced one interval apart, with up to burst of them allowed to fall due immediately.
+        with self.__lock:
+            now                 = time.monotonic()
+            start               = max(now, self.__next_start - self.__tolerance)
+            self.__next_start   = max(now, self.__next_start) + self.__interval
+            return start - now
+
+
+def _release_when_read(response, release):
+    """Call release once a streamed requests.Response is closed, or once its body has been read to the end, so that
+    the limiter slots it holds cover the whole transfer rather than only the wait for its headers."""
+    raw             = response.raw
+    release_conn    = raw.release_conn
+    released        = []
+    lock            = threading.Lock()
+
+    # urllib3 hands the connection back in both cases, and requests.Response.close always does so too.
+    def release_once():
+        try:
+            release_conn()
+        finally:
+            with lock:
+                first = not released
+                released.append(True)
+            if first:
+                release()
+
+    raw.release_conn = release_once
+
+
+class _AttemptSlots:
+    """The limiter slots held by one attempt of a hedged request. Once the other attempt has won, the losing one is
+    abandoned: its slots are returned straight away, and it is not sent at all if it has not been yet."""
+    def __init__(self):
+        self.__held         = []
+        self.__abandoned    = False
+        self.__lock         = threading.Lock()
+
+    @property
+    def abandoned(self):
+        with self.__lock:
+            return self.__abandoned
+
+    def acquire(self, limiter):
+        limiter.acquire()
+        with self.__lock:
+            if not self.__abandoned:
+                self.__held.append(limiter)
+                return
+        limiter.release()
+
+    def release(self):
+        with self.__lock:
+            held, self.__held = self.__held, []
+        for limiter in held:
+            limiter.release()
+
+    def abandon(self):
+        with self.__lock:
+            self.__abandoned = True
+        self.release()
+
+
+
+# # # ==================================================
+# # #
+# # # RETRIES
+# # #
+# # # Throttled (429) and temporarily unavailable (5xx) responses are retried by the client itself. Each API family
+# # # (the first path segment after the API version, such as "collectors" or "content") can have its own policy.
+
+def _api_family(request_url):
+    """Get the API family of a request URL, ie - 'collectors' for https://api.sumologic.com/api/v1/collectors/123."""
+    segments = urllib.parse.urlparse(request_url).path.split('/')
+    for index, segment in enumerate(segments[:-1]):
+        if re.fullmatch(r'v[0-9]+', segment):
+            return segments[index + 1]
+    return None
+
+
+class SumoRetryPolicy:
+    """Decides which failed requests are retried, and how long to wait before each retry.
+
+    Waits follow decorrelated jitter, so that many clients throttled at the same moment do not all retry together. A
+    Retry-After header sent by the API is always honoured as the minimum wait.
+    """
+    def __init__(self, max_retries = 3, base_delay = 0.5, max_delay = 30.0, retry_statuses = (429, 500, 502, 503, 504), retry_methods = ('GET', 'HEAD', 'PUT', 'DELETE')):
+        """
+        Args:
+            max_retries: int, the maximum number of times a single request is retried.
+            base_delay: float, the shortest wait in seconds before a retry.
+            max_delay: float, the longest wait in seconds chosen by the jitter, unless Retry-After asks for longer.
+            retry_statuses: iterable, the HTTP status codes that are retried.
+            retry_methods: iterable, the request types that are retried. Defaults to the idempotent ones only.
+        """
+        self.max_retries    = max_retries
+        self.base_delay     = base_delay
+        self.max_delay      = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods  = frozenset(retry_methods)
+
+    def should_retry(self, request_type, attempt, status_code = None):
+        """Whether to retry a request.
+
+        Args:
+            request_type: string, what type of request was made (ie - GET, POST, DELETE).
+            attempt: int, how many times the request has already been retried.
+            status_code: int, the status of the response, or None if no response was received at all.
+        """
+        if attempt >= self.max_retries or request_type not in self.retry_methods:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def next_delay(self, previous_delay, response_headers = None):
+        """Get the number of seconds to wait before the next retry.
+
+        Args:
+            previous_delay: float, the wait before the previous retry, or 0 before the first retry.
+            response_headers: dict, the headers of the failed response, if there was one.
+        """
+        delay = min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous_delay * 3)))
+        retry_after = _parse_retry_after(response_headers)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _parse_retry_after(response_headers):
+    """Get the number of seconds a Retry-After header asks for, or None when there is no usable header."""
+    # Retry-After is either a number of seconds or an HTTP date.
+    if not response_headers or response_headers.get('Retry-After') is None:
+        return None
+    value = response_headers['Retry-After'].strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+
+# # # ==================================================
+# # #
+# # # CREDENTIAL POOLS
+# # #
+# # # A client can spread its requests over several access keys of the same account. Every key keeps its own rate
+# # # limiter, each request is sent with the key that has the fewest requests in flight, and a key that is rejected
+# # # (401) or throttled (429) is left out of the rotation for a while.
+
+def _basic_auth_header(access_id, access_key):
+    """Get the value of the Authorization header for an access key."""
+    return 'Basic {0}'.format(
+        base64.b64encode(
+            bytes(
+                '{0}:{1}'.format(
+                    access_id,
+                    access_key
+                ),
+                'utf-8'
+            )
+        ).decode('utf-8')
+    )
+
+
+class _PooledCredential:
+    """One access key of a SumoCredentialPool, with its limiter and load."""
     def __init__(self, access_id, access_key):
-        self.__access_id    = access_id
-        self.__access_key   = access_key
-        self.__endpoint     = self.__get_geo_endpoint()
+        self.access_id          = access_id
+        self.auth_header        = _basic_auth_header(access_id, access_key)
+        self.limiter            = SumoRateLimiter.shared(access_id)
+        self.in_flight          = 0
+        self.requests           = 0
+        self.quarantined_until  = 0.0
+        self.quarantines        = 0
+
+
+class SumoCredentialPool:
+    """Schedules requests across several access keys of one account.
+
+    Each request is given the key with the fewest requests in flight, ties going to the key used least overall, and is
+    paced by that key's shared SumoRateLimiter, so the keys' limits add up. A key answered with 401 Unauthorized or 429
+    Too Many Requests is quarantined: no new requests are given to it until the quarantine ends, unless every key is
+    quarantined, in which case the key released soonest is used. A request answered with 401 is sent again straight
+    away with another key, as long as one is out of quarantine.
+    """
+    def __init__(self, credentials, unauthorized_quarantine = 300.0, throttled_quarantine = 10.0):
+        """
+        Args:
+            credentials: iterable, (access_id, access_key) pairs. The first key is also used to resolve the endpoint.
+            unauthorized_quarantine: float, the number of seconds a key answered with 401 is left out.
+            throttled_quarantine: float, the number of seconds a key answered with 429 is left out, unless the
+                response's Retry-After header asks for longer.
+        """
+        self.__credentials = [_PooledCredential(access_id, access_key) for access_id, access_key in credentials]
+        if not self.__credentials:
+            raise ValueError('SumoCredentialPool: at least one credential is required.')
+        if len({credential.access_id for credential in self.__credentials}) != len(self.__credentials):
+            raise ValueError('SumoCredentialPool: access IDs must be unique.')
+
+        self.__unauthorized_quarantine  = unauthorized_quarantine
+        self.__throttled_quarantine     = throttled_quarantine
+        self.__lock                     = threading.Lock()
+
+    @property
+    def primary(self):
+        """The first credential of the pool, whose access_id and auth_header are used to resolve the endpoint."""
+        return self.__credentials[0]
+
+    @property
+    def available(self):
+        """Whether any key is out of quarantine."""
+        now = time.monotonic()
+        with self.__lock:
+            return any(credential.quarantined_until <= now for credential in self.__credentials)
+
+    @property
+    def stats(self):
+        """The load of every key, keyed by access ID: requests in flight, requests sent, times quarantined, and the
+        seconds of quarantine left."""
+        now = time.monotonic()
+        with self.__lock:
+            return {
+                credential.access_id: {
+                    'in_flight':        credential.in_flight,
+                    'requests':         credential.requests,
+                    'quarantines':      credential.quarantines,
+                    'quarantined_for':  max(0.0, credential.quarantined_until - now)
+                }
+                for credential in self.__credentials
+            }
+
+    def acquire(self):
+        """Choose the key for the next request. Every acquire must be paired with a release of the same credential."""
+        now = time.monotonic()
+        with self.__lock:
+            available = [credential for credential in self.__credentials if credential.quarantined_until <= now]
+            if available:
+                credential = min(available, key = lambda credential: (credential.in_flight, credential.requests))
+            else:
+                credential = min(self.__credentials, key = lambda credential: credential.quarantined_until)
+            credential.in_flight += 1
+            credential.requests  += 1
+            return credential
+
+    def release(self, credential, status_code = None, response_headers = None):
+        """Return a key once its request has finished, quarantining it if the API rejected or throttled it.
+
+        Args:
+            credential: the credential returned by acquire.
+            status_code: int, the status of the response, or None if no response was received.
+            response_headers: dict, the headers of the response, if there was one.
+        """
+        if status_code == 401:
+            quarantine = self.__unauthorized_quarantine
+        elif status_code == 429:
+            quarantine = max(self.__throttled_quarantine, _parse_retry_after(response_headers) or 0.0)
+        else:
+            quarantine = None
+
+        with self.__lock:
+            credential.in_flight -= 1
+            if quarantine:
+                now = time.monotonic()
+                if credential.quarantined_until <= now:
+                    credential.quarantines += 1
+                credential.quarantined_until = max(credential.quarantined_until, now + quarantine)
+
+
+
+# # # ==================================================
+# # #
+# # # HEDGING
+# # #
+# # # A GET that has not been answered within the usual latency of its API family is sent a second time, and whichever
+# # # response arrives first is used. The usual latency is a percentile of the family's recent responses, and only a
+# # # small share of requests may be hedged, so that duplicates never add up to more than the API allows.
+
+class SumoHedgingPolicy:
+    """Decides when a slow request is sent again, from the latencies of recent requests to the same API family.
+
+    A single policy can be shared by several clients. Hedged requests go through the client's rate limiters like any
+    other, and no more than budget of all requests are hedged. GETs that start an asynchronous job are never hedged,
+    as sending one twice would start the job twice.
+    """
+    # The paths of GETs that start a job on the server rather than only reading.
+    JOB_START_PATHS = frozenset([
+        ('v2', 'content', 'folders', 'global'),
+        ('v2', 'content', 'folders', 'adminRecommended')
+    ])
+
+    def __init__(self, percentile = 95, min_delay = 0.05, max_delay = 5.0, budget = 0.05, min_samples = 20, window = 500, families = None):
+        """
+        Args:
+            percentile: float, the percentile of recent latencies a request is given before it is hedged.
+            min_delay: float, the shortest wait in seconds before hedging, however fast recent requests were.
+            max_delay: float, the longest wait in seconds before hedging, however slow recent requests were.
+            budget: float, the largest share of requests that may be hedged (ie - 0.05 for one in twenty).
+            min_samples: int, how many latencies an API family needs before its requests are hedged.
+            window: int, how many of the most recent latencies are kept for each API family.
+            families: iterable, the API families whose GETs are hedged (ie - 'collectors', 'content'), or None for
+                all of them. GETs in JOB_START_PATHS are never hedged.
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError('SumoHedgingPolicy: percentile must be greater than 0 and at most 100.')
+        if not 0 <= budget <= 1:
+            raise ValueError('SumoHedgingPolicy: budget must be between 0 and 1.')
+
+        self.__percentile   = percentile
+        self.__min_delay    = min_delay
+        self.__max_delay    = max_delay
+        self.__budget       = budget
+        self.__min_samples  = max(1, min_samples)
+        self.__window       = window
+        self.__families     = None if families is None else frozenset(families)
+        self.__latencies    = {}
+        self.__stats        = collections.Counter()
+        self.__lock         = threading.Lock()
+
+    @property
+    def stats(self):
+        """The number of requests considered for hedging, how many of them were hedged, and how many of those were
+        answered first by the hedge."""
+        with self.__lock:
+            stats = collections.Counter(requests = 0, hedged = 0, hedges_won = 0)
+            stats.update(self.__stats)
+        return dict(stats)
+
+    def applies(self, request_type, request_url):
+        """Whether requests of this type to this URL may be hedged. Only GETs that do not start a job are, as they are
+        safe to send twice."""
+        if request_type != 'GET' or _api_path(request_url) in self.JOB_START_PATHS:
+            return False
+        return self.__families is None or _api_family(request_url) in self.__families
+
+    def hedge_delay(self, request_url):
+        """Count a new request, and get the seconds to wait for it before hedging, or None if it is not hedged."""
+        with self.__lock:
+            self.__stats['requests'] += 1
+            latencies = self.__latencies.get(_api_family(request_url))
+            if latencies is None or len(latencies) < self.__min_samples:
+                return None
+            ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.__percentile / 100.0))
+        return min(self.__max_delay, max(self.__min_delay, ordered[index]))
+
+    def try_hedge(self):
+        """Take a hedge from the budget, returning False when the budget is spent."""
+        with self.__lock:
+            if self.__stats['hedged'] + 1 > self.__budget * self.__stats['requests']:
+                return False
+            self.__stats['hedged'] += 1
+            return True
+
+    def record(self, request_url, latency):
+        """Record how long the first attempt of a request took to be answered, whether or not it was hedged."""
+        with self.__lock:
+            family = _api_family(request_url)
+            if family not in self.__latencies:
+                self.__latencies[family] = collections.deque(maxlen = self.__window)
+            self.__latencies[family].append(latency)
+
+    def count_hedge_won(self):
+        """Record that a hedge was answered before the attempt it duplicated."""
+        with self.__lock:
+            self.__stats['hedges_won'] += 1
+
+
+
+# # # ==================================================
+# # #
+# # # CIRCUIT BREAKING
+# # #
+# # # When an API family keeps failing, its requests fail straight away for a while instead of tying up threads in
+# # # slow errors, so that the other families keep their throughput. After reset_timeout a few probe requests are let
+# # # through, and the family is used normally again as soon as they succeed.
+
+class SumoCircuitOpen(Exception):
+    """Raised instead of sending a request to an API family whose circuit is open."""
+    def __init__(self, message, family, retry_in):
+        super().__init__(message)
+        self.family     = family
+        self.retry_in   = retry_in
+
+
+class _Circuit:
+    """The state of the circuit of one API family."""
+    def __init__(self):
+        self.state      = SumoCircuitBreaker.CLOSED
+        self.failures   = 0
+        self.opened_at  = 0.0
+        self.probes     = 0
+        self.successes  = 0
+        self.generation = 0
+
+
+class SumoCircuitBreaker:
+    """Keeps a circuit for every API family, failing requests fast while their family is failing.
+
+    A circuit is closed while requests flow normally, and opens after failure_threshold consecutive failures. While
+    open, requests raise SumoCircuitOpen without being sent. Once reset_timeout has passed the circuit is half-open:
+    up to half_open_probes requests are sent to test the family, closing the circuit if they all succeed and opening it
+    again as soon as one fails. A single breaker can be shared by several clients.
+    """
+    CLOSED      = 'closed'
+    OPEN        = 'open'
+    HALF_OPEN   = 'half-open'
+
+    def __init__(self, failure_threshold = 5, reset_timeout = 30.0, half_open_probes = 1, failure_statuses = (500, 502, 503, 504)):
+        """
+        Args:
+            failure_threshold: int, the number of consecutive failures that opens a family's circuit.
+            reset_timeout: float, the number of seconds a circuit stays open before probe requests are let through.
+            half_open_probes: int, how many probe requests are sent at once while half-open, and must succeed before
+                the circuit closes.
+            failure_statuses: iterable, the HTTP status codes counted as failures, alongside requests that receive no
+                response at all. Throttling (429) is left to the rate limiter and retries, so it is not a failure by
+                default.
+        """
+        if failure_threshold < 1:
+            raise ValueError('SumoCircuitBreaker: failure_threshold must be at least 1.')
+        if half_open_probes < 1:
+            raise ValueError('SumoCircuitBreaker: half_open_probes must be at least 1.')
+
+        self.__failure_threshold    = failure_threshold
+        self.__reset_timeout        = reset_timeout
+        self.__half_open_probes     = half_open_probes
+        self.failure_statuses       = frozenset(failure_statuses)
+        self.__circuits             = collections.defaultdict(_Circuit)
+        self.__stats                = collections.Counter()
+        self.__lock                 = threading.Lock()
+
+    @property
+    def states(self):
+        """The state of every API family's circuit seen so far, keyed by family: 'closed', 'open' or 'half-open'."""
+        now = time.monotonic()
+        with self.__lock:
+            return {
+                family: self.HALF_OPEN if circuit.state == self.OPEN and now - circuit.opened_at >= self.__reset_timeout else circuit.state
+                for family, circuit in self.__circuits.items()
+            }
+
+    @property
+    def stats(self):
+        """The number of times circuits have opened, and of requests rejected while a circuit was open."""
+        with self.__lock:
+            stats = collections.Counter(opened = 0, rejected = 0)
+            stats.update(self.__stats)
+        return dict(stats)
+
+    def state(self, family):
+        """Get the state of one API family's circuit (ie - 'collectors')."""
+        return self.states.get(family, self.CLOSED)
+
+    def acquire(self, request_url):
+        """Admit a request, raising SumoCircuitOpen if its API family's circuit is open. Returns a ticket that must be
+        passed to release once the request has finished."""
+        family = _api_family(request_url)
+        with self.__lock:
+            circuit = self.__circuits[family]
+            now     = time.monotonic()
+            if circuit.state == self.OPEN:
+                retry_in = circuit.opened_at + self.__reset_timeout - now
+                if retry_in > 0:
+                    self.__stats['rejected'] += 1
+                    raise SumoCircuitOpen('SumoCircuitBreaker: the circuit of {0} is open.'.format(family), family, retry_in)
+                self.__transition(circuit, self.HALF_OPEN)
+            if circuit.state == self.HALF_OPEN:
+                if circuit.probes >= self.__half_open_probes:
+                    self.__stats['rejected'] += 1
+                    raise SumoCircuitOpen(
+                        'SumoCircuitBreaker: the circuit of {0} is half-open, with its probes in flight.'.format(family),
+                        family,
+                        0.0
+                    )
+                circuit.probes += 1
+            return family, circuit.generation
+
+    def release(self, ticket, succeeded):
+        """Record the outcome of an admitted request.
+
+        Args:
+            ticket: the ticket returned by acquire.
+            succeeded: bool, whether the request succeeded, or None if it ended without telling either way (ie - it
+                was cancelled).
+        """
+        family, generation = ticket
+        with self.__lock:
+            circuit = self.__circuits[family]
+            # Outcomes of requests admitted before the circuit last changed state say nothing about its current state.
+            if generation != circuit.generation:
+                return
+            if circuit.state == self.HALF_OPEN:
+                circuit.probes -= 1
+                if succeeded:
+                    circuit.successes += 1
+                    if circuit.successes >= self.__half_open_probes:
+                        self.__transition(circuit, self.CLOSED)
+                elif succeeded is not None:
+                    self.__transition(circuit, self.OPEN)
+            elif circuit.state == self.CLOSED:
+                if succeeded:
+                    circuit.failures = 0
+                elif succeeded is not None:
+                    circuit.failures += 1
+                    if circuit.failures >= self.__failure_threshold:
+                        self.__transition(circuit, self.OPEN)
+
+    def __transition(self, circuit, state):
+        # Every change of state starts a new generation, with its counts reset.
+        circuit.state       = state
+        circuit.failures    = 0
+        circuit.probes      = 0
+        circuit.successes   = 0
+        circuit.generation += 1
+        if state == self.OPEN:
+            circuit.opened_at = time.monotonic()
+            self.__stats['opened'] += 1
+
+
+
+# # # ==================================================
+# # #
+# # # SCHEMA VALIDATION
+# # #
+# # # Every JSON schema used to check arguments before they are sent lives in this registry. Each schema is compiled
+# # # into a validator the first time it is used, and that validator is reused for every later call. When the optional
+# # # fastjsonschema package is installed, a code-generated validator checks payloads first; only payloads it rejects
+# # # go through jsonschema, so the errors raised are exactly those of jsonschema.validate. The two only agree on the
+# # # types json.loads produces (fastjsonschema takes a tuple for an array, for one), so payloads holding anything else
+# # # always go through jsonschema.
+
+_SCHEMAS = {
+    'collector_list_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'aliveBeforeDays': {
+                'type': 'integer',
+                'minimum': 1
+            },
+            'limit': {
+                'type': 'integer'
+            },
+            'offset': {
+                'type': 'integer'
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'hosted_collector': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'category': {
+                'type': 'string'
+            },
+            'collectorType': {
+                'type': 'string',
+                'enum': [
+                    'Hosted'
+                ]
+            },
+            'cutoffRelativeTime': {
+                'type': 'string'
+            },
+            'cutoffTimestamp': {
+                'type': 'integer'
+            },
+            'description': {
+                'type': 'string'
+            },
+            'ephemeral': {
+                'type': 'boolean'
+            },
+            'fields': {
+                'type': 'object'
+            },
+            'hostName': {
+                'type': 'string'
+            },
+            'name': {
+                'type': 'string'
+            },
+            'sourceSyncMode': {
+                'type': 'string',
+                'enum': [
+                    'Json',
+                    'UI'
+                ]
+            },
+            'timeZone': {
+                'type': 'string'
+            },
+            'targetCpu': {
+                'type': 'integer'
+            }
+        },
+        'required': [
+            'collectorType',
+            'ephemeral',
+            'name'
+        ],
+        'not': {
+            'required': [
+                'cutoffRelativeTime',
+                'cutoffTimestamp'
+            ] 
+        },
+        'additionalProperties': False
+    },
+    'collector_updates': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'category': {
+                'type': 'string'
+            },
+            'cutoffTimestamp': {
+                'type': 'integer'
+            },
+            'description': {
+                'type': 'string'
+            },
+            'ephemeral': {
+                'type': 'boolean'
+            },
+            'fields': {
+                'type': 'object'
+            },
+            'hostName': {
+                'type': 'string'
+            },
+            'name': {
+                'type': 'string'
+            },
+            'sourceSyncMode': {
+                'type': 'string',
+                'enum': [
+                    'Json',
+                    'UI'
+                ]
+            },
+            'timeZone': {
+                'type': 'string'
+            },
+            'targetCpu': {
+                'type': 'integer'
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'offline_collector_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'aliveBeforeDays': {
+                'type': 'integer',
+                'minimum': 1
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'source_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'download': {
+                'type': 'boolean'
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'source': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'sourceType': {
+                'type': 'string',
+                'enum': [
+                    'LocalFile',
+                    'RemoteFileV2',
+                    'LocalWindowsEventLog',
+                    'RemoteWindowsEventLog',
+                    'LocalWindowsPerfMon',
+                    'RemoteWindowsPerfMon',
+                    'Syslog',
+                    'Script',
+                    'DockerLog',
+                    'DockerStats',
+                    'SystemStats',
+                    'StreamingMetrics',
+                    'HTTP',
+                    'Cloudsyslog',
+                    'Polling'
+                ]
+            },
+            'name': {
+                'type': 'string'
+            },
+            'description': {
+                'type': 'string'
+            },
+            'fields': {
+                'type': 'object'
+            },
+            'hostName': {
+                'type': 'string'
+            },
+            'category': {
+                'type': 'string'
+            },
+            'automaticDateParsing': {
+                'type': 'boolean'
+            },
+            'timeZone': {
+                'type': 'string'
+            },
+            'forceTimeZone': {
+                'type': 'boolean'
+            },
+            'defaultDateFormat': {
+                'type': 'string'
+            },
+            'defaultDateFormats': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'format': {
+                            'type': 'string'
+                        },
+                        'locator': {
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'format'
+                    ],
+                    'additionalProperties': False
+                }
+            },
+            'multilineProcessingEnabled': {
+                'type': 'boolean'
+            },
+            'useAutolineMatching': {
+                'type': 'boolean'
+            },
+            'manualPrefixRegexp': {
+                'type': 'string'
+            },
+            'filters': {
+                'type': 'array',
+                'items': {
+                    'type': 'string'
+                }
+            },
+            'cutoffTimestamp': {
+                'type': 'integer'
+            },
+            'cutoffRelativeTime': {
+                'type': 'string'
+            }
+        },
+        'required': [
+            'sourceType',
+            'name'
+        ],
+        'not': {
+            'required': [
+                'cutoffRelativeTime',
+                'cutoffTimestamp'
+            ] 
+        },
+        'additionalProperties': False
+    },
+    'source_updates': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'type': 'string'
+            },
+            'description': {
+                'type': 'string'
+            },
+            'fields': {
+                'type': 'object'
+            },
+            'hostName': {
+                'type': 'string'
+            },
+            'category': {
+                'type': 'string'
+            },
+            'automaticDateParsing': {
+                'type': 'boolean'
+            },
+            'timeZone': {
+                'type': 'string'
+            },
+            'forceTimeZone': {
+                'type': 'boolean'
+            },
+            'defaultDateFormat': {
+                'type': 'string'
+            },
+            'defaultDateFormats': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'format': {
+                            'type': 'string'
+                        },
+                        'locator': {
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'format'
+                    ],
+                    'additionalProperties': False
+                }
+            },
+            'multilineProcessingEnabled': {
+                'type': 'boolean'
+            },
+            'useAutolineMatching': {
+                'type': 'boolean'
+            },
+            'manualPrefixRegexp': {
+                'type': 'string'
+            },
+            'filters': {
+                'type': 'array',
+                'items': {
+                    'type': 'string'
+                }
+            },
+            'cutoffTimestamp': {
+                'type': 'integer'
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'upgradable_collector_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'toVersion': {
+                'type': 'string'
+            },
+            'offset': {
+                'type': 'integer'
+            },
+            'limit': {
+                'type': 'integer'
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'upgrade_task': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'collectorId': {
+                'type': 'integer'
+            },
+            'toVersion': {
+                'type': 'string'
+            }
+        },
+        'required': [
+            'collectorId'
+        ],
+        'additionalProperties': False
+    },
+    'pagination_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'limit': {
+                'type': 'integer',
+                'minimum': 1,
+                'maximum': 1000
+            },
+            'token': {
+                'type': 'string'
+            },
+        },
+        'required': [],
+        'additionalProperties': False
+    },
+    'health_event_resources': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'data': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'id': {
+                            'type': 'string'
+                        },
+                        'name': {
+                            'type': 'string'
+                        },
+                        'type': {
+                            'type': 'string',
+                            'enum': [
+                                'Collector',
+                                'Source',
+                                'IngestBudget',
+                                'Organisation',
+                                'LogsToMetricsRule'
+                            ]
+                        }
+                    },
+                    'required': [
+                        'id',
+                        'type'
+                    ],
+                    'additionalProperties': False
+                }
+            },
+        },
+        'required': [
+            'data'
+        ],
+        'additionalProperties': False
+    },
+    'ingest_budget': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'type': 'string',
+                'minLength': 1,
+                'maxLength': 128
+            },
+            'fieldValue': {
+                'type': 'string',
+                'minLength': 1,
+                'maxLength': 1024
+            },
+            'capacityBytes': {
+                'type': 'integer',
+                'minimum': 0
+            },
+            'timezone': {
+                'type': 'string'
+            },
+            'resetTime': {
+                'type': 'string',
+                'minLength': 5,
+                'maxLength': 5
+            },
+            'description' : {
+                'type': 'string',
+                'minLength': 1,
+                'maxLength': 1024
+            },
+            'action': {
+                'type': 'string',
+                'enum': [
+                    'stopCollecting',
+                    'keepCollecting'
+                ]
+            },
+            'auditThreshold': {
+                'type': 'integer',
+                'minimum': 1,
+                'maximum': 99
+            }
+        },
+        'required': [
+            'name',
+            'fieldValue',
+            'capacityBytes',
+            'timezone',
+            'resetTime',
+            'action'
+        ],
+        'additionalProperties': False
+    },
+    'app_install': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'name': {
+                'type': 'string',
+                'minLength': 1,
+                'maxLength': 128
+            },
+            'description' : {
+                'type': 'string',
+                'minLength': 1,
+                'maxLength': 255
+            },
+            'destinationFolderId': {
+                'type': 'string'
+            },
+            'dataSourceValues': {
+                'type': 'object',
+                'additionalProperties': True
+            }
+        },
+        'required': [
+            'name',
+            'description',
+            'destinationFolderId'
+        ],
+        'additionalProperties': False
+    },
+    'content_path_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'path': {
+                'type': 'string'
+            }
+        },
+        'required': [
+            'path'
+        ],
+        'additionalProperties': False
+    },
+    'content_import_params': {
+        '$schema': 'http://json-schema.org/draft-07/schema#',
+        'type': 'object',
+        'properties': {
+            'overwrite': {
+                'type': 'boolean'
+            }
+        },
+        'required': [],
+        'additionalProperties': False
+    }
+}
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+def _is_plain_json(value):
+    """Whether a value is built only from the types json.loads produces, with string keys in every object."""
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_plain_json(item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_is_plain_json(item) for item in value)
+    return isinstance(value, _JSON_SCALARS)
+
+
+class _SchemaValidator:
+    """A registry schema compiled once, ready to validate any number of instances."""
+    def __init__(self, schema):
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        self.__validator        = validator_class(schema)
+        self.__fast_validator   = None
+        if fastjsonschema is not None:
+            try:
+                self.__fast_validator = fastjsonschema.compile(schema)
+            except fastjsonschema.JsonSchemaDefinitionException:
+                pass
+
+    def validate(self, instance):
+        if self.__fast_validator is not None and _is_plain_json(instance):
+            try:
+                self.__fast_validator(instance)
+                return
+            except fastjsonschema.JsonSchemaException:
+                # Let jsonschema decide, so that the error raised is the same one jsonschema.validate would raise.
+                pass
+        error = jsonschema.exceptions.best_match(self.__validator.iter_errors(instance))
+        if error is not None:
+            raise error
+
+
+_schema_validators = {}
+
+def _validate_json(schema_name, instance):
+    """Validate an instance against a registry schema, raising jsonschema.exceptions.ValidationError if it is invalid.
+
+    Args:
+        schema_name: string, the name of the schema in _SCHEMAS.
+        instance: the value to validate.
+    """
+    validator = _schema_validators.get(schema_name)
+    if validator is None:
+        validator = _schema_validators.setdefault(schema_name, _SchemaValidator(_SCHEMAS[schema_name]))
+    validator.validate(instance)
+
+
+def _json_shape(value):
+    """Describe the structure of a JSON value (its keys and value types, but not the values themselves)."""
+    if isinstance(value, dict):
+        return ('object', tuple(sorted((key, _json_shape(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ('array', tuple(sorted(set(_json_shape(item) for item in value), key = repr)))
+    return type(value).__name__
+
+
+class SumoValidationPolicy:
+    """Decides which payloads are validated against their schemas, and keeps count of the validation skipped.
+
+    Modes:
+        strict: every payload is validated.
+        first-n: only the first first_n payloads of each shape (the same schema, keys and value types) are validated.
+        sampled: a random sample_rate fraction of payloads is validated.
+        off: no payloads are validated.
+    """
+    MODES = ('strict', 'first-n', 'sampled', 'off')
+
+    def __init__(self, mode = 'strict', first_n = 10, sample_rate = 0.1):
+        """
+        Args:
+            mode: string, one of the modes above.
+            first_n: int, the number of payloads of each shape to validate in first-n mode.
+            sample_rate: float, the fraction of payloads to validate in sampled mode, between 0 and 1.
+        """
+        self.__check_mode(mode)
+        self.mode           = mode
+        self.first_n        = first_n
+        self.sample_rate    = sample_rate
+        self.__lock         = threading.Lock()
+        self.__shape_counts = collections.Counter()
+        self.__timings      = collections.defaultdict(lambda: [0, 0.0])
+        self.__stats        = {
+            'validated': 0,
+            'skipped': 0,
+            'validation_seconds': 0.0,
+            'estimated_seconds_skipped': 0.0
+        }
 
-    def __execute_api(self, request_type, request_url, request_params = None, request_data = None, additional_headers = {}):
+    @property
+    def stats(self):
+        """Counts of validated and skipped payloads, the time spent validating, and an estimate of the time saved by
+        skipping (based on the average validation time of each schema)."""
+        with self.__lock:
+            return dict(self.__stats)
+
+    def validate(self, schema_name, instance, mode = None):
+        """Validate an instance against a registry schema if the policy calls for it.
+
+        Args:
+            schema_name: string, the name of the schema in _SCHEMAS.
+            instance: the value to validate.
+            mode: string, overrides the policy's mode for this validation only.
+        """
+        mode = self.mode if mode is None else mode
+        self.__check_mode(mode)
+        if not self.__should_validate(mode, schema_name, instance):
+            with self.__lock:
+                count, seconds = self.__timings[schema_name]
+                self.__stats['skipped'] += 1
+                self.__stats['estimated_seconds_skipped'] += seconds / count if count else 0.0
+            return
+
+        started = time.perf_counter()
+        try:
+            _validate_json(schema_name, instance)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.__lock:
+                self.__timings[schema_name][0] += 1
+                self.__timings[schema_name][1] += elapsed
+                self.__stats['validated'] += 1
+                self.__stats['validation_seconds'] += elapsed
+
+    def __check_mode(self, mode):
+        if mode not in self.MODES:
+            raise ValueError('SumoValidationPolicy: mode must be one of {0}.'.format(list(self.MODES)))
+
+    def __should_validate(self, mode, schema_name, instance):
+        if mode == 'strict':
+            return True
+        if mode == 'off':
+            return False
+        if mode == 'sampled':
+            return random.random() < self.sample_rate
+        shape = (schema_name, _json_shape(instance))
+        with self.__lock:
+            if self.__shape_counts[shape] >= self.first_n:
+                return False
+            self.__shape_counts[shape] += 1
+            return True
+
+
+
+# # # ==================================================
+# # #
+# # # ENDPOINT RESOLUTION
+# # # https://help.sumologic.com/APIs/General-API-Information/Sumo-Logic-Endpoints-and-Firewall-Security
+# # #
+# # # Each account lives in one deployment, with its own API endpoint. The endpoint can be given explicitly, or it is
+# # # found by following the redirect from the default endpoint. Resolved endpoints are shared by every client in the
+# # # process, and can be kept in a small on-disk cache so that new processes do not pay for the round trip either.
+# # # Only endpoints found by a successful probe are remembered, so a bad key or an outage is never cached.
+
+_DEFAULT_API_ENDPOINT = 'https://api.sumologic.com/api'
+
+# AsyncSumoClient builds URLs on this until its endpoint is resolved on the event loop.
+_PENDING_ENDPOINT = 'https://endpoint.pending.invalid/api'
+
+_DEFAULT_ENDPOINT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'py-sumologic',
+    'endpoints.json'
+)
+
+
+def _probed_endpoint(response_url, status_code, redirected):
+    """Get the endpoint found by probing the default endpoint, or None if the probe failed (ie - 401 or 5xx) and says
+    nothing about where the account lives."""
+    if redirected or status_code < 400:
+        return str(response_url).rstrip('/')
+    return None
+
+
+def _deployment_endpoint(deployment):
+    """Get the API endpoint of a deployment (ie - 'au', 'us2'), or pass through an endpoint URL unchanged."""
+    if '://' in deployment:
+        return deployment.rstrip('/')
+    deployment = deployment.lower()
+    if deployment == 'us1':
+        return _DEFAULT_API_ENDPOINT
+    return 'https://api.{0}.sumologic.com/api'.format(deployment)
+
+
+class _SumoEndpointResolver:
+    """Process-wide store of the endpoints resolved for each access ID, backed by an optional on-disk cache."""
+    def __init__(self):
+        self.__lock         = threading.Lock()
+        self.__endpoints    = {}
+        self.__key_locks    = collections.defaultdict(threading.Lock)
+
+    def resolve(self, access_id, fetch, cache_path, cache_ttl):
+        """Get the endpoint for an access ID, calling fetch() to resolve it only when no cached endpoint is found.
+
+        Clients resolving the same access ID at the same time wait for a single fetch rather than each making one.
+        When fetch() returns None the probe failed, and the default endpoint is used without being remembered, so
+        that the next client probes again.
+        """
+        with self.__lock:
+            key_lock = self.__key_locks[access_id]
+        with key_lock:
+            endpoint = self.cached(access_id, cache_path, cache_ttl)
+            if endpoint is None:
+                endpoint = fetch()
+                if endpoint is None:
+                    return _DEFAULT_API_ENDPOINT
+                endpoint = self.store(access_id, endpoint, cache_path)
+            return endpoint
+
+    def cached(self, access_id, cache_path, cache_ttl):
+        """Get the cached endpoint for an access ID, or None if it has not been resolved yet."""
+        with self.__lock:
+            if access_id in self.__endpoints:
+                return self.__endpoints[access_id]
+        if not cache_path:
+            return None
+
+        entry = self.__read_cache(cache_path).get(access_id)
+        if not isinstance(entry, dict) or time.time() - entry.get('resolved_at', 0) > cache_ttl:
+            return None
+        with self.__lock:
+            self.__endpoints[access_id] = entry['endpoint']
+        return entry['endpoint']
+
+    def store(self, access_id, endpoint, cache_path):
+        """Remember the endpoint resolved for an access ID."""
+        endpoint = endpoint.rstrip('/')
+        with self.__lock:
+            self.__endpoints[access_id] = endpoint
+        if not cache_path:
+            return endpoint
+
+        # The on-disk cache is only an optimisation, so failing to write it is not an error.
+        entries = self.__read_cache(cache_path)
+        entries[access_id] = {
+            'endpoint': endpoint,
+            'resolved_at': time.time()
+        }
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+            with tempfile.NamedTemporaryFile('w', dir = os.path.dirname(cache_path), delete = False) as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(cache_file.name, cache_path)
+        except OSError:
+            pass
+        return endpoint
+
+    def __read_cache(self, cache_path):
+        try:
+            with open(cache_path) as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+
+_endpoint_resolver = _SumoEndpointResolver()
+
+
+
+# # # ==================================================
+# # #
+# # # OFFSET PAGINATION
+# # #
+# # # Listings paged by offset and limit can have several pages requested at once, since every page's offset is known
+# # # up front. The end of the listing is the first page that comes back short.
+
+class _OffsetPager:
+    """Keeps track of which pages of an offset-paginated listing to request next, and which are ready to yield."""
+    def __init__(self, page_size, concurrency, ordered):
+        if page_size < 1 or concurrency < 1:
+            raise ValueError('_OffsetPager: page_size and concurrency must be at least 1.')
+
+        self.__page_size        = page_size
+        self.__concurrency      = concurrency
+        self.__ordered          = ordered
+        self.__next_offset      = 0
+        self.__end_offset       = None
+        self.__in_flight        = 0
+        self.__buffered         = {}
+        self.__next_to_yield    = 0
+
+    def offsets_to_fetch(self):
+        """Get the offsets of the pages to request now. Requests stop once the last page has been seen, and while
+        too many pages are waiting for an earlier page to arrive."""
+        offsets = []
+        while (
+            self.__end_offset is None
+            and self.__in_flight < self.__concurrency
+            and len(self.__buffered) < self.__concurrency
+        ):
+            offsets.append(self.__next_offset)
+            self.__next_offset  += self.__page_size
+            self.__in_flight    += 1
+        return offsets
+
+    def page_fetched(self, offset, items):
+        """Record the items of a fetched page, and get the pages of items that are now ready to be yielded."""
+        self.__in_flight -= 1
+        if len(items) < self.__page_size and (self.__end_offset is None or offset < self.__end_offset):
+            self.__end_offset = offset
+            for buffered_offset in [key for key in self.__buffered if key > offset]:
+                del self.__buffered[buffered_offset]
+        if self.__end_offset is not None and offset > self.__end_offset:
+            return []
+        if not self.__ordered:
+            return [items]
+
+        self.__buffered[offset] = items
+        ready = []
+        while self.__next_to_yield in self.__buffered:
+            ready.append(self.__buffered.pop(self.__next_to_yield))
+            self.__next_to_yield += self.__page_size
+        return ready
+
+
+
+# # # ==================================================
+# # #
+# # # JSON CODECS
+# # #
+# # # Request bodies are encoded, and response bodies decoded, by the client's JSON codec: any object with dumps and
+# # # loads functions, such as the json, orjson or ujson modules. A faster codec is worthwhile for bulk imports and
+# # # large exports. Streamed responses are always parsed by the standard library, which can parse them incrementally.
+
+def _decode_json(json_codec, content, **kwargs):
+    """Decode a response body with the client's codec. Keyword arguments are only understood by the standard library
+    json module, so a call passing any is decoded by it instead."""
+    if kwargs or json_codec is json:
+        return json.loads(content, **kwargs)
+    return json_codec.loads(content)
+
+
+
+# # # ==================================================
+# # #
+# # # RESPONSE CACHING
+# # #
+# # # Collector and Source GETs come back with an ETag. Once a response is cached, later GETs of the same URL send
+# # # its ETag in If-None-Match, and a 304 Not Modified answer is served from the cache without the body being sent
+# # # again. Read-mostly endpoints can also be cached for a fixed time, in which case repeated GETs are not sent at
+# # # all until the entry expires or a write through the client touches the same path.
+
+def _request_cache_key(request_url, request_params, request_headers):
+    """Get the cache key of a GET request. Admin mode changes what a request returns, so it is part of the key."""
+    return (
+        request_url,
+        json.dumps(request_params, sort_keys = True, default = str) if request_params else None,
+        request_headers.get('isAdminMode')
+    )
+
+
+def _copy_response(response, retries):
+    """Get a copy of a cached response to hand to one caller, with headers of its own and the number of retries of
+    the request actually made for it."""
+    copied = object.__new__(type(response))
+    copied.__dict__.update(response.__dict__)
+    copied.headers = response.headers.copy()
+    copied.retries = retries
+    return copied
+
+
+def _api_path(request_url):
+    """Get the segments of a request URL's path from its API version on, ie - ('v1', 'collectors', '123') for
+    https://api.sumologic.com/api/v1/collectors/123."""
+    segments = urllib.parse.urlparse(request_url).path.strip('/').split('/')
+    for index, segment in enumerate(segments):
+        if re.fullmatch(r'v[0-9]+', segment):
+            return tuple(segments[index:])
+    return tuple(segments)
+
+
+class SumoETagCache:
+    """Remembers the ETag and response of recent GET requests, evicting the least recently used beyond max_entries.
+
+    A single cache can be shared by several clients, as long as they use the same access key.
+    """
+    def __init__(self, max_entries = 1024):
+        """
+        Args:
+            max_entries: int, the maximum number of responses to keep.
+        """
+        if max_entries < 1:
+            raise ValueError('SumoETagCache: max_entries must be at least 1.')
+
+        self.__max_entries  = max_entries
+        self.__entries      = collections.OrderedDict()
+        self.__lock         = threading.Lock()
+        self.__stats        = collections.Counter(hits = 0, misses = 0, bytes_saved = 0)
+
+    def get(self, key):
+        """Get the cached response for a key, or None."""
+        with self.__lock:
+            response = self.__entries.get(key)
+            if response is not None:
+                self.__entries.move_to_end(key)
+            return response
+
+    def resolve(self, key, cached, response):
+        """Settle a conditional GET: a copy of the cached response if the server answered 304, otherwise the new
+        response, which is cached when it carries an ETag."""
+        with self.__lock:
+            if cached is not None and response.status_code == 304:
+                self.__stats['hits'] += 1
+                self.__stats['bytes_saved'] += len(cached.content)
+                return _copy_response(cached, getattr(response, 'retries', 0))
+
+            self.__stats['misses'] += 1
+            if response.ok and response.headers.get('ETag'):
+                self.__entries[key] = _copy_response(response, 0)
+                self.__entries.move_to_end(key)
+                while len(self.__entries) > self.__max_entries:
+                    self.__entries.popitem(last = False)
+            else:
+                self.__entries.pop(key, None)
+            return response
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    @property
+    def stats(self):
+        """The number of 304 hits, full responses (misses) and response bytes not downloaded again."""
+        with self.__lock:
+            return dict(self.__stats, entries = len(self.__entries))
+
+
+class SumoReadCache:
+    """Keeps GET responses of read-mostly endpoints for a time to live, evicting the least recently used beyond
+    max_entries.
+
+    Only paths with a time to live are cached. Paths are given from the API version on, with * matching any one
+    segment (ie - 'v1/collectors/*' for get_collector_by_id), and a literal path wins over a pattern. A write
+    (POST, PUT, PATCH or DELETE) through a client using the cache drops every entry for the same path, the paths
+    above it and the paths below it, so updating a Collector also drops the Collector listing.
+
+    The cache keeps a copy of each response, and every hit is a copy of its own, so a caller changing its response
+    does not affect anyone else.
+    """
+
+    # Job status endpoints are deliberately absent, since they are polled for changes. The offline Collector listing
+    # matches 'v1/collectors/*', so it is excluded with a time to live of 0.
+    DEFAULT_TTLS = {
+        'v1/fields':                        300,
+        'v1/fields/builtin':                3600,
+        'v1/fields/quota':                  60,
+        'v1/apps':                          3600,
+        'v1/collectors/*':                  60,
+        'v1/collectors/offline':            0,
+        'v1/collectors/upgrades/targets':   3600
+    }
+
+    def __init__(self, ttls = None, max_entries = 1024):
+        """
+        Args:
+            ttls: dict, the number of seconds responses are kept for, keyed by path. Defaults to DEFAULT_TTLS; use
+                dict(SumoReadCache.DEFAULT_TTLS, **{...}) to extend them.
+            max_entries: int, the maximum number of responses to keep.
+        """
+        if max_entries < 1:
+            raise ValueError('SumoReadCache: max_entries must be at least 1.')
+
+        self.__ttls         = sorted(
+            ((tuple(path.strip('/').split('/')), ttl) for path, ttl in (self.DEFAULT_TTLS if ttls is None else ttls).items()),
+            key = lambda rule: rule[0].count('*')
+        )
+        self.__max_entries  = max_entries
+        self.__entries      = collections.OrderedDict()
+        self.__lock         = threading.Lock()
+        self.__generation   = 0
+        self.__stats        = collections.Counter(hits = 0, misses = 0, expired = 0, evicted = 0, invalidated = 0)
+
+    def ttl(self, request_url):
+        """Get the number of seconds a response from the given URL is kept for, or None if it is not cached."""
+        path = _api_path(request_url)
+        for pattern, ttl in self.__ttls:
+            if len(pattern) == len(path) and all(expected in ('*', segment) for expected, segment in zip(pattern, path)):
+                return ttl or None
+        return None
+
+    def get(self, key):
+        """Get the cached response for a key if it has not expired, or None."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self.__entries[key]
+                self.__stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.__stats['misses'] += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.__stats['hits'] += 1
+            return entry[0]
+
+    @property
+    def generation(self):
+        """Changes whenever entries are invalidated. Taken before a GET is sent and handed to store, so that a
+        response read before a write finished is not cached after it."""
+        with self.__lock:
+            return self.__generation
+
+    def store(self, key, response, generation):
+        """Cache a successful response if its path has a time to live, and return it."""
+        ttl = self.ttl(key[0])
+        if ttl is None or not response.ok:
+            return response
+
+        with self.__lock:
+            if generation != self.__generation:
+                return response
+            self.__entries[key] = (_copy_response(response, 0), time.monotonic() + ttl, _api_path(key[0]))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last = False)
+                self.__stats['evicted'] += 1
+        return response
+
+    def invalidate(self, request_url, response = None):
+        """Drop the entries a write to the given URL may have made stale, and return the write's response."""
+        path = _api_path(request_url)
+        with self.__lock:
+            self.__generation += 1
+            for key in [key for key, entry in self.__entries.items() if self.__related(entry[2], path)]:
+                del self.__entries[key]
+                self.__stats['invalidated'] += 1
+        return response
+
+    @staticmethod
+    def __related(cached_path, written_path):
+        shorter = min(len(cached_path), len(written_path))
+        return shorter >= 2 and cached_path[:shorter] == written_path[:shorter]
+
+    def clear(self):
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+
+    @property
+    def stats(self):
+        """The number of hits, misses, expired, evicted and invalidated entries, and the current number of entries.
+        Only reads of paths with a time to live are counted."""
+        with self.__lock:
+            return dict(self.__stats, entries = len(self.__entries))
+
+
+class SumoContentCache:
+    """Translates between Library paths and content IDs without asking the Content Management API each time.
+
+    The cache learns from every content response passing through a client using it: path and ID lookups, folder
+    listings, global and Admin Recommended folder results, and newly created folders. Besides the paths it has seen,
+    it remembers each item's parent and name, so the path of an item below a folder with a known path (and the reverse)
+    is worked out locally. Moving, renaming or deleting an item, or importing into a folder, forgets what that
+    changes.
+    """
+    def __init__(self):
+        self.__paths    = {}
+        self.__ids      = {}
+        self.__parents  = {}
+        self.__children = collections.defaultdict(dict)
+        self.__lock     = threading.RLock()
+        self.__stats    = collections.Counter(hits = 0, misses = 0, invalidated = 0)
+
+    def path_for(self, content_id):
+        """Get the path of a content item, or None if it is not known."""
+        with self.__lock:
+            path = self.__derive_path(content_id, set())
+            self.__stats['hits' if path is not None else 'misses'] += 1
+            return path
+
+    def id_for(self, path):
+        """Get the ID of the content item at a path, or None if it is not known."""
+        with self.__lock:
+            content_id = self.__derive_id(path.rstrip('/'), 0)
+            self.__stats['hits' if content_id is not None else 'misses'] += 1
+            return content_id
+
+    def __derive_path(self, content_id, seen):
+        if content_id in self.__paths:
+            return self.__paths[content_id]
+        if content_id not in self.__parents or content_id in seen:
+            return None
+        seen.add(content_id)
+        parent_id, name = self.__parents[content_id]
+        parent_path = self.__derive_path(parent_id, seen)
+        if parent_path is None:
+            return None
+        self.__learn_path(content_id, '{0}/{1}'.format(parent_path, name))
+        return self.__paths[content_id]
+
+    def __derive_id(self, path, depth):
+        if path in self.__ids:
+            return self.__ids[path]
+        parent_path, _, name = path.rpartition('/')
+        if not parent_path or depth > 64:
+            return None
+        parent_id = self.__derive_id(parent_path, depth + 1)
+        content_id = self.__children.get(parent_id, {}).get(name) if parent_id is not None else None
+        if content_id is not None:
+            self.__learn_path(content_id, path)
+        return content_id
+
+    def __learn_path(self, content_id, path):
+        path = path.rstrip('/')
+        self.__ids.pop(self.__paths.get(content_id), None)
+        self.__paths[content_id]    = path
+        self.__ids[path]            = content_id
+
+    def __learn_item(self, item, parent_id = None):
+        if not isinstance(item, dict) or 'id' not in item or 'name' not in item:
+            return
+        parent_id = parent_id or item.get('parentId')
+        if parent_id:
+            self.__parents[item['id']]                  = (parent_id, item['name'])
+            self.__children[parent_id][item['name']]    = item['id']
+        for child in item.get('children') or []:
+            self.__learn_item(child, item['id'])
+
+    def __forget(self, content_id):
+        """Forget an item's path, parent and name, and the paths of everything below it, keeping the names of the
+        items below it, which a move or rename does not change."""
+        pending = [content_id]
+        while pending:
+            item_id = pending.pop()
+            self.__ids.pop(self.__paths.pop(item_id, None), None)
+            pending.extend(self.__children.get(item_id, {}).values())
+            self.__stats['invalidated'] += 1
+        parent_id, name = self.__parents.pop(content_id, (None, None))
+        if parent_id is not None and self.__children.get(parent_id, {}).get(name) == content_id:
+            del self.__children[parent_id][name]
+
+    def observe(self, request_type, request_url, request_params, response):
+        """Learn from, or invalidate after, a Content Management API response, and return it."""
+        path = _api_path(request_url)
+        if path[:2] != ('v2', 'content') or not response.ok:
+            return response
+
+        action = path[2:]
+        with self.__lock:
+            if request_type == 'GET' and action == ('path',):
+                item = response.json()
+                self.__learn_item(item)
+                self.__learn_path(item['id'], request_params['path'])
+            elif request_type == 'GET' and len(action) == 2 and action[1] == 'path':
+                self.__learn_path(action[0], response.json()['path'])
+            elif request_type == 'GET' and action[:1] == ('folders',) and (len(action) == 2 or action[-1] == 'result'):
+                body = response.json()
+                for item in body.get('data', [body]):
+                    self.__learn_item(item)
+            elif request_type == 'POST' and action == ('folders',):
+                self.__learn_item(response.json())
+            elif request_type == 'PUT' and action[:1] == ('folders',) and len(action) == 2:
+                self.__forget(action[1])
+                self.__learn_item(response.json())
+            elif request_type == 'POST' and len(action) == 2 and action[1] == 'move':
+                self.__forget(action[0])
+            elif request_type == 'DELETE' and len(action) == 2 and action[1] == 'delete':
+                self.__forget(action[0])
+            elif request_type == 'POST' and len(action) == 3 and action[2] == 'import':
+                for child_id in list(self.__children.get(action[1], {}).values()):
+                    self.__forget(child_id)
+        return response
+
+    def clear(self):
+        with self.__lock:
+            self.__paths.clear()
+            self.__ids.clear()
+            self.__parents.clear()
+            self.__children.clear()
+
+    @property
+    def stats(self):
+        """The number of lookups answered (hits) and not (misses), of paths invalidated, and of paths and items
+        known."""
+        with self.__lock:
+            return dict(self.__stats, paths = len(self.__paths), items = len(self.__parents))
+
+
+
+# # # ==================================================
+# # #
+# # # STREAMING JSON
+# # #
+# # # Content exports, global folder results and some listings can be tens of megabytes. Rather than reading the whole
+# # # body and parsing it into one dictionary, such a response can be streamed, and the items of its main array parsed
+# # # one at a time as the body arrives. Only the item being parsed and the unread part of the body are held in memory.
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _JSONItemStream:
+    """Parses a JSON document fed to it in chunks, returning the items of the array at path as each one completes.
+
+    The path is the keys leading from the top-level object to the array (ie - ('data',)); an empty path means the
+    document itself is the array. Everything outside that array is skipped, and a document without it raises
+    ValueError. Attempts to parse an incomplete item are only repeated once the unread input has doubled, so a large
+    item costs linear rather than quadratic time.
+    """
+    def __init__(self, path):
+        self.__path     = tuple(path)
+        self.__depth    = 0
+        self.__state    = 'open' if self.__path else 'array'
+        self.__text     = codecs.getincrementaldecoder('utf-8')()
+        self.__decoder  = json.JSONDecoder()
+        self.__buffer   = ''
+        self.__retry_at = 0
+
+    def feed(self, chunk, final = False):
+        """Add the next chunk of the body (final once it is complete), and return the items completed by it."""
+        self.__buffer += self.__text.decode(chunk, final)
+        if len(self.__buffer) < self.__retry_at and not final:
+            return []
+
+        buffer  = self.__buffer
+        items   = []
+        pos     = 0
+        waiting = False
+        while self.__state != 'done':
+            pos = _JSON_WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self.__state == 'open':
+                if char != '{':
+                    raise ValueError('_JSONItemStream: expected an object on the way to {0}.'.format(self.__path))
+                pos += 1
+                self.__state = 'key'
+            elif self.__state in ('key', 'items') and char == ',':
+                pos += 1
+            elif self.__state == 'key' and char == '}':
+                # An object on the way to the array ended without the next key, so a wrong path or an unexpected body
+                # (ie - an error) is not mistaken for an empty array.
+                raise ValueError('_JSONItemStream: {0} was not found in the document.'.format(self.__path))
+            elif self.__state == 'items' and char == ']':
+                self.__state = 'done'
+            elif self.__state == 'array' and char == '[':
+                pos += 1
+                self.__state = 'items'
+            elif self.__state == 'array' and 'null'.startswith(buffer[pos:pos + 4]):
+                if len(buffer) - pos < 4:
+                    waiting = True
+                    break
+                self.__state = 'done'
+            elif self.__state == 'array':
+                raise ValueError('_JSONItemStream: {0} is not an array.'.format(self.__path))
+            else:
+                decoded = self.__decode(buffer, pos, final)
+                if decoded is None:
+                    waiting = True
+                    break
+                value, end = decoded
+
+                if self.__state == 'items':
+                    items.append(value)
+                elif self.__state == 'skip':
+                    self.__state = 'key'
+                else:
+                    end = _JSON_WHITESPACE.match(buffer, end).end()
+                    if end == len(buffer):
+                        waiting = True
+                        break
+                    if not isinstance(value, str) or buffer[end] != ':':
+                        raise ValueError('_JSONItemStream: malformed object key at position {0}.'.format(pos))
+                    end += 1
+                    if value == self.__path[self.__depth]:
+                        self.__depth += 1
+                        self.__state = 'open' if self.__depth < len(self.__path) else 'array'
+                    else:
+                        self.__state = 'skip'
+                pos = end
+
+        self.__buffer   = '' if self.__state == 'done' else buffer[pos:]
+        self.__retry_at = 2 * len(self.__buffer) if waiting else 0
+        if final and self.__state != 'done':
+            raise ValueError('_JSONItemStream: the document ended before the array at {0} did.'.format(self.__path))
+        return items
+
+    def __decode(self, buffer, pos, final):
+        # A number cut short by the end of a chunk still decodes (ie - 12.5 as 12), so a value only counts as complete
+        # once the delimiter following it has arrived.
+        try:
+            value, end = self.__decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        follow = _JSON_WHITESPACE.match(buffer, end).end()
+        if not final and (follow == len(buffer) or buffer[follow] not in ',:]}'):
+            return None
+        return value, end
+
+
+
+# # # ==================================================
+# # #
+# # # DOWNLOADS
+# # #
+# # # A streamed response can be written straight to a file, chunk by chunk, optionally compressed on the way. Memory
+# # # use does not depend on the size of the response.
+
+_COMPRESSORS = {
+    'gzip': lambda: zlib.compressobj(6, zlib.DEFLATED, 31),
+    'bz2':  bz2.BZ2Compressor,
+    'xz':   lzma.LZMACompressor
+}
+
+
+def _file_mode(path):
+    """Get the permissions a file written to path should have: those of the file it replaces, or those a new file
+    gets under the process umask."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        pass
+    # The umask can only be read by setting it, so it is put straight back.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class _DownloadSink:
+    """Writes the chunks of a response body to a path or writable binary file object, counting and hashing them.
+
+    A path is written through a temporary file in the same directory, which only replaces the path once the whole
+    body has been written, so a failed download never leaves a truncated file behind.
+    """
+    def __init__(self, destination, compression = None):
+        if compression is not None and compression not in _COMPRESSORS:
+            raise ValueError('download: compression must be one of {0}.'.format(list(_COMPRESSORS)))
+
+        self.__compressor   = _COMPRESSORS[compression]() if compression else None
+        self.__sha256       = hashlib.sha256()
+        self.__bytes        = 0
+        self.__written      = 0
+        if isinstance(destination, (str, os.PathLike)):
+            self.__path = os.fspath(destination)
+            directory   = os.path.dirname(os.path.abspath(self.__path))
+            os.makedirs(directory, exist_ok = True)
+            self.__file = tempfile.NamedTemporaryFile('wb', dir = directory, delete = False)
+        else:
+            self.__path = None
+            self.__file = destination
+
+    def write(self, chunk):
+        self.__sha256.update(chunk)
+        self.__bytes += len(chunk)
+        self.__write(self.__compressor.compress(chunk) if self.__compressor else chunk)
+
+    def __write(self, data):
+        if data:
+            self.__file.write(data)
+            self.__written += len(data)
+
+    def finish(self):
+        """Flush the download to its destination, and return its statistics."""
+        if self.__compressor:
+            self.__write(self.__compressor.flush())
+        if self.__path is not None:
+            # Temporary files are only readable by their owner, so the file gets the permissions expected of it first.
+            self.__file.close()
+            os.chmod(self.__file.name, _file_mode(self.__path))
+            os.replace(self.__file.name, self.__path)
+        return {
+            'path':             self.__path,
+            'bytes':            self.__bytes,
+            'sha256':           self.__sha256.hexdigest(),
+            'written_bytes':    self.__written
+        }
+
+    def abort(self):
+        """Discard a download that failed, leaving a destination path untouched."""
+        if self.__path is not None:
+            self.__file.close()
+            try:
+                os.remove(self.__file.name)
+            except OSError:
+                pass
+
+
+
+# # # ==================================================
+# # #
+# # # BATCHES
+# # #
+# # # A batch is a list of client calls run by a bounded pool of workers. Each call is a (method, args) or
+# # # (method, args, kwargs) tuple, where method is either the name of a client method or any callable.
+
+def _invoke_call(client, call):
+    """Make one call of a batch, and return what it returns."""
+    if len(call) == 2:
+        method, args = call
+        kwargs = {}
+    else:
+        method, args, kwargs = call
+    if isinstance(method, str):
+        method = getattr(client, method)
+    return method(*args, **kwargs)
+
+
+def _ordered_results(completed):
+    """Put the (index, result) pairs of a finished batch back in input order."""
+    results = dict(completed)
+    return [results[index] for index in range(len(results))]
+
+
+
+# # # ==================================================
+# # #
+# # # INVENTORY
+# # #
+# # # An inventory snapshot lists every Collector and then every Collector's Sources. Sources are requested while
+# # # later pages of Collectors are still being listed, rather than after the whole listing is done.
+
+class _InventoryBuilder:
+    """Assembles an inventory snapshot from Collectors as they are listed and Sources as they arrive."""
+    def __init__(self):
+        self.__started          = time.monotonic()
+        self.__listed           = None
+        self.__collectors       = []
+        self.__errors           = {}
+        self.__source_count     = 0
+        self.__taken_at         = time.time()
+
+    def collector_listed(self, collector):
+        """Add a Collector to the snapshot, returning its index."""
+        self.__collectors.append(dict(collector, sources = None))
+        self.__listed = time.monotonic()
+        return len(self.__collectors) - 1
+
+    def sources_fetched(self, index, response):
+        """Attach the list_sources response, or the exception it raised, to the Collector at index."""
+        collector = self.__collectors[index]
+        if isinstance(response, Exception):
+            self.__errors[collector['id']] = repr(response)
+        elif not response.ok:
+            self.__errors[collector['id']] = '{0} {1}'.format(response.status_code, response.reason)
+        else:
+            collector['sources'] = response.json().get('sources', [])
+            self.__source_count += len(collector['sources'])
+
+    def snapshot(self):
+        seconds = time.monotonic() - self.__started
+        return {
+            'taken_at':     self.__taken_at,
+            'collectors':   self.__collectors,
+            'errors':       self.__errors,
+            'stats': {
+                'collectors':               len(self.__collectors),
+                'sources':                  self.__source_count,
+                'errors':                   len(self.__errors),
+                'seconds':                  seconds,
+                'listing_seconds':          (self.__listed or self.__started) - self.__started,
+                'collectors_per_second':    len(self.__collectors) / seconds if seconds else 0.0
+            }
+        }
+
+
+
+# # # ==================================================
+# # #
+# # # ASYNCHRONOUS JOBS
+# # #
+# # # Several APIs start a job and hand back its identifier, leaving the caller to poll a status endpoint until the
+# # # job finishes and then fetch its result. Each kind of job is described here once, so that a single poller can
+# # # drive any of them. Polling starts quickly, so short jobs finish with little delay, and slows down the longer a
+# # # job runs, so long jobs do not waste status calls.
+
+class SumoJobError(Exception):
+    """Raised when an asynchronous job fails, or is not waited on until it finishes."""
+    def __init__(self, message, job_type, job_id, status = None):
+        super().__init__(message)
+        self.job_type   = job_type
+        self.job_id     = job_id
+        self.status     = status
+
+
+class SumoJobTimeout(SumoJobError, TimeoutError):
+    """Raised when an asynchronous job has not finished within the time allowed."""
+
+
+class SumoJobCancelled(SumoJobError):
+    """Raised when waiting on an asynchronous job is cancelled. The job itself keeps running in Sumo Logic."""
+
+
+class _SumoJobType:
+    """Describes the methods that start, check and collect the result of one kind of asynchronous job."""
+    def __init__(self, start, status, result = None, context = (), job_id_param = 'job_id', status_path = ('status',), succeeded = ('Success',), failed = ('Failed',)):
+        """
+        Args:
+            start: string, the client method starting the job.
+            status: string, the client method getting the job's status.
+            result: string, the client method getting the job's result, if it has one.
+            context: tuple, the arguments of the start method that the status and result methods also need.
+            job_id_param: string, the argument of the status and result methods taking the job identifier.
+            status_path: tuple, the keys leading to the status value in the status response.
+            succeeded: tuple, the status values of a job that finished successfully.
+            failed: tuple, the status values of a job that finished unsuccessfully.
+        """
+        self.start          = start
+        self.status         = status
+        self.result         = result
+        self.context        = context
+        self.job_id_param   = job_id_param
+        self.status_path    = status_path
+        self.succeeded      = succeeded
+        self.failed         = failed
+
+    def state(self, status_body):
+        """Get the status value of a status response, and whether the job succeeded (True), failed (False) or is
+        still running (None)."""
+        status = status_body
+        for key in self.status_path:
+            status = status.get(key) if isinstance(status, dict) else None
+        if status in self.succeeded:
+            return status, True
+        if status in self.failed:
+            return status, False
+        return status, None
+
+
+_JOB_TYPES = {
+    'content_export': _SumoJobType(
+        start       = 'start_content_export',
+        status      = 'get_content_export_status',
+        result      = 'get_content_export_result',
+        context     = ('content_id', 'is_admin_mode')
+    ),
+    'content_import': _SumoJobType(
+        start       = 'start_content_import',
+        status      = 'get_content_import_status',
+        context     = ('folder_id', 'is_admin_mode')
+    ),
+    'content_deletion': _SumoJobType(
+        start       = 'start_content_deletion',
+        status      = 'get_content_deletion_status',
+        context     = ('content_id', 'is_admin_mode')
+    ),
+    'content_copy': _SumoJobType(
+        start       = 'start_content_copy',
+        status      = 'get_content_copy_status',
+        context     = ('content_id', 'is_admin_mode')
+    ),
+    'global_folder': _SumoJobType(
+        start       = 'get_global_folder_job',
+        status      = 'get_global_folder_status',
+        result      = 'get_global_folder_result'
+    ),
+    'admin_recommended_folder': _SumoJobType(
+        start       = 'get_admin_recommended_folder_job',
+        status      = 'get_admin_recommended_folder_status',
+        result      = 'get_admin_recommended_folder_result'
+    ),
+    'app_install': _SumoJobType(
+        start       = 'install_app',
+        status      = 'get_app_install_status'
+    ),
+    'lookup_table_upload': _SumoJobType(
+        start       = 'upload_lookup_table_csv',
+        status      = 'get_lookup_table_upload_status'
+    ),
+    # Upgrade tasks report a numeric status: 2 is successful and 3 is failed, anything else is still pending.
+    'collector_upgrade': _SumoJobType(
+        start           = 'create_an_upgrade_or_downgrade_task',
+        status          = 'get_upgrade_task_status',
+        job_id_param    = 'upgrade_task_id',
+        status_path     = ('upgrade', 'status'),
+        succeeded       = (2,),
+        failed          = (3,)
+    )
+}
+
+
+class _JobPoll:
+    """The state of one wait on an asynchronous job: how long to wait before the next status check, and when to
+    give up."""
+    def __init__(self, job_type, job_id, timeout, cancel_event, initial_interval, max_interval, backoff = 1.5):
+        self.job_type       = job_type
+        self.job_id         = job_id
+        self.cancel_event   = cancel_event
+        self.__interval     = initial_interval
+        self.__max_interval = max_interval
+        self.__backoff      = backoff
+        self.__deadline     = None if timeout is None else time.monotonic() + timeout
+
+    def outcome(self, status_body):
+        """Check a status response, raising SumoJobError if the job failed. Returns True once the job succeeded."""
+        status, succeeded = _JOB_TYPES[self.job_type].state(status_body)
+        if succeeded is False:
+            raise SumoJobError(
+                '{0} job {1} failed: {2}'.format(self.job_type, self.job_id, status_body),
+                self.job_type,
+                self.job_id,
+                status_body
+            )
+        return bool(succeeded)
+
+    def next_wait(self):
+        """Get how long to wait before the next status check, raising if the wait has been cancelled or has run out
+        of time."""
+        self.check_cancelled()
+        wait = self.__interval
+        self.__interval = min(self.__max_interval, self.__interval * self.__backoff)
+        if self.__deadline is not None:
+            remaining = self.__deadline - time.monotonic()
+            if remaining <= 0:
+                raise SumoJobTimeout(
+                    '{0} job {1} did not finish in time.'.format(self.job_type, self.job_id),
+                    self.job_type,
+                    self.job_id
+                )
+            wait = min(wait, remaining)
+        return wait
+
+    def check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SumoJobCancelled(
+                'Waiting on {0} job {1} was cancelled.'.format(self.job_type, self.job_id),
+                self.job_type,
+                self.job_id
+            )
+
+
+
+class SumoClient:
+    def __init__(self, access_id, access_key, pool_connections = 10, pool_maxsize = 10, keep_alive = True, rate_limiter = None, retry_policy = None, family_retry_policies = None, validation = 'strict', deployment = None, endpoint_cache_path = None, endpoint_cache_ttl = 86400, etag_cache = None, read_cache = None, content_cache = None, json_codec = None, compress_requests = None, credential_pool = None, coalesce_requests = False, hedging = None, circuit_breaker = None):
+        """Create a client for the Sumo Logic API.
+
+        All API calls made by the client share a single pooled HTTP session, so TCP and TLS connections are reused
+        between calls rather than being re-established every time. Call close() when finished with the client, or use
+        it as a context manager.
+
+        Args:
+            access_id: string, the access ID of the Sumo Logic access key.
+            access_key: string, the secret of the Sumo Logic access key.
+            pool_connections: int, the number of per-host connection pools to keep.
+            pool_maxsize: int, the maximum number of connections to keep open to any single host.
+            keep_alive: bool, whether connections are kept open between requests.
+            rate_limiter: SumoRateLimiter, paces the requests made by the client. Defaults to the limiter shared by
+                every client using the same access ID; pass False to send requests without any pacing.
+            retry_policy: SumoRetryPolicy, how failed requests are retried. Defaults to SumoRetryPolicy(); pass False
+                to never retry.
+            family_retry_policies: dict, retry policies for specific API families, keyed by family name (ie -
+                'collectors', 'content', 'lookupTables'). A value of False disables retries for that family.
+            validation: string or SumoValidationPolicy, which payloads are validated against their schemas. Either
+                a policy, or the mode of a new policy ('strict', 'first-n', 'sampled' or 'off'). Methods that validate
+                payloads also take a validation argument to override the mode for a single call.
+            deployment: string, the deployment of the account (ie - 'au', 'us2') or its full API endpoint URL. When
+                not given, the endpoint is resolved from the API the first time it is needed.
+            endpoint_cache_path: string, a file caching resolved endpoints between processes. Pass True for
+                ~/.cache/py-sumologic/endpoints.json (under XDG_CACHE_HOME when it is set). By default endpoints are
+                only cached in memory, and nothing is written to disk.
+            endpoint_cache_ttl: int, the number of seconds an endpoint cached on disk is trusted for.
+            etag_cache: SumoETagCache, caches GET responses by ETag, so that unchanged objects are answered with 304
+                Not Modified instead of being downloaded again. Pass True for a new cache; disabled by default.
+            read_cache: SumoReadCache, answers repeated GETs of read-mostly endpoints without sending them, until
+                they expire or are invalidated by a write. Pass True for a new cache with the default times to live;
+                disabled by default.
+            content_cache: SumoContentCache, translates between content paths and IDs from the responses the client
+                has seen, for resolve_content_id and resolve_content_path. Pass True for a new cache; disabled by
+                default.
+            json_codec: module or object, encodes request bodies and decodes responses with its dumps and loads
+                functions (ie - orjson). Defaults to the standard library json module.
+            compress_requests: int, request bodies of at least this many bytes are sent gzip compressed. Disabled by
+                default. Responses are always requested compressed, and decompressed as they are read.
+            credential_pool: SumoCredentialPool, several access keys of the account to spread requests across, each
+                paced by its own shared limiter. When given, access_id and access_key may be None, and rate_limiter
+                defaults to False, so that it only applies when given as an extra limit over the whole client.
+            coalesce_requests: bool, whether identical GETs made at the same time (same URL, parameters and admin
+                mode) share a single request, every caller receiving the same response. Disabled by default.
+            hedging: SumoHedgingPolicy, sends a GET a second time when it is slow to be answered, using whichever
+                response arrives first. Pass True for a new policy with the default percentile and budget; disabled
+                by default.
+            circuit_breaker: SumoCircuitBreaker, fails requests to an API family with SumoCircuitOpen, without
+                sending them, while that family keeps failing. Pass True for a new breaker with the default
+                thresholds; disabled by default.
+        """
+        self.__credential_pool  = credential_pool
+        if credential_pool is None:
+            self.__access_id    = access_id
+            self.__auth_header  = _basic_auth_header(access_id, access_key)
+            self.__rate_limiter = SumoRateLimiter.shared(access_id) if rate_limiter is None else rate_limiter
+        else:
+            self.__access_id    = credential_pool.primary.access_id
+            self.__auth_header  = credential_pool.primary.auth_header
+            self.__rate_limiter = False if rate_limiter is None else rate_limiter
+        self.__session      = self.__create_session(pool_connections, pool_maxsize, keep_alive)
+        # The session holds pooled sockets, so it is closed again if a later argument turns out to be invalid.
+        try:
+            self.__retry_policy = SumoRetryPolicy() if retry_policy is None else retry_policy
+            self.__family_retry_policies = dict(family_retry_policies or {})
+            self.__retry_stats  = collections.Counter()
+            self.__retry_lock   = threading.Lock()
+            self.__validation_policy = validation if isinstance(validation, SumoValidationPolicy) else SumoValidationPolicy(validation)
+            self.__endpoint_cache_path  = _DEFAULT_ENDPOINT_CACHE_PATH if endpoint_cache_path is True else endpoint_cache_path
+            self.__endpoint_cache_ttl   = endpoint_cache_ttl
+            self.__resolved_endpoint    = None if deployment is None else _deployment_endpoint(deployment)
+            self.__etag_cache           = SumoETagCache() if etag_cache is True else etag_cache
+            self.__read_cache           = SumoReadCache() if read_cache is True else read_cache
+            self.__content_cache        = SumoContentCache() if content_cache is True else content_cache
+            self.__json_codec           = json if json_codec is None else json_codec
+            self.__compress_requests    = compress_requests
+            self.__transfer_stats       = collections.Counter()
+            self.__transfer_lock        = threading.Lock()
+            self.__coalesce_requests    = coalesce_requests
+            self.__coalesce_stats       = collections.Counter()
+            self.__flights              = {}
+            self.__flights_lock         = threading.Lock()
+            self.__hedging              = SumoHedgingPolicy() if hedging is True else hedging
+            self.__hedge_executor       = None
+            self.__hedge_workers        = 2 * pool_maxsize
+            self.__hedge_lock           = threading.Lock()
+            self.__circuit_breaker      = SumoCircuitBreaker() if circuit_breaker is True else circuit_breaker
+        except BaseException:
+            self.__session.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the client's HTTP session, releasing any pooled connections."""
+        self.__session.close()
+        with self.__hedge_lock:
+            if self.__hedge_executor is not None:
+                self.__hedge_executor.shutdown(wait = False)
+                self.__hedge_executor = None
+
+    @property
+    def rate_limiter(self):
+        """The SumoRateLimiter pacing this client's requests, or False when requests are not paced."""
+        return self.__rate_limiter
+
+    @property
+    def credential_pool(self):
+        """The SumoCredentialPool spreading this client's requests across access keys, including its statistics, or
+        None when the client uses a single key."""
+        return self.__credential_pool
+
+    @property
+    def hedging(self):
+        """The SumoHedgingPolicy deciding when this client's slow GETs are sent again, including its statistics, or
+        None."""
+        return self.__hedging
+
+    @property
+    def circuit_breaker(self):
+        """The SumoCircuitBreaker failing this client's requests fast while their API family is failing, including
+        its states, or None."""
+        return self.__circuit_breaker
+
+    @property
+    def retry_stats(self):
+        """The number of retries made by this client so far, keyed by API family."""
+        with self.__retry_lock:
+            return dict(self.__retry_stats)
+
+    @property
+    def etag_cache(self):
+        """The SumoETagCache answering this client's repeated GETs, including its statistics, or None."""
+        return self.__etag_cache
+
+    @property
+    def read_cache(self):
+        """The SumoReadCache answering this client's reads of read-mostly endpoints, including its statistics, or
+        None."""
+        return self.__read_cache
+
+    @property
+    def content_cache(self):
+        """The SumoContentCache translating between content paths and IDs, including its statistics, or None."""
+        return self.__content_cache
+
+    @property
+    def transfer_stats(self):
+        """The bytes this client has sent and received, before and after compression.
+
+        request_bytes and response_bytes count bodies as encoded and decoded by the client, while request_wire_bytes
+        and response_wire_bytes count them as sent over the network. bytes_saved is the difference, summed over both
+        directions, and requests_compressed the number of request bodies compressed.
+        """
+        with self.__transfer_lock:
+            stats = collections.Counter(
+                requests_compressed = 0,
+                request_bytes       = 0,
+                request_wire_bytes  = 0,
+                response_bytes      = 0,
+                response_wire_bytes = 0
+            )
+            stats.update(self.__transfer_stats)
+        stats['bytes_saved'] = stats['request_bytes'] - stats['request_wire_bytes'] + stats['response_bytes'] - stats['response_wire_bytes']
+        return dict(stats)
+
+    def _count_transfer(self, **counts):
+        """Add to the transfer statistics (ie - response_bytes = 1024)."""
+        with self.__transfer_lock:
+            self.__transfer_stats.update(counts)
+
+    def _count_response(self, response, decoded_bytes):
+        """Count a response whose body has been read, decoded_bytes long once decompressed. The bytes read from the
+        network are taken from the connection when it reports them, and otherwise from the Content-Length header."""
+        wire_bytes = getattr(getattr(response, 'raw', None), 'tell', lambda: None)()
+        if not isinstance(wire_bytes, int):
+            wire_bytes = int(response.headers.get('Content-Length') or decoded_bytes)
+        self._count_transfer(response_bytes = decoded_bytes, response_wire_bytes = wire_bytes)
+
+    @property
+    def coalesce_stats(self):
+        """How identical GETs made at the same time were coalesced: sent is the number of requests sent on behalf of
+        every caller waiting for them, and coalesced the number of duplicate requests avoided."""
+        with self.__flights_lock:
+            stats = collections.Counter(sent = 0, coalesced = 0)
+            stats.update(self.__coalesce_stats)
+        return dict(stats)
+
+    def _count_coalesce(self, outcome):
+        """Record that a GET was either sent or coalesced with an identical one in flight."""
+        with self.__flights_lock:
+            self.__coalesce_stats[outcome] += 1
+
+    def _coalesce(self, flight_key, send):
+        """Call send, unless an identical request is already in flight, in which case wait for and share its result.
+
+        Args:
+            flight_key: tuple, identifies identical requests (ie - from _request_cache_key).
+            send: callable, sends the request and returns its response.
+        """
+        with self.__flights_lock:
+            flight = self.__flights.get(flight_key)
+            if flight is None:
+                flight = self.__flights[flight_key] = concurrent.futures.Future()
+                self.__coalesce_stats['sent'] += 1
+                leader = True
+            else:
+                self.__coalesce_stats['coalesced'] += 1
+                leader = False
+        # Like a cache hit, each waiting caller gets a copy of its own, so that none of them sees another's changes.
+        if not leader:
+            response = flight.result()
+            return _copy_response(response, getattr(response, 'retries', 0))
+
+        # The flight ends before its result is shared, so callers arriving afterwards send a fresh request.
+        try:
+            response = send()
+        except BaseException as error:
+            with self.__flights_lock:
+                del self.__flights[flight_key]
+            flight.set_exception(error)
+            raise
+        with self.__flights_lock:
+            del self.__flights[flight_key]
+        flight.set_result(response)
+        return response
+
+    @property
+    def json_codec(self):
+        """The module or object encoding request bodies and decoding responses."""
+        return self.__json_codec
+
+    @property
+    def validation_policy(self):
+        """The SumoValidationPolicy deciding which payloads this client validates, including its statistics."""
+        return self.__validation_policy
+
+    def _retry_policy(self, request_url):
+        """Get the retry policy for a request URL, or False if requests to it are never retried."""
+        return self.__family_retry_policies.get(_api_family(request_url), self.__retry_policy)
+
+    def _count_retry(self, request_url):
+        """Record that a request to the given URL is being retried."""
+        with self.__retry_lock:
+            self.__retry_stats[_api_family(request_url)] += 1
+
+    def __create_session(self, pool_connections, pool_maxsize, keep_alive):
+        """Build the pooled HTTP session shared by every API call made by this client.
+
+        Args:
+            pool_connections: int, the number of per-host connection pools to keep.
+            pool_maxsize: int, the maximum number of connections to keep open to any single host.
+            keep_alive: bool, whether connections are kept open between requests.
+        """
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections    = pool_connections,
+            pool_maxsize        = pool_maxsize
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        # Without keep-alive the server is asked to close the connection once each response has been sent.
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def __execute_api(self, request_type, request_url, request_params = None, request_data = None, additional_headers = {}, stream = False, fresh = False):
         """Basic function to remove this snippet of code out of every other function.
 
         Args:
@@ -37,6 +2649,10 @@ class SumoClient:
             request_data: dict, any data that needs to be sent through the message body rather than through
                 parameters in the query string. Only required for POST, PUT, and PATCH.
             additional_headers: dict, any extra headers to add to the base auth headers.
+            stream: bool, whether the response body is left unread, to be streamed by the caller. Streamed requests
+                bypass the client's caches.
+            fresh: bool, whether a GET bypasses the read cache, for reads that must be current (ie - the ETag sent
+                back with an update).
         """
 
         # There are a specific set of request types that can be executed.
@@ -44,19 +2660,16 @@ class SumoClient:
         if request_type not in valid_types:
             raise ValueError('execute_api: request_type must be one of {0}.'.format(valid_types))   
 
+        # A client that cannot block to resolve its endpoint builds URLs on a placeholder, replaced once it is resolved.
+        if request_url.startswith(_PENDING_ENDPOINT):
+            path = request_url[len(_PENDING_ENDPOINT):]
+            return self._with_endpoint(
+                lambda endpoint: self.__execute_api(request_type, endpoint + path, request_params, request_data, additional_headers, stream, fresh)
+            )
+
         # Construct the auth header for regular API queries
         request_headers = {
-            'Authorization': 'Basic {0}'.format(
-                base64.b64encode(
-                    bytes(
-                        '{0}:{1}'.format(
-                            self.__access_id,
-                            self.__access_key
-                        ),
-                        'utf-8'
-                    )
-                ).decode('utf-8')
-            )
+            'Authorization': self.__auth_header
         }
 
         # If any data is being passed, it will need to have the Content-Type header set.
@@ -66,20 +2679,651 @@ class SumoClient:
         # If any API calls require additional headers, add them here.
         request_headers.update(additional_headers) 
 
+        # Requests without data are sent without a body, rather than with an encoded null.
+        request_body = None if request_data is None else self.__json_codec.dumps(request_data)
+
+        # Large bodies are compressed when the client is asked to, and responses are always asked to be compressed.
+        request_headers['Accept-Encoding'] = 'gzip, deflate'
+        if request_body is not None:
+            if isinstance(request_body, str):
+                request_body = request_body.encode('utf-8')
+            body_bytes = len(request_body)
+            if self.__compress_requests is not None and body_bytes >= self.__compress_requests:
+                compressor                          = _COMPRESSORS['gzip']()
+                request_body                        = compressor.compress(request_body) + compressor.flush()
+                request_headers['Content-Encoding'] = 'gzip'
+                self._count_transfer(requests_compressed = 1)
+            self._count_transfer(request_bytes = body_bytes, request_wire_bytes = len(request_body))
+
+        # A streamed body is read by the caller, so it cannot be cached or inspected on the way through.
+        if stream:
+            return self._send_request(
+                request_type    = request_type,
+                request_url     = request_url,
+                request_params  = request_params,
+                request_body    = request_body,
+                request_headers = request_headers,
+                stream          = True
+            )
+
+        # Identical GETs already in flight are answered by that request instead of being sent again. A GET that must be
+        # fresh is not, since the request in flight may be answered from the read cache.
+        if self.__coalesce_requests and request_type == 'GET' and not fresh:
+            return self._coalesce(
+                _request_cache_key(request_url, request_params, request_headers),
+                lambda: self.__dispatch(request_type, request_url, request_params, request_body, request_headers)
+            )
+
+        return self.__dispatch(request_type, request_url, request_params, request_body, request_headers, fresh)
+
+    def __dispatch(self, request_type, request_url, request_params, request_body, request_headers, fresh = False):
+        # Reads still fresh in the read cache are not sent at all, and writes drop whatever they may have made stale.
+        # Reads of paths the cache never keeps (ie - job status polls) skip it, and do not count as misses.
+        if self.__read_cache and request_type == 'GET' and not fresh and self.__read_cache.ttl(request_url) is not None:
+            cache_key   = _request_cache_key(request_url, request_params, request_headers)
+            cached      = self.__read_cache.get(cache_key)
+            if cached is not None:
+                return self._resolved(_copy_response(cached, 0))
+            generation  = self.__read_cache.generation
+            return self._chain(
+                self.__send(request_type, request_url, request_params, request_body, request_headers),
+                lambda response: self.__read_cache.store(cache_key, response, generation)
+            )
+        if self.__read_cache and request_type in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            return self._chain(
+                self.__send(request_type, request_url, request_params, request_body, request_headers),
+                lambda response: self.__read_cache.invalidate(request_url, response)
+            )
+
+        return self.__send(request_type, request_url, request_params, request_body, request_headers)
+
+    def __send(self, request_type, request_url, request_params, request_body, request_headers):
+        # Content responses teach the content cache paths and IDs, or tell it what has moved.
+        if self.__content_cache and '/content/' in request_url:
+            return self._chain(
+                self.__send_conditionally(request_type, request_url, request_params, request_body, request_headers),
+                lambda response: self.__content_cache.observe(request_type, request_url, request_params, response)
+            )
+        return self.__send_conditionally(request_type, request_url, request_params, request_body, request_headers)
+
+    def __send_conditionally(self, request_type, request_url, request_params, request_body, request_headers):
+        # A GET for a response already cached by ETag only needs the body again if it has changed.
+        if request_type == 'GET' and self.__etag_cache:
+            cache_key   = _request_cache_key(request_url, request_params, request_headers)
+            cached      = self.__etag_cache.get(cache_key)
+            if cached is not None:
+                request_headers['If-None-Match'] = cached.headers['ETag']
+            return self._chain(
+                self._send_request(
+                    request_type    = request_type,
+                    request_url     = request_url,
+                    request_params  = request_params,
+                    request_body    = request_body,
+                    request_headers = request_headers
+                ),
+                lambda response: self.__etag_cache.resolve(cache_key, cached, response)
+            )
+
         # Execute the request, and return the JSON payload.
-        return requests.request(
-            method  = request_type,
-            url     = request_url,
-            params  = request_params,
-            data    = json.dumps(request_data),
-            headers = request_headers
+        return self._send_request(
+            request_type    = request_type,
+            request_url     = request_url,
+            request_params  = request_params,
+            request_body    = request_body,
+            request_headers = request_headers
         )
+
+    def _send_request(self, request_type, request_url, request_params, request_body, request_headers, stream = False):
+        """Send a fully prepared request over the client's pooled session, retrying it as its retry policy allows.
+
+        This is the single point where API requests leave the client. AsyncSumoClient overrides it to send requests
+        on an asyncio event loop instead. The number of retries made is available as the retries attribute of the
+        returned response.
+
+        Args:
+            request_type: string, what type of request is being made (ie - GET, POST, DELETE).
+            request_url: string, the target API URL.
+            request_params: dict, any data that needs to be sent through a query string.
+            request_body: string, the encoded message body.
+            request_headers: dict, the complete set of request headers.
+            stream: bool, whether to return as soon as the response headers arrive, leaving the body unread.
+        """
+        retry_policy    = self._retry_policy(request_url)
+        attempt         = 0
+        delay           = 0
+        while True:
+            try:
+                response = self.__send_attempt(request_type, request_url, request_params, request_body, request_headers, stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not retry_policy or not retry_policy.should_retry(request_type, attempt):
+                    raise
+                response_headers = None
+            else:
+                if not retry_policy or not retry_policy.should_retry(request_type, attempt, response.status_code):
+                    response.retries = attempt
+                    if not stream:
+                        self._count_response(response, len(response.content))
+                    if self.__json_codec is not json:
+                        response.json = lambda **kwargs: _decode_json(self.__json_codec, response.content, **kwargs)
+                    return response
+                response_headers = response.headers
+                response.close()
+
+            delay = retry_policy.next_delay(delay, response_headers)
+            self._count_retry(request_url)
+            time.sleep(delay)
+            attempt += 1
+
+    def __send_attempt(self, request_type, request_url, request_params, request_body, request_headers, stream):
+        # Every attempt, retries included, has to be admitted by the circuit of its API family.
+        breaker = self.__circuit_breaker
+        if not breaker:
+            return self.__send_hedged(request_type, request_url, request_params, request_body, request_headers, stream)
+        ticket      = breaker.acquire(request_url)
+        succeeded   = None
+        try:
+            response    = self.__send_hedged(request_type, request_url, request_params, request_body, request_headers, stream)
+            succeeded   = response.status_code not in breaker.failure_statuses
+            return response
+        except requests.exceptions.RequestException:
+            succeeded = False
+            raise
+        finally:
+            breaker.release(ticket, succeeded)
+
+    def __send_hedged(self, request_type, request_url, request_params, request_body, request_headers, stream):
+        # Slow GETs are sent a second time once they exceed their hedging delay, and the first response wins.
+        hedging = self.__hedging
+        if stream or not hedging or not hedging.applies(request_type, request_url):
+            return self.__send_once(request_type, request_url, request_params, request_body, request_headers, stream)
+
+        # Latencies and the hedging delay are timed from when the first attempt is admitted by the limiters, so time
+        # spent queueing locally never counts as the API being slow.
+        delay       = hedging.hedge_delay(request_url)
+        admitted    = threading.Event()
+        started     = []
+
+        def admit():
+            started.append(time.monotonic())
+            admitted.set()
+
+        def send_first(slots = None):
+            response = self.__send_once(request_type, request_url, request_params, request_body, request_headers, admitted = admit, slots = slots)
+            hedging.record(request_url, time.monotonic() - started[0])
+            return response
+
+        if delay is None:
+            return send_first()
+        executor    = self.__get_hedge_executor()
+        slots       = [_AttemptSlots()]
+        attempts    = [executor.submit(send_first, slots[0])]
+        winner      = None
+        attempts[0].add_done_callback(lambda attempt: admitted.set())
+        try:
+            admitted.wait()
+            done, _ = concurrent.futures.wait(attempts, timeout = max(0.0, started[0] + delay - time.monotonic()) if started else 0)
+            if not done and hedging.try_hedge():
+                slots.append(_AttemptSlots())
+                attempts.append(executor.submit(
+                    self.__send_once, request_type, request_url, request_params, request_body, request_headers, slots = slots[1]
+                ))
+            pending = set(attempts)
+            while winner is None and pending:
+                done, pending = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+                winner = next((attempt for attempt in attempts if attempt in done and attempt.exception() is None), None)
+            if winner is None:
+                return attempts[0].result()
+            if winner is not attempts[0]:
+                hedging.count_hedge_won()
+            return winner.result()
+        finally:
+            # A losing attempt that is in flight cannot be interrupted, but it stops counting against the limiters
+            # straight away, is never sent if it is still queued, and has its response closed whenever it arrives.
+            for attempt, attempt_slots in zip(attempts, slots):
+                if attempt is not winner:
+                    attempt_slots.abandon()
+                    attempt.cancel()
+                    attempt.add_done_callback(lambda attempt: attempt.cancelled() or attempt.exception() is None and attempt.result().close())
+
+    def __get_hedge_executor(self):
+        # Attempts are only run on threads of their own once hedging has latencies to work from.
+        with self.__hedge_lock:
+            if self.__hedge_executor is None:
+                self.__hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers         = self.__hedge_workers,
+                    thread_name_prefix  = 'sumo-hedge'
+                )
+            return self.__hedge_executor
+
+    def __send_once(self, request_type, request_url, request_params, request_body, request_headers, stream = False, admitted = None, slots = None):
+        # A key the API rejects is quarantined by the pool, so the request is sent again with another while one is left.
+        while True:
+            response = self.__send_with_key(request_type, request_url, request_params, request_body, request_headers, stream, admitted, slots)
+            if response.status_code != 401 or not self.__credential_pool or not self.__credential_pool.available:
+                return response
+            response.close()
+
+    def __send_with_key(self, request_type, request_url, request_params, request_body, request_headers, stream, admitted, slots = None):
+        credential = self.__credential_pool.acquire() if self.__credential_pool else None
+        if credential:
+            request_headers = dict(request_headers, Authorization = credential.auth_header)
+        limiters = [limiter for limiter in (self.__rate_limiter, credential and credential.limiter) if limiter]
+        slots    = slots or _AttemptSlots()
+        response = None
+        try:
+            for limiter in limiters:
+                slots.acquire(limiter)
+            if slots.abandoned:
+                raise concurrent.futures.CancelledError()
+            if admitted:
+                admitted()
+            response = self.__session.request(
+                method  = request_type,
+                url     = request_url,
+                params  = request_params,
+                data    = request_body,
+                headers = request_headers,
+                stream  = stream
+            )
+            # A streamed body is still to be transferred, so its slots are only released once it is read or closed.
+            if stream:
+                _release_when_read(response, slots.release)
+                slots = None
+            return response
+        finally:
+            if slots:
+                slots.release()
+            if credential:
+                self.__credential_pool.release(
+                    credential,
+                    None if response is None else response.status_code,
+                    None if response is None else response.headers
+                )
+
+    def _iterate_pages(self, fetch_page, prefetch = False):
+        """Yield the items of a token-paginated listing across all of its pages.
+
+        Only the current page is kept in memory. With prefetch, the request for the next page is sent from a
+        background thread as soon as its token is known, so that it is in flight while the current page is consumed.
+        AsyncSumoClient overrides this to return an asynchronous iterator instead.
+
+        Args:
+            fetch_page: callable, receives a pagination token (None for the first page) and returns the response.
+            prefetch: bool, whether to request the next page while the current one is being consumed.
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1) if prefetch else None
+        try:
+            response = fetch_page(None)
+            while True:
+                response.raise_for_status()
+                page        = response.json()
+                token       = page.get('next')
+                next_page   = executor.submit(fetch_page, token) if token and executor else None
+                yield from page.get('data', [])
+                if not token:
+                    return
+                page        = None
+                response    = next_page.result() if next_page else fetch_page(token)
+        finally:
+            if executor:
+                executor.shutdown(wait = False)
+
+    def _iterate_offset_pages(self, fetch_page, items_key, page_size, concurrency = 4, ordered = True):
+        """Yield the items of an offset-paginated listing, fetching several of its pages at once.
+
+        Pages are requested from a pool of concurrency threads, and every request still goes through the client's
+        rate limiter. AsyncSumoClient overrides this to return an asynchronous iterator instead.
+
+        Args:
+            fetch_page: callable, receives an offset and a limit and returns the response for that page.
+            items_key: string, the key of the list of items in each page's JSON.
+            page_size: int, the number of items to request per page.
+            concurrency: int, the maximum number of pages requested at once.
+            ordered: bool, whether items are yielded in listing order, or page by page as each page arrives.
+        """
+        pager       = _OffsetPager(page_size, concurrency, ordered)
+        executor    = concurrent.futures.ThreadPoolExecutor(max_workers = concurrency)
+        pending     = {}
+        try:
+            while True:
+                for offset in pager.offsets_to_fetch():
+                    pending[executor.submit(fetch_page, offset, page_size)] = offset
+                if not pending:
+                    return
+
+                done, _ = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    offset      = pending.pop(future)
+                    response    = future.result()
+                    response.raise_for_status()
+                    for items in pager.page_fetched(offset, response.json().get(items_key, [])):
+                        yield from items
+        finally:
+            executor.shutdown(wait = False, cancel_futures = True)
+
+    def batch(self, calls, concurrency = 8, as_completed = False, return_exceptions = True):
+        """Run many client calls at once, over a pool of concurrency workers.
+
+        Every call still goes through the client's rate limiter, so the batch never runs faster than the limiter
+        allows. By default the results come back as a list in the same order as calls, with the exception a call
+        raised in place of its result. With as_completed, an iterator of (index, result) pairs is returned instead,
+        yielding each result as soon as its call finishes.
+
+        Args:
+            calls: iterable, (method, args) or (method, args, kwargs) tuples, where method is a client method name
+                (ie - 'get_collector_by_id') or any callable.
+            concurrency: int, the maximum number of calls running at once.
+            as_completed: bool, whether to stream (index, result) pairs as calls finish, rather than return a list.
+            return_exceptions: bool, whether a call's exception takes the place of its result, rather than being
+                raised (which also stops the remaining calls).
+        """
+        if concurrency < 1:
+            raise ValueError('batch: concurrency must be at least 1.')
+        return self._run_batch(calls, concurrency, as_completed, return_exceptions)
+
+    def map(self, method, *iterables, concurrency = 8, as_completed = False, return_exceptions = True):
+        """Call one client method for every item of one or more iterables at once, like the map builtin.
+
+        ie - client.map('delete_source', collector_ids, source_ids) calls delete_source(collector_id, source_id) for
+        each pair of IDs. See batch for the meaning of the other arguments and what is returned.
+
+        Args:
+            method: string or callable, the client method name (ie - 'get_collector_by_id') or callable to call.
+            iterables: the positional arguments of each call, one iterable per argument.
+        """
+        return self.batch(
+            ((method, args) for args in zip(*iterables)),
+            concurrency         = concurrency,
+            as_completed        = as_completed,
+            return_exceptions   = return_exceptions
+        )
+
+    def _run_batch(self, calls, concurrency, as_completed, return_exceptions):
+        """Run a batch on a thread pool. AsyncSumoClient overrides this to run it on the event loop instead."""
+        completed = self.__run_calls(calls, concurrency, return_exceptions)
+        return completed if as_completed else _ordered_results(completed)
+
+    def __run_calls(self, calls, concurrency, return_exceptions):
+        """Yield an (index, result) pair for each call of a batch as it finishes.
+
+        Calls are only taken from the iterable as workers free up, so a long generator of calls is never held in
+        memory all at once.
+        """
+        calls       = enumerate(calls)
+        executor    = concurrent.futures.ThreadPoolExecutor(max_workers = concurrency)
+        pending     = {}
+        try:
+            while True:
+                for index, call in itertools.islice(calls, 2 * concurrency - len(pending)):
+                    pending[executor.submit(_invoke_call, self, call)] = index
+                if not pending:
+                    return
+
+                done, _ = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        if not return_exceptions:
+                            raise
+                        result = error
+                    yield index, result
+        finally:
+            executor.shutdown(wait = False, cancel_futures = True)
+
+    def _build_inventory(self, collectors, fetch_sources, concurrency):
+        """Fetch every listed Collector's Sources on a thread pool while the listing continues, and return the
+        snapshot. AsyncSumoClient overrides this to do the same on the event loop.
+
+        Args:
+            collectors: iterable, the Collectors, as yielded by iter_collectors.
+            fetch_sources: callable, receives a Collector ID and returns its list_sources response.
+            concurrency: int, the maximum number of list_sources requests running at once.
+        """
+        builder = _InventoryBuilder()
+
+        def calls():
+            for collector in collectors:
+                builder.collector_listed(collector)
+                yield fetch_sources, (collector['id'],)
+
+        for index, response in self.batch(calls(), concurrency = concurrency, as_completed = True):
+            builder.sources_fetched(index, response)
+        return builder.snapshot()
+
+    def run_job(self, job_type, timeout = None, cancel_event = None, initial_interval = 0.25, max_interval = 10.0, **kwargs):
+        """Start an asynchronous job, wait for it to finish, and return its result.
+
+        Args:
+            job_type: string, the kind of job, one of 'content_export', 'content_import', 'content_deletion',
+                'content_copy', 'global_folder', 'admin_recommended_folder', 'app_install', 'lookup_table_upload'
+                or 'collector_upgrade'.
+            timeout: float, the number of seconds to wait before raising SumoJobTimeout, or None to wait forever.
+            cancel_event: threading.Event, stops the wait with SumoJobCancelled as soon as it is set. AsyncSumoClient
+                also accepts an asyncio.Event.
+            initial_interval: float, the number of seconds before the first status check.
+            max_interval: float, the longest number of seconds between two status checks.
+            kwargs: the keyword arguments of the method starting the job (ie - content_id for 'content_export').
+        """
+        job = self.__job_type(job_type)
+        self._check_cancel_event(cancel_event)
+
+        def wait_for_started_job(response):
+            response.raise_for_status()
+            return self.wait_for_job(
+                job_type,
+                response.json()['id'],
+                timeout             = timeout,
+                cancel_event        = cancel_event,
+                initial_interval    = initial_interval,
+                max_interval        = max_interval,
+                **{name: kwargs[name] for name in job.context if name in kwargs}
+            )
+
+        return self._chain(
+            getattr(self, job.start)(**kwargs),
+            wait_for_started_job
+        )
+
+    def wait_for_job(self, job_type, job_id, timeout = None, cancel_event = None, initial_interval = 0.25, max_interval = 10.0, **context):
+        """Poll an asynchronous job until it finishes, and return its result.
+
+        The result is the response of the job's result method for jobs that have one (content export and the global
+        and Admin Recommended folders), and the final status response for the others. Status checks start after
+        initial_interval seconds, and the interval then grows by half each time up to max_interval.
+
+        Args:
+            job_type: string, the kind of job (see run_job).
+            job_id: string, the identifier of the job.
+            timeout: float, the number of seconds to wait before raising SumoJobTimeout, or None to wait forever.
+            cancel_event: threading.Event, stops the wait with SumoJobCancelled as soon as it is set. AsyncSumoClient
+                also accepts an asyncio.Event.
+            initial_interval: float, the number of seconds before the first status check.
+            max_interval: float, the longest number of seconds between two status checks.
+            context: the other arguments the job's status method needs (ie - content_id and is_admin_mode).
+        """
+        job = self.__job_type(job_type)
+        self._check_cancel_event(cancel_event)
+        context[job.job_id_param] = job_id
+
+        def fetch_status():
+            return getattr(self, job.status)(**context)
+
+        def fetch_result():
+            return getattr(self, job.result)(**context)
+
+        return self._poll_job(
+            _JobPoll(job_type, job_id, timeout, cancel_event, initial_interval, max_interval),
+            fetch_status,
+            fetch_result if job.result else None
+        )
+
+    def __job_type(self, job_type):
+        if job_type not in _JOB_TYPES:
+            raise ValueError('job_type must be one of {0}.'.format(list(_JOB_TYPES)))
+        return _JOB_TYPES[job_type]
+
+    def _check_cancel_event(self, cancel_event):
+        """Reject a cancel event that cannot be waited on by this client, before any job is started. AsyncSumoClient
+        overrides this to also accept asyncio events."""
+        if isinstance(cancel_event, asyncio.Event):
+            raise TypeError('wait_for_job: SumoClient needs a threading.Event as cancel_event, not an asyncio.Event.')
+
+    def _poll_job(self, poll, fetch_status, fetch_result):
+        """Check a job's status until it finishes, sleeping between checks. AsyncSumoClient overrides this to poll
+        on the event loop instead.
+
+        Args:
+            poll: _JobPoll, the state of the wait.
+            fetch_status: callable, returns the job's status response.
+            fetch_result: callable, returns the job's result response, or None if the job has no result.
+        """
+        while True:
+            wait = poll.next_wait()
+            if poll.cancel_event is not None:
+                poll.cancel_event.wait(wait)
+                poll.check_cancelled()
+            else:
+                time.sleep(wait)
+
+            response = fetch_status()
+            response.raise_for_status()
+            if poll.outcome(response.json()):
+                return fetch_result() if fetch_result else response
+
+    def _resolved(self, response):
+        """Return a result that is already available, such as a cached response, the way API methods return their
+        results. AsyncSumoClient overrides this to wrap it in a coroutine."""
+        return response
+
+    def download(self, response, destination, compression = None, chunk_size = 65536):
+        """Write the body of a streamed response to a file as it arrives, without holding it in memory.
+
+        ie - client.download(client.get_content_export_result(content_id, job_id, stream = True), 'export.json.gz',
+        compression = 'gzip'). The response is closed afterwards, whether or not the download succeeds, and even if
+        the arguments are invalid.
+
+        Returns a dictionary with the destination path (None for a file object), the number of bytes and SHA-256 of
+        the body as received, and the number of bytes written after compression.
+
+        Args:
+            response: requests.Response, a response requested with stream=True.
+            destination: string or file object, the path to write to, or a writable binary file object.
+            compression: string, compresses the body as it is written, one of 'gzip', 'bz2' or 'xz'.
+            chunk_size: int, the number of bytes read from the response at a time.
+        """
+        # An invalid compression or an unwritable destination must not leak the streamed connection.
+        try:
+            sink = _DownloadSink(destination, compression)
+        except BaseException:
+            response.close()
+            raise
+        return self._download(response, sink, chunk_size)
+
+    def _download(self, response, sink, chunk_size):
+        """Copy a streamed response into a download sink. AsyncSumoClient overrides this to read the response on the
+        event loop."""
+        try:
+            response.raise_for_status()
+            received = 0
+            for chunk in response.iter_content(chunk_size = chunk_size):
+                received += len(chunk)
+                sink.write(chunk)
+            self._count_response(response, received)
+            return sink.finish()
+        except BaseException:
+            sink.abort()
+            raise
+        finally:
+            response.close()
+
+    def _iterate_json_items(self, response, path):
+        """Yield the items of the JSON array at path in a streamed response, parsing them as the body arrives. The
+        response is closed once the items are exhausted or the iterator is. AsyncSumoClient overrides this to return
+        an asynchronous iterator instead.
+
+        Args:
+            response: requests.Response, a response requested with stream=True.
+            path: tuple, the keys leading to the array (ie - ('data',)).
+        """
+        try:
+            response.raise_for_status()
+            parser      = _JSONItemStream(path)
+            received    = 0
+            for chunk in response.iter_content(chunk_size = 65536):
+                received += len(chunk)
+                yield from parser.feed(chunk)
+            self._count_response(response, received)
+            yield from parser.feed(b'', final = True)
+        finally:
+            response.close()
+
+    def _chain(self, response, callback):
+        """Hand the response of one API call to a follow-up step that depends on it.
+
+        Methods that need one API call to complete before making the next (such as fetching an ETag before an update)
+        go through this so that the same method body works for both SumoClient and AsyncSumoClient.
+
+        Args:
+            response: the value returned by the first API call.
+            callback: callable, receives the response and returns the result of the follow-up step.
+        """
+        return callback(response)
     
+    @property
+    def endpoint(self):
+        """The API endpoint of the account's deployment, resolved the first time it is needed."""
+        if self.__resolved_endpoint is None:
+            return self._resolve_endpoint()
+        return self.__resolved_endpoint
+
+    # Every API method builds its URL from self.__endpoint.
+    __endpoint = endpoint
+
+    def _resolve_endpoint(self):
+        """Resolve the endpoint of a client that has not needed it yet, blocking until it is known.
+
+        AsyncSumoClient overrides this, as it must not block the event loop.
+        """
+        self.__resolved_endpoint = _endpoint_resolver.resolve(
+            access_id   = self.__access_id,
+            fetch       = self.__get_geo_endpoint,
+            cache_path  = self.__endpoint_cache_path,
+            cache_ttl   = self.__endpoint_cache_ttl
+        )
+        return self.__resolved_endpoint
+
+    def _with_endpoint(self, execute):
+        """Call execute with the client's endpoint once it is resolved, returning what it returns.
+
+        Args:
+            execute: callable, receives the endpoint and sends the request.
+        """
+        return execute(self.endpoint)
+
+    def _endpoint_resolution(self):
+        """Get what is needed to resolve this client's endpoint (its access ID, auth header and cache settings), or
+        None if the endpoint is already known."""
+        if self.__resolved_endpoint is not None:
+            return None
+        return self.__access_id, self.__auth_header, self.__endpoint_cache_path, self.__endpoint_cache_ttl
+
+    def _use_endpoint(self, endpoint):
+        """Use an endpoint resolved outside of the endpoint property, without remembering it for other clients."""
+        self.__resolved_endpoint = endpoint
+
     def __get_geo_endpoint(self):
-        return self.__execute_api(
-            request_type    = 'GET',
-            request_url     = 'https://api.sumologic.com/api'
-        ).url
+        # The default endpoint redirects to the endpoint of the account's deployment.
+        response = self.__session.request(
+            method  = 'GET',
+            url     = _DEFAULT_API_ENDPOINT,
+            headers = {
+                'Authorization': self.__auth_header
+            }
+        )
+        with response:
+            return _probed_endpoint(response.url, response.status_code, bool(response.history))
 
     def __generate_path_param_string(self, path_params):
         arg_array = []
@@ -88,12 +3332,12 @@ class SumoClient:
         arg_string = '&'.join(filter(None, arg_array))
         return arg_string
 
-    def __is_json_valid(self, json, schema):
-        try:
-            jsonschema.validate(instance=json, schema=schema)
-        except jsonschema.exceptions.ValidationError:
-            return False
-        return True
+    def __validate_json(self, schema_name, instance, validation = None):
+        # A per-call validation argument is either a mode for the client's policy, or a policy of its own.
+        if isinstance(validation, SumoValidationPolicy):
+            validation.validate(schema_name, instance)
+        else:
+            self.__validation_policy.validate(schema_name, instance, validation)
 
 
     # # # ==================================================
@@ -113,38 +3357,39 @@ class SumoClient:
     Path:   /collectors
     https://help.sumologic.com/APIs/01Collector-Management-API/Collector-API-Methods-and-Examples#list-collectors
     """
-    def list_collectors(self, path_params = {}):
-        path_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'aliveBeforeDays': {
-                    'type': 'integer',
-                    'minimum': 1
-                },
-                'limit': {
-                    'type': 'integer'
-                },
-                'offset': {
-                    'type': 'integer'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = path_params,
-            schema          = path_params_schema
-        )
+    def list_collectors(self, path_params = {}, validation = None):
+        self.__validate_json('collector_list_params', path_params, validation)
         request_url = '{0}/v1/collectors'.format(
             self.__endpoint
         )
+        request_url = '{0}?{1}'.format(
+            request_url,
+            self.__generate_path_param_string(path_params)
+        )
         return self.__execute_api(
             request_type    = 'GET',
             request_url     = request_url
         )
 
 
+    """ Iterate over all Collectors.
+    Yields every Collector, requesting up to concurrency pages of list_collectors at once. Collectors come in the
+    same order as list_collectors returns them, or with ordered=False each page is yielded as soon as it arrives. The
+    listing ends at the first page with fewer than page_size Collectors.
+
+    Method: GET
+    Path:   /collectors
+    """
+    def iter_collectors(self, path_params = {}, page_size = 1000, concurrency = 4, ordered = True):
+        return self._iterate_offset_pages(
+            lambda offset, limit: self.list_collectors(dict(path_params, offset = offset, limit = limit)),
+            'collectors',
+            page_size,
+            concurrency,
+            ordered
+        )
+
+
     """ List Offline Collectors
     Get a list of Installed Collectors last seen alive before a specified number of days with an optional limit and
     offset.
@@ -153,29 +3398,8 @@ class SumoClient:
     Path:   /collectors/offline
     https://help.sumologic.com/APIs/01Collector-Management-API/Collector-API-Methods-and-Examples#list-offline-collectors
     """
-    def list_offline_collectors(self, path_params = {}):
-        path_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'aliveBeforeDays': {
-                    'type': 'integer',
-                    'minimum': 1
-                },
-                'limit': {
-                    'type': 'integer'
-                },
-                'offset': {
-                    'type': 'integer'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = path_params,
-            schema          = path_params_schema
-        )
+    def list_offline_collectors(self, path_params = {}, validation = None):
+        self.__validate_json('collector_list_params', path_params, validation)
 
         request_url = '{0}/v1/collectors/offline'.format(
             self.__endpoint
@@ -190,6 +3414,23 @@ class SumoClient:
         )
 
 
+    """ Iterate over all offline Collectors.
+    Yields every Installed Collector last seen alive before the given number of days, requesting up to concurrency
+    pages of list_offline_collectors at once, either in order or as each page arrives.
+
+    Method: GET
+    Path:   /collectors/offline
+    """
+    def iter_offline_collectors(self, path_params = {}, page_size = 1000, concurrency = 4, ordered = True):
+        return self._iterate_offset_pages(
+            lambda offset, limit: self.list_offline_collectors(dict(path_params, offset = offset, limit = limit)),
+            'collectors',
+            page_size,
+            concurrency,
+            ordered
+        )
+
+
     """ Get Collector by ID 
     Get the Collector with the specified Identifier.
 
@@ -247,72 +3488,8 @@ class SumoClient:
     Path:   /collectors
     https://help.sumologic.com/APIs/01Collector-Management-API/Collector-API-Methods-and-Examples#create-hosted-collector
     """
-    def create_hosted_collector(self, collector_data):
-        collector_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'category': {
-                    'type': 'string'
-                },
-                'collectorType': {
-                    'type': 'string',
-                    'enum': [
-                        'Hosted'
-                    ]
-                },
-                'cutoffRelativeTime': {
-                    'type': 'string'
-                },
-                'cutoffTimestamp': {
-                    'type': 'integer'
-                },
-                'description': {
-                    'type': 'sring'
-                },
-                'ephemeral': {
-                    'type': 'boolean'
-                },
-                'fields': {
-                    'type': 'object'
-                },
-                'hostName': {
-                    'type': 'string'
-                },
-                'name': {
-                    'type': 'string'
-                },
-                'sourceSyncMode': {
-                    'type': 'string',
-                    'enum': [
-                        'Json',
-                        'UI'
-                    ]
-                },
-                'timeZone': {
-                    'type': 'string'
-                },
-                'targetCpu': {
-                    'type': 'integer'
-                }
-            },
-            'required': [
-                'collectorType',
-                'ephemeral',
-                'name'
-            ],
-            'not': {
-                'required': [
-                    'cutoffRelativeTime',
-                    'cutoffTimestamp'
-                ] 
-            },
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = collector_data,
-            schema          = collector_schema
-        )
+    def create_hosted_collector(self, collector_data, validation=None):
+        self.__validate_json('hosted_collector', collector_data, validation)
         request_url = '{0}/v1/collectors'.format(
             self.__endpoint
         )
@@ -335,69 +3512,35 @@ class SumoClient:
     Path:   /collectors/{collector_id}
     https://help.sumologic.com/APIs/01Collector-Management-API/Collector-API-Methods-and-Examples#update%C2%A0a-collector
     """
-    def update_collector(self, collector_id, collector_updates):
-        update_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'category': {
-                    'type': 'string'
-                },
-                'cutoffTimestamp': {
-                    'type': 'integer'
-                },
-                'description': {
-                    'type': 'sring'
-                },
-                'ephemeral': {
-                    'type': 'boolean'
-                },
-                'fields': {
-                    'type': 'object'
-                },
-                'hostName': {
-                    'type': 'string'
-                },
-                'name': {
-                    'type': 'string'
-                },
-                'sourceSyncMode': {
-                    'type': 'string',
-                    'enum': [
-                        'Json',
-                        'UI'
-                    ]
-                },
-                'timeZone': {
-                    'type': 'string'
-                },
-                'targetCpu': {
-                    'type': 'integer'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = collector_updates,
-            schema      = update_schema
-        )
+    def update_collector(self, collector_id, collector_updates, validation=None):
+        self.__validate_json('collector_updates', collector_updates, validation)
 
-        collector = self.get_collector_by_id(collector_id).json()
-        collector['collector'].update(collector_updates)
+        def apply_updates(response):
+            collector = response.json()
+            collector['collector'].update(collector_updates)
 
-        request_url = '{0}/v1/collectors/{1}'.format(
-            self.__endpoint,
-            collector_id
-        )
-        additional_headers = {
-            'If-Match': collector.headers['ETag']
-        }
-        return self.__execute_api(
-            request_type        = 'PUT',
-            request_url         = request_url,
-            additional_headers  = additional_headers,
-            request_data        = collector
+            request_url = '{0}/v1/collectors/{1}'.format(
+                self.__endpoint,
+                collector_id
+            )
+            additional_headers = {
+                'If-Match': response.headers['ETag']
+            }
+            return self.__execute_api(
+                request_type        = 'PUT',
+                request_url         = request_url,
+                additional_headers  = additional_headers,
+                request_data        = collector
+            )
+
+        # The ETag must be current, or the update fails with 412, so the read cache is bypassed.
+        return self._chain(
+            self.__execute_api(
+                request_type    = 'GET',
+                request_url     = '{0}/v1/collectors/{1}'.format(self.__endpoint, collector_id),
+                fresh           = True
+            ),
+            apply_updates
         )
 
 
@@ -426,23 +3569,8 @@ class SumoClient:
     Path:   /collectors/offline
     https://help.sumologic.com/APIs/01Collector-Management-API/Collector-API-Methods-and-Examples#delete-offline-collectors
     """
-    def delete_offline_collectors(self, path_params = {}):
-        path_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'aliveBeforeDays': {
-                    'type': 'integer',
-                    'minimum': 1
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = path_params,
-            schema          = path_params_schema
-        )
+    def delete_offline_collectors(self, path_params = {}, validation = None):
+        self.__validate_json('offline_collector_params', path_params, validation)
         request_url = '{0}/v1/collectors/offline'.format(
             self.__endpoint
         )
@@ -469,22 +3597,8 @@ class SumoClient:
     Path:   /collectors/{collector_id}/sources
     https://help.sumologic.com/APIs/01Collector-Management-API/Source-API#list%C2%A0sources
     """
-    def list_sources(self, collector_id, path_params = {}):
-        path_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'download': {
-                    'type': 'boolean'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = path_params,
-            schema          = path_params_schema
-        )
+    def list_sources(self, collector_id, path_params = {}, validation = None, stream = False):
+        self.__validate_json('source_params', path_params, validation)
         request_url = '{0}/v1/collectors/{1}/sources'.format(
             self.__endpoint,
             collector_id
@@ -495,7 +3609,46 @@ class SumoClient:
         )
         return self.__execute_api(
             request_type        = 'GET',
-            request_url         = request_url
+            request_url         = request_url,
+            stream              = stream
+        )
+
+
+    """ Iterate over a Collector's Sources.
+    Yields the Sources of a Collector one at a time, parsing the listing as it downloads, for Collectors with too many
+    Sources to comfortably hold in memory at once.
+
+    Method: GET
+    Path:   /collectors/{collector_id}/sources
+    """
+    def iter_sources(self, collector_id, path_params = {}, validation = None):
+        return self._iterate_json_items(
+            self.list_sources(collector_id, path_params, validation, stream = True),
+            ('sources',)
+        )
+
+
+    """ Inventory Snapshot
+    Lists every Collector along with all of its Sources, as a single dictionary:
+
+        {
+            'taken_at':     time the snapshot was started (seconds since the epoch),
+            'collectors':   the Collectors in listing order, each with a 'sources' list added,
+            'errors':       Collector ID to the reason its Sources could not be listed (its 'sources' is None),
+            'stats':        counts of Collectors, Sources and errors, and the time spent in total and listing Collectors
+        }
+
+    Collector pages are listed page_size at a time, and each Collector's Sources are requested as soon as it is
+    listed, with up to concurrency list_sources requests running at once.
+
+    Method: GET
+    Path:   /collectors, then /collectors/{collector_id}/sources for each Collector
+    """
+    def inventory_snapshot(self, path_params = {}, page_size = 1000, concurrency = 8):
+        return self._build_inventory(
+            self.iter_collectors(path_params, page_size),
+            self.list_sources,
+            concurrency
         )
 
 
@@ -506,22 +3659,8 @@ class SumoClient:
     Path:   /collectors/{collector_id}/sources/{source_id}
     https://help.sumologic.com/APIs/01Collector-Management-API/Source-API#get%C2%A0source-by-id
     """
-    def get_source_by_id(self, collector_id, source_id, path_params = {}):
-        path_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'download': {
-                    'type': 'boolean'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = path_params,
-            schema          = path_params_schema
-        )
+    def get_source_by_id(self, collector_id, source_id, path_params = {}, validation = None):
+        self.__validate_json('source_params', path_params, validation)
         request_url = '{0}/v1/collectors/{1}/sources/{2}'.format(
             self.__endpoint,
             collector_id,
@@ -546,110 +3685,8 @@ class SumoClient:
     Path:   /collectors/{collector_id}/sources
     https://help.sumologic.com/APIs/01Collector-Management-API/Source-API#create-source
     """
-    def create_source(self, collector_id, source_json):
-        source_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'sourceType': {
-                    'type': 'string',
-                    'enum': [
-                        'LocalFile',
-                        'RemoteFileV2',
-                        'LocalWindowsEventLog',
-                        'RemoteWindowsEventLog',
-                        'LocalWindowsPerfMon',
-                        'RemoteWindowsPerfMon',
-                        'Syslog',
-                        'Script',
-                        'DockerLog',
-                        'DockerStats',
-                        'SystemStats',
-                        'StreamingMetrics',
-                        'HTTP',
-                        'Cloudsyslog',
-                        'Polling'
-                    ]
-                },
-                'name': {
-                    'type': 'string'
-                },
-                'description': {
-                    'type': 'string'
-                },
-                'fields': {
-                    'type': 'object'
-                },
-                'hostName': {
-                    'type': 'string'
-                },
-                'category': {
-                    'type': 'string'
-                },
-                'automaticDateParsing': {
-                    'type': 'boolean'
-                },
-                'timeZone': {
-                    'type': 'string'
-                },
-                'forceTimeZone': {
-                    'type': 'boolean'
-                },
-                'defaultDateFormat': {
-                    'type': 'string'
-                },
-                'defaultDateFormats': {
-                    'type': 'array',
-                    'items': {
-                        'type': 'object',
-                        'properties': {
-                            'format': 'string',
-                            'locator': 'string'
-                        },
-                        'required': [
-                            'format'
-                        ],
-                        'additionalProperties': False
-                    }
-                },
-                'multilineProcessingEnabled': {
-                    'type': 'boolean'
-                },
-                'useAutolineMatching': {
-                    'type': 'boolean'
-                },
-                'manualPrefixRegexp': {
-                    'type': 'string'
-                },
-                'filters': {
-                    'type': 'array',
-                    'items': {
-                        'type': 'string'
-                    }
-                },
-                'cutoffTimestamp': {
-                    'type': 'integer'
-                },
-                'cutoffRelativeTime': {
-                    'type': 'string'
-                }
-            },
-            'required': [
-                'sourceType',
-                'name'
-            ],
-            'not': {
-                'required': [
-                    'cutoffRelativeTime',
-                    'cutoffTimestamp'
-                ] 
-            },
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = source_json,
-            schema          = source_schema
-        )
+    def create_source(self, collector_id, source_json, validation=None):
+        self.__validate_json('source', source_json, validation)
         request_url = '{0}/v1/collectors/{1}/sources'.format(
             self.__endpoint,
             collector_id
@@ -670,99 +3707,36 @@ class SumoClient:
 
     Method: PUT
     Path:   /collectors/{collector_id}/sources/{source_id}
-    """
-    def update_source(self, collector_id, source_id, source_updates):
-        update_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'name': {
-                    'type': 'string'
-                },
-                'description': {
-                    'type': 'string'
-                },
-                'fields': {
-                    'type': 'object'
-                },
-                'hostName': {
-                    'type': 'string'
-                },
-                'category': {
-                    'type': 'string'
-                },
-                'automaticDateParsing': {
-                    'type': 'boolean'
-                },
-                'timeZone': {
-                    'type': 'string'
-                },
-                'forceTimeZone': {
-                    'type': 'boolean'
-                },
-                'defaultDateFormat': {
-                    'type': 'string'
-                },
-                'defaultDateFormats': {
-                    'type': 'array',
-                    'items': {
-                        'type': 'object',
-                        'properties': {
-                            'format': 'string',
-                            'locator': 'string'
-                        },
-                        'required': [
-                            'format'
-                        ],
-                        'additionalProperties': False
-                    }
-                },
-                'multilineProcessingEnabled': {
-                    'type': 'boolean'
-                },
-                'useAutolineMatching': {
-                    'type': 'boolean'
-                },
-                'manualPrefixRegexp': {
-                    'type': 'string'
-                },
-                'filters': {
-                    'type': 'array',
-                    'items': {
-                        'type': 'string'
-                    }
-                },
-                'cutoffTimestamp': {
-                    'type': 'integer'
-                }
-            },
-            'required': [
-                'sourceType',
-                'name'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance        = source_updates,
-            schema          = update_schema
-        )
-
-        source = self.get_source_by_id(collector_id, source_id).json()
-        source['source'].update(source_updates)
-
-        request_url = '{0}/v1/collectors/{1}/sources/{2}'.format(
-            self.__endpoint,
-            collector_id,
-            source_id
-        )
-        additional_headers = {
-            'If-Match': source.headers['ETag']
-        }
-        return self.__execute_api(
-            request_type        = 'PUT',
-            request_url         = request_url,
-            additional_headers  = additional_headers,
-            request_data        = source
+    """
+    def update_source(self, collector_id, source_id, source_updates, validation=None):
+        self.__validate_json('source_updates', source_updates, validation)
+
+        def apply_updates(response):
+            source = response.json()
+            source['source'].update(source_updates)
+
+            request_url = '{0}/v1/collectors/{1}/sources/{2}'.format(
+                self.__endpoint,
+                collector_id,
+                source_id
+            )
+            additional_headers = {
+                'If-Match': response.headers['ETag']
+            }
+            return self.__execute_api(
+                request_type        = 'PUT',
+                request_url         = request_url,
+                additional_headers  = additional_headers,
+                request_data        = source
+            )
+
+        return self._chain(
+            self.__execute_api(
+                request_type    = 'GET',
+                request_url     = '{0}/v1/collectors/{1}/sources/{2}'.format(self.__endpoint, collector_id, source_id),
+                fresh           = True
+            ),
+            apply_updates
         )
 
 
@@ -797,28 +3771,8 @@ class SumoClient:
     Path:   /collectors/upgrades/collectors
     https://help.sumologic.com/APIs/01Collector-Management-API/Upgrade-or-Downgrade-Collectors-Using-the-API#get-upgradable-collectors
     """
-    def get_upgradable_collectors(self, path_params = {}):
-        path_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'toVersion': {
-                    'type': 'string'
-                },
-                'offset': {
-                    'type': 'integer'
-                },
-                'limit': {
-                    'type': 'integer'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = path_params,
-            schema      = path_params_schema
-        )
+    def get_upgradable_collectors(self, path_params = {}, validation = None):
+        self.__validate_json('upgradable_collector_params', path_params, validation)
         request_url = '{0}/v1/collectors/upgrades/collectors'.format(
             self.__endpoint
         )
@@ -836,6 +3790,23 @@ class SumoClient:
         )
 
 
+    """ Iterate over all upgradable Collectors.
+    Yields every Collector that can be upgraded, requesting up to concurrency pages of get_upgradable_collectors at
+    once, either in order or as each page arrives.
+
+    Method: GET
+    Path:   /collectors/upgrades/collectors
+    """
+    def iter_upgradable_collectors(self, path_params = {}, page_size = 1000, concurrency = 4, ordered = True):
+        return self._iterate_offset_pages(
+            lambda offset, limit: self.get_upgradable_collectors(dict(path_params, offset = offset, limit = limit)),
+            'collectors',
+            page_size,
+            concurrency,
+            ordered
+        )
+
+
     """ Get available builds
 
     Method: GET 
@@ -858,27 +3829,8 @@ class SumoClient:
     Path:   /collectors/upgrades
     https://help.sumologic.com/APIs/01Collector-Management-API/Upgrade-or-Downgrade-Collectors-Using-the-API#create-an-upgrade-or-downgrade-task
     """
-    def create_an_upgrade_or_downgrade_task(self, request_data):
-        data_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'collectorId': {
-                    'type': 'integer'
-                },
-                'toVersion': {
-                    'type': 'string'
-                }
-            },
-            'required': [
-                'collectorId'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_data,
-            schema      = data_schema
-        )
+    def create_an_upgrade_or_downgrade_task(self, request_data, validation=None):
+        self.__validate_json('upgrade_task', request_data, validation)
         request_url = '{0}/v1/collectors/upgrades'.format(
             self.__endpoint
         )
@@ -927,27 +3879,8 @@ class SumoClient:
     Path:   /v1/healthEvents
     https://api.au.sumologic.com/docs/#operation/listAllHealthEvents
     """
-    def get_health_events(self, request_params={}):
-        request_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'limit': {
-                    'type': 'integer',
-                    'minimum': 1,
-                    'maximum': 1000
-                },
-                'token': {
-                    'type': 'string'
-                },
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_params,
-            schema      = request_params_schema
-        )
+    def get_health_events(self, request_params={}, validation=None):
+        self.__validate_json('pagination_params', request_params, validation)
         request_url = '{0}/v1/healthEvents'.format(
             self.__endpoint
         )
@@ -958,6 +3891,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all health events.
+    Yields each unresolved health event in the account, following the pagination token of get_health_events from
+    page to page. Set prefetch to request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/healthEvents
+    """
+    def iter_health_events(self, request_params={}, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.get_health_events(dict(request_params, token=token) if token else request_params),
+            prefetch
+        )
+
+
     """ Health events for specific resources.
     Get a list of all the unresolved events in your account that belong to the supplied resource identifiers.
 
@@ -965,70 +3912,9 @@ class SumoClient:
     Path:   /v1/healthEvents/resources
     https://api.au.sumologic.com/docs/#operation/listAllHealthEventsForResources
     """
-    def get_specific_health_events(self, resource_list, request_params={}):
-        resource_list_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'data': {
-                    'type': 'array',
-                    'items': {
-                        'type': 'object',
-                        'properties': {
-                            'id': {
-                                'type': 'string'
-                            },
-                            'name': {
-                                'type': 'string'
-                            },
-                            'type': {
-                                'type': 'string',
-                                'enum': [
-                                    'Collector',
-                                    'Source',
-                                    'IngestBudget',
-                                    'Organisation',
-                                    'LogsToMetricsRule'
-                                ]
-                            }
-                        },
-                        'required': [
-                            'id',
-                            'type'
-                        ],
-                        'additionalProperties': False
-                    }
-                },
-            },
-            'required': [
-                'data'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = resource_list,
-            schema      = resource_list_schema
-        )
-        request_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'limit': {
-                    'type': 'integer',
-                    'minimum': 1,
-                    'maximum': 1000
-                },
-                'token': {
-                    'type': 'string'
-                },
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_params,
-            schema      = request_params_schema
-        )
+    def get_specific_health_events(self, resource_list, request_params={}, validation=None):
+        self.__validate_json('health_event_resources', resource_list, validation)
+        self.__validate_json('pagination_params', request_params, validation)
         request_url = '{0}/v1/healthEvents/resources'.format(
             self.__endpoint
         )
@@ -1059,27 +3945,8 @@ class SumoClient:
     Path:   /v1/ingestBudgets
     https://api.au.sumologic.com/docs/#operation/listIngestBudgets
     """
-    def get_ingest_budgets(self, request_params={}):
-        request_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'limit': {
-                    'type': 'integer',
-                    'minimum': 1,
-                    'maximum': 1000
-                },
-                'token': {
-                    'type': 'string'
-                },
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_params,
-            schema      = request_params_schema
-        )
+    def get_ingest_budgets(self, request_params={}, validation=None):
+        self.__validate_json('pagination_params', request_params, validation)
         request_url = '{0}/v1/ingestBudgets'.format(
             self.__endpoint
         )
@@ -1090,6 +3957,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all ingest budgets.
+    Yields each ingest budget, fetching the pages of get_ingest_budgets only as they are needed. Set prefetch to
+    request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/ingestBudgets
+    """
+    def iter_ingest_budgets(self, request_params={}, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.get_ingest_budgets(dict(request_params, token=token) if token else request_params),
+            prefetch
+        )
+
+
     """ Create a new ingest budget.
     Create a new ingest budget.
 
@@ -1097,65 +3978,8 @@ class SumoClient:
     Path:   /v1/ingestBudgets
     https://api.au.sumologic.com/docs/#operation/createIngestBudget
     """
-    def create_ingest_budget(self, request_data):
-        request_data_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'name': {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 128
-                },
-                'fieldValue': {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 1024
-                },
-                'capacityBytes': {
-                    'type': 'integer',
-                    'minimum': 0
-                },
-                'timezone': {
-                    'type': 'string'
-                },
-                'resetTime': {
-                    'type': 'string',
-                    'minLength': 5,
-                    'maxLength': 5
-                },
-                'description' : {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 1024
-                },
-                'action': {
-                    'type': 'string',
-                    'enum': [
-                        'stopCollecting',
-                        'keepCollecting'
-                    ]
-                },
-                'auditThreshold': {
-                    'type': 'integer',
-                    'minimum': 1,
-                    'maximum': 99
-                }
-            },
-            'required': [
-                'name',
-                'fieldValue',
-                'capacityBytes',
-                'timezone',
-                'resetTime',
-                'action'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_data,
-            schema      = request_data_schema
-        )
+    def create_ingest_budget(self, request_data, validation=None):
+        self.__validate_json('ingest_budget', request_data, validation)
         request_url = '{0}/v1/ingestBudgets'.format(
             self.__endpoint
         )
@@ -1191,65 +4015,8 @@ class SumoClient:
     Path:   /v1/ingestBudgets/{budget_id}
     https://api.au.sumologic.com/docs/#operation/updateIngestBudget
     """
-    def update_ingest_budget(self, budget_id, request_data):
-        request_data_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'name': {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 128
-                },
-                'fieldValue': {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 1024
-                },
-                'capacityBytes': {
-                    'type': 'integer',
-                    'minimum': 0
-                },
-                'timezone': {
-                    'type': 'string'
-                },
-                'resetTime': {
-                    'type': 'string',
-                    'minLength': 5,
-                    'maxLength': 5
-                },
-                'description' : {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 1024
-                },
-                'action': {
-                    'type': 'string',
-                    'enum': [
-                        'stopCollecting',
-                        'keepCollecting'
-                    ]
-                },
-                'auditThreshold': {
-                    'type': 'integer',
-                    'minimum': 1,
-                    'maximum': 99
-                }
-            },
-            'required': [
-                'name',
-                'fieldValue',
-                'capacityBytes',
-                'timezone',
-                'resetTime',
-                'action'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_data,
-            schema      = request_data_schema
-        )
+    def update_ingest_budget(self, budget_id, request_data, validation=None):
+        self.__validate_json('ingest_budget', request_data, validation)
         request_url = '{0}/v1/ingestBudgets/{1}'.format(
             self.__endpoint,
             budget_id
@@ -1305,27 +4072,8 @@ class SumoClient:
     Path:   /v1/ingestBudgets/{budget_id}/collectors
     https://api.au.sumologic.com/docs/#operation/getAssignedCollectors
     """
-    def get_budget_collectors(self, budget_id, request_params={}):
-        request_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'limit': {
-                    'type': 'integer',
-                    'minimum': 1,
-                    'maximum': 1000
-                },
-                'token': {
-                    'type': 'string'
-                },
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_params,
-            schema      = request_params_schema
-        )
+    def get_budget_collectors(self, budget_id, request_params={}, validation=None):
+        self.__validate_json('pagination_params', request_params, validation)
         request_url = '{0}/v1/ingestBudgets/{1}/collectors'.format(
             self.__endpoint,
             budget_id
@@ -1337,6 +4085,23 @@ class SumoClient:
         )
 
 
+    """ Iterate over all Collectors assigned to a budget.
+    Yields each Collector assigned to the ingest budget, one page of get_budget_collectors at a time. Set prefetch
+    to request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/ingestBudgets/{budget_id}/collectors
+    """
+    def iter_budget_collectors(self, budget_id, request_params={}, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.get_budget_collectors(
+                budget_id,
+                dict(request_params, token=token) if token else request_params
+            ),
+            prefetch
+        )
+
+
     """ Assign a Collector to a budget.
     Assign a Collector to a budget.
 
@@ -1425,40 +4190,8 @@ class SumoClient:
     Path:   /v1/apps/{uuid}/install
     https://api.au.sumologic.com/docs/#operation/installApp
     """
-    def install_app(self, uuid, request_data):
-        request_data_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'name': {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 128
-                },
-                'description' : {
-                    'type': 'string',
-                    'minLength': 1,
-                    'maxLength': 255
-                },
-                'destinationFolderId': {
-                    'type': 'string'
-                },
-                'dataSourceValues': {
-                    'type': 'object',
-                    'additionalProperties': True
-                }
-            },
-            'required': [
-                'name',
-                'description',
-                'destinationFolderId'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_data,
-            schema      = request_data_schema
-        )
+    def install_app(self, uuid, request_data, validation=None):
+        self.__validate_json('app_install', request_data, validation)
         request_url = '{0}/v1/apps/{1}/install'.format(
             self.__endpoint,
             uuid
@@ -1506,24 +4239,8 @@ class SumoClient:
     Path:   /v2/content/path
     https://api.au.sumologic.com/docs/#operation/getItemByPath
     """
-    def get_content_item_by_path(self, request_params):
-        request_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'path': {
-                    'type': 'string'
-                }
-            },
-            'required': [
-                'path'
-            ],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_params,
-            schema      = request_params_schema
-        )
+    def get_content_item_by_path(self, request_params, validation=None):
+        self.__validate_json('content_path_params', request_params, validation)
         request_url = '{0}/v2/content/path'.format(
             self.__endpoint
         )
@@ -1552,6 +4269,44 @@ class SumoClient:
         )
 
 
+    """ Resolve a content path to its ID.
+    Returns the ID of the content item at the given path as a string. With a content cache, known paths are answered
+    without a request; otherwise get_content_item_by_path is called.
+
+    Method: GET
+    Path:   /v2/content/path
+    """
+    def resolve_content_id(self, path):
+        content_id = self.__content_cache.id_for(path) if self.__content_cache else None
+        if content_id is not None:
+            return self._resolved(content_id)
+
+        def content_id_of(response):
+            response.raise_for_status()
+            return response.json()['id']
+
+        return self._chain(self.get_content_item_by_path({'path': path}), content_id_of)
+
+
+    """ Resolve a content ID to its path.
+    Returns the full path of the content item with the given identifier as a string. With a content cache, known items
+    are answered without a request; otherwise get_content_path_by_id is called.
+
+    Method: GET
+    Path:   /v2/content/{content_id}/path
+    """
+    def resolve_content_path(self, content_id):
+        path = self.__content_cache.path_for(content_id) if self.__content_cache else None
+        if path is not None:
+            return self._resolved(path)
+
+        def path_of(response):
+            response.raise_for_status()
+            return response.json()['path']
+
+        return self._chain(self.get_content_path_by_id(content_id), path_of)
+
+
 
     """ Start a content export job.
     Schedule an asynchronous export of content with the given identifier. You will get back an asynchronous job
@@ -1613,7 +4368,7 @@ class SumoClient:
     Path:   /v2/content/{content_id}/export/{job_id}/result
     https://api.au.sumologic.com/docs/#operation/getAsyncExportResult
     """
-    def get_content_export_result(self, content_id, job_id, is_admin_mode=None):
+    def get_content_export_result(self, content_id, job_id, is_admin_mode=None, stream=False):
         request_url = '{0}/v2/content/{1}/export/{2}/result'.format(
             self.__endpoint,
             content_id,
@@ -1625,7 +4380,22 @@ class SumoClient:
         return self.__execute_api(
             request_type        = 'GET',
             request_url         = request_url,
-            additional_headers  = additional_headers
+            additional_headers  = additional_headers,
+            stream              = stream
+        )
+
+
+    """ Iterate over a content export job's result.
+    Yields the children of an exported folder one at a time, parsing the result as it downloads rather than holding
+    the whole export in memory. The folder's own name and description are not yielded.
+
+    Method: GET
+    Path:   /v2/content/{content_id}/export/{job_id}/result
+    """
+    def iter_content_export_result(self, content_id, job_id, is_admin_mode=None):
+        return self._iterate_json_items(
+            self.get_content_export_result(content_id, job_id, is_admin_mode, stream = True),
+            ('children',)
         )
 
 
@@ -1645,22 +4415,8 @@ class SumoClient:
     Path:   /v2/content/folders/{folder_id}/import
     https://api.au.sumologic.com/docs/#operation/beginAsyncImport
     """
-    def start_content_import(self, folder_id, request_data, request_params={}, is_admin_mode=None):
-        request_params_schema = {
-            '$schema': 'http://json-schema.org/draft/2019-09/schema',
-            'type': 'object',
-            'properties': {
-                'overwrite': {
-                    'type': 'boolean'
-                }
-            },
-            'required': [],
-            'additionalProperties': False
-        }
-        jsonschema.validate(
-            instance    = request_params,
-            schema      = request_params_schema
-        )
+    def start_content_import(self, folder_id, request_data, request_params={}, is_admin_mode=None, validation=None):
+        self.__validate_json('content_import_params', request_params, validation)
         request_url = '{0}/v2/content/folders/{1}/import'.format(
             self.__endpoint,
             folder_id
@@ -2075,17 +4831,28 @@ class SumoClient:
     Path:   /v2/content/folders/global/{job_id}/result
     https://api.au.sumologic.com/docs/#operation/getGlobalFolderAsyncResult
     """
-    def get_global_folder_result(self, job_id):
+    def get_global_folder_result(self, job_id, stream=False):
         request_url = '{0}/v2/content/folders/global/{1}/result'.format(
             self.__endpoint,
             job_id
         )
         return self.__execute_api(
             request_type        = 'GET',
-            request_url         = request_url
+            request_url         = request_url,
+            stream              = stream
         )
 
 
+    """ Iterate over a global folder job's result.
+    Yields the top-level content items of the global folder one at a time, parsing the result as it downloads.
+
+    Method: GET
+    Path:   /v2/content/folders/global/{job_id}/result
+    """
+    def iter_global_folder_result(self, job_id):
+        return self._iterate_json_items(self.get_global_folder_result(job_id, stream = True), ('data',))
+
+
     """ Get Admin Recommended folder.
     Schedule an asynchronous job to get the top-level Admin Recommended content items.
 
@@ -2132,17 +4899,29 @@ class SumoClient:
     Path:   /v2/content/folders/adminRecommended/{job_id}/result
     https://api.au.sumologic.com/docs/#operation/getAdminRecommendedFolderAsyncResult
     """
-    def get_admin_recommended_folder_result(self, job_id):
+    def get_admin_recommended_folder_result(self, job_id, stream=False):
         request_url = '{0}/v2/content/folders/adminRecommended/{1}/result'.format(
             self.__endpoint,
             job_id
         )
         return self.__execute_api(
             request_type        = 'GET',
-            request_url         = request_url
+            request_url         = request_url,
+            stream              = stream
         )
 
 
+    """ Iterate over an Admin Recommended folder job's result.
+    Yields the top-level content items of the Admin Recommended folder one at a time, parsing the result as it
+    downloads.
+
+    Method: GET
+    Path:   /v2/content/folders/adminRecommended/{job_id}/result
+    """
+    def iter_admin_recommended_folder_result(self, job_id):
+        return self._iterate_json_items(self.get_admin_recommended_folder_result(job_id, stream = True), ('data',))
+
+
 
     # # #   ==================================================
     # # #   ----[BETA]----------------------------------------
@@ -2432,6 +5211,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all metrics monitors.
+    Yields each metrics monitor in the organization, following the pagination token of get_monitors. Set prefetch to
+    request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/metricsAlertMonitors
+    """
+    def iter_monitors(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.get_monitors(limit, token),
+            prefetch
+        )
+
+
     # # #
     # # #   TODO: Implement checking of parsed array VS documentation.
     # # #
@@ -2670,6 +5463,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all metrics transformation rules.
+    Yields each metrics transformation rule, one page of get_transformation_rules at a time. Set prefetch to request
+    the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/transformationRules
+    """
+    def iter_transformation_rules(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.get_transformation_rules(limit, token),
+            prefetch
+        )
+
+
     # # #
     # # #   TODO: Implement checking of parsed JSON structures VS documentation.
     # # #
@@ -2782,6 +5589,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all access keys.
+    Yields each access key in the organization, following the pagination token of list_access_keys. Set prefetch to
+    request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/accessKeys
+    """
+    def iter_access_keys(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.list_access_keys(limit, token),
+            prefetch
+        )
+
+
     # # #
     # # #   TODO: Implement checking of parsed JSON structures VS documentation.
     # # #
@@ -3219,6 +6040,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all connections.
+    Yields each connection in the organization, one page of list_connections at a time. Set prefetch to request the
+    next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/connections
+    """
+    def iter_connections(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.list_connections(limit, token),
+            prefetch
+        )
+
+
     """ Create a new connection.
     Create a new connection in the organization.
 
@@ -3367,6 +6202,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all field extraction rules.
+    Yields each field extraction rule, following the pagination token of list_extraction_rules. Set prefetch to
+    request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/extractionRules
+    """
+    def iter_extraction_rules(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.list_extraction_rules(limit, token),
+            prefetch
+        )
+
+
     # # #
     # # #   TODO: Implement checking of parsed JSON structures VS documentation.
     # # #
@@ -3677,6 +6526,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all partitions.
+    Yields each partition in the organization, one page of list_partitions at a time. Set prefetch to request the
+    next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/partitions
+    """
+    def iter_partitions(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.list_partitions(limit, token),
+            prefetch
+        )
+
+
     # # #
     # # #   TODO: Implement checking of parsed JSON structures VS documentation.
     # # #
@@ -3807,6 +6670,20 @@ class SumoClient:
         )
 
 
+    """ Iterate over all scheduled views.
+    Yields each scheduled view in the organization, following the pagination token of list_scheduled_views. Set
+    prefetch to request the next page while the current one is being consumed.
+
+    Method: GET
+    Path:   /v1/scheduledViews
+    """
+    def iter_scheduled_views(self, limit=None, prefetch=False):
+        return self._iterate_pages(
+            lambda token: self.list_scheduled_views(limit, token),
+            prefetch
+        )
+
+
     # # #
     # # #   TODO: Implement checking of parsed JSON structures VS documentation.
     # # #
@@ -4019,4 +6896,1011 @@ class SumoClient:
         return self.__execute_api(
             request_type        = 'DELETE',
             request_url         = request_url
-        )
\ No newline at end of file
+        )
+
+
+
+# # # ==================================================
+# # #
+# # # ASYNCIO CLIENT
+# # #
+# # # AsyncSumoClient exposes every SumoClient method as a coroutine. URL construction, validation and endpoint
+# # # resolution are inherited unchanged from SumoClient; only the transport differs, so hundreds of requests can be
+# # # in flight on a single event loop. Requires the aiohttp package.
+
+class AsyncSumoResponse:
+    """The response to a request made by AsyncSumoClient, fully read unless it was requested as a stream.
+
+    Mirrors the parts of requests.Response that callers of SumoClient rely on, so that code handling responses works
+    the same way with either client. The body of a streamed response is only available through iter_content, and its
+    content is None.
+    """
+    def __init__(self, status_code, reason, headers, url, content, raw = None, json_codec = json, on_close = None):
+        self.status_code    = status_code
+        self.reason         = reason
+        self.headers        = requests.structures.CaseInsensitiveDict(headers)
+        self.url            = url
+        self.content        = content
+        self.raw            = raw
+        self.retries        = 0
+        self.__json_codec   = json_codec
+        self.__on_close     = on_close
+
+    def iter_content(self, chunk_size = 65536):
+        """Get an asynchronous iterator over the body of a streamed response, chunk_size bytes at a time. The response
+        is closed once the body has been read to the end."""
+        if self.raw is None:
+            raise ValueError('AsyncSumoResponse: only a streamed response can be iterated.')
+        return self.__iter_content(chunk_size)
+
+    async def __iter_content(self, chunk_size):
+        async for chunk in self.raw.content.iter_chunked(chunk_size):
+            yield chunk
+        self.close()
+
+    def close(self):
+        """Release the connection of a streamed response, and the limiter slots held while its body is read. Fully
+        read responses hold neither."""
+        if self.raw is not None:
+            self.raw.release()
+        on_close, self.__on_close = self.__on_close, None
+        if on_close is not None:
+            on_close()
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self, **kwargs):
+        return _decode_json(self.__json_codec, self.content, **kwargs)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(
+                '{0} Error: {1} for url: {2}'.format(self.status_code, self.reason, self.url),
+                response = self
+            )
+
+
+class AsyncSumoClient(SumoClient):
+    def __init__(self, access_id, access_key, pool_connections = 10, pool_maxsize = 100, keep_alive = True, **kwargs):
+        """Create an asyncio client for the Sumo Logic API.
+
+        Every API method of SumoClient is available, but returns a coroutine resolving to an AsyncSumoResponse, and
+        the iter_* methods return asynchronous iterators for use with "async for". Use
+        the client as an async context manager, or await aclose() when finished with it. The endpoint is resolved on
+        the event loop, when entering the context manager or before the first API call that needs it.
+
+        Args:
+            access_id: string, the access ID of the Sumo Logic access key.
+            access_key: string, the secret of the Sumo Logic access key.
+            pool_connections: int, the number of hosts to keep connection pools for.
+            pool_maxsize: int, the maximum number of concurrent connections to any single host.
+            keep_alive: bool, whether connections are kept open between requests.
+            **kwargs: the remaining options of SumoClient (ie - rate_limiter, retry_policy, deployment, hedging),
+                which have the same meaning and defaults for the asyncio client.
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncSumoClient: the aiohttp package must be installed to use the asyncio client.')
+
+        super().__init__(access_id, access_key, pool_connections, pool_maxsize, keep_alive, **kwargs)
+        self.__pool_connections = pool_connections
+        self.__pool_maxsize     = pool_maxsize
+        self.__keep_alive       = keep_alive
+        self.__async_session    = None
+        self.__resolving        = None
+        self.__flights          = {}
+
+    def __enter__(self):
+        raise TypeError('AsyncSumoClient: use "async with" rather than "with".')
+
+    async def __aenter__(self):
+        await self.resolve_endpoint()
+        return self
+
+    @property
+    def endpoint(self):
+        """The API endpoint of the account's deployment, or a placeholder until resolve_endpoint() has resolved it.
+        API calls made before then resolve it first."""
+        return super().endpoint
+
+    def _resolve_endpoint(self):
+        # Blocking here would stall the event loop, so URLs are built on a placeholder until the request is sent.
+        return _PENDING_ENDPOINT
+
+    def _with_endpoint(self, execute):
+        return self.__with_endpoint_async(execute)
+
+    async def __with_endpoint_async(self, execute):
+        return await execute(await self.resolve_endpoint())
+
+    async def resolve_endpoint(self):
+        """Resolve the client's endpoint on the event loop, so that later API calls never block to resolve it."""
+        if self._endpoint_resolution() is None:
+            return self.endpoint
+
+        # Calls made at the same time while the endpoint is unknown all wait for a single resolution.
+        if self.__resolving is None:
+            self.__resolving = asyncio.ensure_future(self.__resolve_endpoint_async())
+            self.__resolving.add_done_callback(self.__resolution_done)
+        return await asyncio.shield(self.__resolving)
+
+    def __resolution_done(self, resolving):
+        self.__resolving = None
+
+    async def __resolve_endpoint_async(self):
+        resolution = self._endpoint_resolution()
+        if resolution is None:
+            return self.endpoint
+
+        access_id, auth_header, cache_path, cache_ttl = resolution
+        endpoint = _endpoint_resolver.cached(access_id, cache_path, cache_ttl)
+        if endpoint is None:
+            async with self.__get_async_session().get(
+                _DEFAULT_API_ENDPOINT,
+                headers = {
+                    'Authorization': auth_header
+                }
+            ) as response:
+                endpoint = _probed_endpoint(response.url, response.status, bool(response.history))
+            endpoint = _DEFAULT_API_ENDPOINT if endpoint is None else _endpoint_resolver.store(access_id, endpoint, cache_path)
+        self._use_endpoint(endpoint)
+        return endpoint
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close both the asyncio session and the blocking session kept by SumoClient."""
+        super().close()
+        if self.__async_session is not None:
+            await self.__async_session.close()
+            self.__async_session = None
+
+    def close(self):
+        """Close the client without awaiting it, as code written for SumoClient does.
+
+        The asyncio session is closed by a task scheduled on the running event loop; await aclose() instead to wait
+        for it to finish.
+        """
+        super().close()
+        if self.__async_session is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                raise RuntimeError('AsyncSumoClient: close() must be called from within the event loop; await aclose() instead.') from None
+            loop.create_task(self.__async_session.close())
+            self.__async_session = None
+
+    def __get_async_session(self):
+        # The aiohttp session has to be created from within a running event loop, so it is only built on first use.
+        if self.__async_session is None:
+            connector = aiohttp.TCPConnector(
+                limit           = self.__pool_connections * self.__pool_maxsize,
+                limit_per_host  = self.__pool_maxsize,
+                force_close     = not self.__keep_alive
+            )
+            self.__async_session = aiohttp.ClientSession(connector = connector)
+        return self.__async_session
+
+    def __encode_params(self, request_params):
+        # aiohttp only accepts string and number query values, so encode them the same way requests does.
+        if request_params is None:
+            return None
+        return {
+            key: str(value)
+            for key, value in request_params.items()
+            if value is not None
+        }
+
+    def _send_request(self, request_type, request_url, request_params, request_body, request_headers, stream = False):
+        return self.__send_request_async(request_type, request_url, request_params, request_body, request_headers, stream)
+
+    async def __send_request_async(self, request_type, request_url, request_params, request_body, request_headers, stream):
+        retry_policy    = self._retry_policy(request_url)
+        attempt         = 0
+        delay           = 0
+        while True:
+            try:
+                response = await self.__send_attempt_async(request_type, request_url, request_params, request_body, request_headers, stream)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retry_policy or not retry_policy.should_retry(request_type, attempt):
+                    raise
+                response_headers = None
+            else:
+                if not retry_policy or not retry_policy.should_retry(request_type, attempt, response.status_code):
+                    response.retries = attempt
+                    return response
+                response_headers = response.headers
+                response.close()
+
+            delay = retry_policy.next_delay(delay, response_headers)
+            self._count_retry(request_url)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def __send_attempt_async(self, request_type, request_url, request_params, request_body, request_headers, stream):
+        breaker = self.circuit_breaker
+        if not breaker:
+            return await self.__send_hedged_async(request_type, request_url, request_params, request_body, request_headers, stream)
+        ticket      = breaker.acquire(request_url)
+        succeeded   = None
+        try:
+            response    = await self.__send_hedged_async(request_type, request_url, request_params, request_body, request_headers, stream)
+            succeeded   = response.status_code not in breaker.failure_statuses
+            return response
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            succeeded = False
+            raise
+        finally:
+            breaker.release(ticket, succeeded)
+
+    async def __send_hedged_async(self, request_type, request_url, request_params, request_body, request_headers, stream):
+        hedging = self.hedging
+        if stream or not hedging or not hedging.applies(request_type, request_url):
+            return await self.__send_once_async(request_type, request_url, request_params, request_body, request_headers, stream)
+
+        delay       = hedging.hedge_delay(request_url)
+        admitted    = asyncio.Event()
+        started     = []
+
+        def admit():
+            started.append(time.monotonic())
+            admitted.set()
+
+        async def send_first():
+            response = await self.__send_once_async(request_type, request_url, request_params, request_body, request_headers, admitted = admit)
+            hedging.record(request_url, time.monotonic() - started[0])
+            return response
+
+        if delay is None:
+            return await send_first()
+        attempts    = [asyncio.ensure_future(send_first())]
+        winner      = None
+        attempts[0].add_done_callback(lambda attempt: admitted.set())
+        try:
+            await admitted.wait()
+            done, _ = await asyncio.wait(attempts, timeout = max(0.0, started[0] + delay - time.monotonic()) if started else 0)
+            if not done and hedging.try_hedge():
+                attempts.append(asyncio.ensure_future(self.__send_once_async(request_type, request_url, request_params, request_body, request_headers)))
+            pending = set(attempts)
+            while winner is None and pending:
+                done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                winner = next((attempt for attempt in attempts if attempt in done and attempt.exception() is None), None)
+            if winner is None:
+                return attempts[0].result()
+            if winner is not attempts[0]:
+                hedging.count_hedge_won()
+            return winner.result()
+        finally:
+            # The losing attempt is cancelled, or closed if its response has already arrived.
+            for attempt in attempts:
+                if attempt is winner:
+                    continue
+                if not attempt.done():
+                    attempt.cancel()
+                elif not attempt.cancelled() and attempt.exception() is None:
+                    attempt.result().close()
+
+    async def __send_once_async(self, request_type, request_url, request_params, request_body, request_headers, stream = False, admitted = None):
+        while True:
+            response = await self.__send_with_key_async(request_type, request_url, request_params, request_body, request_headers, stream, admitted)
+            if response.status_code != 401 or not self.credential_pool or not self.credential_pool.available:
+                return response
+            response.close()
+
+    async def __send_with_key_async(self, request_type, request_url, request_params, request_body, request_headers, stream, admitted):
+        session     = self.__get_async_session()
+        credential  = self.credential_pool.acquire() if self.credential_pool else None
+        if credential:
+            request_headers = dict(request_headers, Authorization = credential.auth_header)
+        limiters = [limiter for limiter in (self.rate_limiter, credential and credential.limiter) if limiter]
+        acquired = []
+        response = None
+        try:
+            for limiter in limiters:
+                await limiter.acquire_async()
+                acquired.append(limiter)
+            if admitted:
+                admitted()
+            response = await session.request(
+                method  = request_type,
+                url     = request_url,
+                params  = self.__encode_params(request_params),
+                data    = request_body,
+                headers = request_headers
+            )
+            if stream:
+                # The body is still to be transferred, so its slots are only released once it is read or closed.
+                content         = None
+                held, acquired  = acquired, []
+            else:
+                held            = []
+                async with response:
+                    content = await response.read()
+                self._count_transfer(
+                    response_bytes      = len(content),
+                    response_wire_bytes = int(response.headers.get('Content-Length') or len(content))
+                )
+        finally:
+            for limiter in acquired:
+                limiter.release()
+            if credential:
+                self.credential_pool.release(
+                    credential,
+                    None if response is None else response.status,
+                    None if response is None else response.headers
+                )
+        return AsyncSumoResponse(
+            status_code = response.status,
+            reason      = response.reason,
+            headers     = response.headers,
+            url         = str(response.url),
+            content     = content,
+            raw         = response if stream else None,
+            json_codec  = self.json_codec,
+            on_close    = (lambda: [limiter.release() for limiter in held]) if held else None
+        )
+
+    def _chain(self, response, callback):
+        return self.__chain_async(response, callback)
+
+    def _iterate_json_items(self, response, path):
+        return self.__iterate_json_items_async(response, path)
+
+    def _download(self, response, sink, chunk_size):
+        return self.__download_async(response, sink, chunk_size)
+
+    async def __download_async(self, response, sink, chunk_size):
+        response = await response
+        try:
+            response.raise_for_status()
+            received = 0
+            async for chunk in response.iter_content(chunk_size):
+                received += len(chunk)
+                sink.write(chunk)
+            self._count_response(response, received)
+            return sink.finish()
+        except BaseException:
+            sink.abort()
+            raise
+        finally:
+            response.close()
+
+    async def __iterate_json_items_async(self, response, path):
+        response = await response
+        try:
+            response.raise_for_status()
+            parser      = _JSONItemStream(path)
+            received    = 0
+            async for chunk in response.iter_content(65536):
+                received += len(chunk)
+                for item in parser.feed(chunk):
+                    yield item
+            self._count_response(response, received)
+            for item in parser.feed(b'', final = True):
+                yield item
+        finally:
+            response.close()
+
+    def _resolved(self, response):
+        return self.__resolved_async(response)
+
+    def _coalesce(self, flight_key, send):
+        return self.__coalesce_async(flight_key, send)
+
+    async def __coalesce_async(self, flight_key, send):
+        # The request runs as a task of its own, so that a caller being cancelled does not cancel it for the others.
+        flight = self.__flights.get(flight_key)
+        if flight is None:
+            flight = self.__flights[flight_key] = asyncio.ensure_future(send())
+            flight.add_done_callback(lambda _: self.__flights.pop(flight_key, None))
+            self._count_coalesce('sent')
+            return await asyncio.shield(flight)
+
+        self._count_coalesce('coalesced')
+        response = await asyncio.shield(flight)
+        return _copy_response(response, response.retries)
+
+    async def __resolved_async(self, response):
+        return response
+
+    def _iterate_pages(self, fetch_page, prefetch = False):
+        return self.__iterate_pages_async(fetch_page, prefetch)
+
+    def _poll_job(self, poll, fetch_status, fetch_result):
+        return self.__poll_job_async(poll, fetch_status, fetch_result)
+
+    def _build_inventory(self, collectors, fetch_sources, concurrency):
+        return self.__build_inventory_async(collectors, fetch_sources, concurrency)
+
+    async def __build_inventory_async(self, collectors, fetch_sources, concurrency):
+        builder = _InventoryBuilder()
+        pending = {}
+
+        async def collect(return_when):
+            done, _ = await asyncio.wait(pending, return_when = return_when)
+            for task in done:
+                index = pending.pop(task)
+                builder.sources_fetched(index, task.exception() or task.result())
+
+        try:
+            async for collector in collectors:
+                index = builder.collector_listed(collector)
+                pending[asyncio.ensure_future(fetch_sources(collector['id']))] = index
+                if len(pending) >= concurrency:
+                    await collect(asyncio.FIRST_COMPLETED)
+            if pending:
+                await collect(asyncio.ALL_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+        return builder.snapshot()
+
+    def _run_batch(self, calls, concurrency, as_completed, return_exceptions):
+        completed = self.__run_calls_async(calls, concurrency, return_exceptions)
+        return completed if as_completed else self.__ordered_results_async(completed)
+
+    async def __ordered_results_async(self, completed):
+        return _ordered_results([pair async for pair in completed])
+
+    async def __run_calls_async(self, calls, concurrency, return_exceptions):
+        calls   = enumerate(calls)
+        pending = {}
+        try:
+            while True:
+                for index, call in itertools.islice(calls, concurrency - len(pending)):
+                    pending[asyncio.ensure_future(self.__invoke_call_async(call))] = index
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as error:
+                        if not return_exceptions:
+                            raise
+                        result = error
+                    yield index, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def __invoke_call_async(self, call):
+        result = _invoke_call(self, call)
+        return await result if inspect.isawaitable(result) else result
+
+    def _check_cancel_event(self, cancel_event):
+        pass
+
+    async def __poll_job_async(self, poll, fetch_status, fetch_result):
+        # The wait ends as soon as the cancel event is set, rather than at the next status check.
+        while True:
+            wait = poll.next_wait()
+            if isinstance(poll.cancel_event, asyncio.Event):
+                try:
+                    await asyncio.wait_for(poll.cancel_event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            elif poll.cancel_event is not None:
+                await asyncio.get_running_loop().run_in_executor(None, poll.cancel_event.wait, wait)
+            else:
+                await asyncio.sleep(wait)
+            poll.check_cancelled()
+
+            response = await fetch_status()
+            response.raise_for_status()
+            if poll.outcome(response.json()):
+                return await fetch_result() if fetch_result else response
+
+    def _iterate_offset_pages(self, fetch_page, items_key, page_size, concurrency = 4, ordered = True):
+        return self.__iterate_offset_pages_async(fetch_page, items_key, page_size, concurrency, ordered)
+
+    async def __iterate_offset_pages_async(self, fetch_page, items_key, page_size, concurrency, ordered):
+        pager   = _OffsetPager(page_size, concurrency, ordered)
+        pending = {}
+        try:
+            while True:
+                for offset in pager.offsets_to_fetch():
+                    pending[asyncio.ensure_future(fetch_page(offset, page_size))] = offset
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                for task in done:
+                    offset      = pending.pop(task)
+                    response    = task.result()
+                    response.raise_for_status()
+                    for items in pager.page_fetched(offset, response.json().get(items_key, [])):
+                        for item in items:
+                            yield item
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def __iterate_pages_async(self, fetch_page, prefetch):
+        next_page = None
+        try:
+            response = await fetch_page(None)
+            while True:
+                response.raise_for_status()
+                page        = response.json()
+                token       = page.get('next')
+                next_page   = asyncio.ensure_future(fetch_page(token)) if token and prefetch else None
+                for item in page.get('data', []):
+                    yield item
+                if not token:
+                    return
+                page        = None
+                response    = await (next_page if next_page else fetch_page(token))
+                next_page   = None
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def __chain_async(self, response, callback):
+        result = callback(await response)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+
+# # # ==================================================
+# # #
+# # # LOCAL MIRROR
+# # #
+# # # SumoMirror keeps Collectors, Sources and content folders in a local SQLite database, so a new process can query
+# # # them straight away instead of listing the whole account again. Refreshing only re-fetches what has changed or
+# # # has not been fetched for max_age seconds.
+
+_MIRROR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS collectors (
+    id                  INTEGER PRIMARY KEY,
+    name                TEXT,
+    collector_type      TEXT,
+    alive               INTEGER,
+    body                TEXT NOT NULL,
+    sources_fetched_at  REAL
+);
+CREATE INDEX IF NOT EXISTS collectors_name ON collectors (name);
+CREATE INDEX IF NOT EXISTS collectors_type ON collectors (collector_type);
+
+CREATE TABLE IF NOT EXISTS sources (
+    id                  INTEGER PRIMARY KEY,
+    collector_id        INTEGER NOT NULL,
+    name                TEXT,
+    source_type         TEXT,
+    category            TEXT,
+    body                TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_collector ON sources (collector_id);
+CREATE INDEX IF NOT EXISTS sources_type ON sources (source_type);
+CREATE INDEX IF NOT EXISTS sources_category ON sources (category);
+
+CREATE TABLE IF NOT EXISTS content (
+    id                  TEXT PRIMARY KEY,
+    parent_id           TEXT,
+    name                TEXT,
+    item_type           TEXT,
+    body                TEXT NOT NULL,
+    fetched_at          REAL
+);
+CREATE INDEX IF NOT EXISTS content_parent ON content (parent_id);
+CREATE INDEX IF NOT EXISTS content_name ON content (name);
+"""
+
+# Collector fields that change on every poll of an Installed Collector, without anything about it having changed.
+_VOLATILE_COLLECTOR_FIELDS = ('alive', 'lastSeenAlive')
+
+# The most IDs bound into a single IN (...) query, well below SQLite's limit on bound variables.
+_MIRROR_CHUNK_SIZE = 500
+
+# The number of Collectors whose Sources are written in one transaction, so that only that many list_sources
+# responses are held in memory at once.
+_MIRROR_WRITE_BATCH = 50
+
+
+def _collector_fingerprint(collector):
+    """Get the JSON of a Collector without its volatile fields, to tell whether it has really changed."""
+    return json.dumps(
+        {key: value for key, value in collector.items() if key not in _VOLATILE_COLLECTOR_FIELDS},
+        sort_keys = True
+    )
+
+
+def _chunks(items, size = _MIRROR_CHUNK_SIZE):
+    """Split a list into consecutive lists of at most size items."""
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+
+class SumoMirror:
+    """A local SQLite copy of an account's Collectors, Sources and content folders, kept up to date through a
+    SumoClient.
+
+    Queries return the JSON of each object as the API last returned it. The mirror can be used from several threads;
+    it refreshes through the blocking SumoClient, not AsyncSumoClient.
+    """
+    def __init__(self, client, path, max_age = 3600):
+        """
+        Args:
+            client: SumoClient, the client used to refresh the mirror.
+            path: string, the SQLite database file, created if needed. Use ':memory:' for a mirror that is not kept.
+            max_age: float, the number of seconds after which a Collector's Sources or a folder is fetched again, even
+                if nothing shows it has changed.
+        """
+        if isinstance(client, AsyncSumoClient):
+            raise TypeError('SumoMirror: client must be a SumoClient, not an AsyncSumoClient.')
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        self.__client       = client
+        self.__max_age      = max_age
+        self.__lock         = threading.Lock()
+        self.__connection   = sqlite3.connect(path, check_same_thread = False)
+        self.__connection.row_factory = sqlite3.Row
+        with self.__lock, self.__connection:
+            if path != ':memory:':
+                self.__connection.execute('PRAGMA journal_mode = WAL')
+            self.__connection.executescript(_MIRROR_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def refresh_collectors(self, concurrency = 8, max_age = None):
+        """List every Collector, and fetch the Sources of those that are new, changed, or were fetched more than
+        max_age seconds ago. Collectors no longer listed are removed along with their Sources. A Collector whose only
+        changes are to alive or lastSeenAlive is stored again, but does not count as changed. Sources are written as
+        their responses arrive; a Collector whose Sources could not be fetched has them fetched again next refresh.
+
+        Returns a dictionary of statistics: the number of Collectors listed, changed and removed, of Collectors whose
+        Sources were fetched, of those that failed, and the seconds taken.
+
+        Args:
+            concurrency: int, the maximum number of list_sources requests running at once.
+            max_age: float, overrides the mirror's max_age for this refresh.
+        """
+        started     = time.monotonic()
+        now         = time.time()
+        oldest      = now - (self.__max_age if max_age is None else max_age)
+        with self.__lock:
+            stored = {
+                row['id']: (row['body'], row['sources_fetched_at'])
+                for row in self.__connection.execute('SELECT id, body, sources_fetched_at FROM collectors')
+            }
+
+        # Only a change outside the volatile fields means the Sources may have changed too; a new alive or lastSeenAlive
+        # is stored without fetching anything.
+        collectors  = {collector['id']: collector for collector in self.__client.iter_collectors()}
+        bodies      = {collector_id: json.dumps(collector, sort_keys = True) for collector_id, collector in collectors.items()}
+        updated     = [collector_id for collector_id in collectors if stored.get(collector_id, (None,))[0] != bodies[collector_id]]
+        changed     = [
+            collector_id for collector_id in updated
+            if collector_id not in stored or _collector_fingerprint(json.loads(stored[collector_id][0])) != _collector_fingerprint(collectors[collector_id])
+        ]
+        stale       = [
+            collector_id for collector_id in collectors
+            if collector_id not in changed and (stored[collector_id][1] or 0) < oldest
+        ]
+        to_fetch    = changed + stale
+        removed     = [collector_id for collector_id in stored if collector_id not in collectors]
+        errors      = 0
+
+        with self.__lock, self.__connection:
+            for collector_id in removed:
+                self.__connection.execute('DELETE FROM sources WHERE collector_id = ?', (collector_id,))
+                self.__connection.execute('DELETE FROM collectors WHERE id = ?', (collector_id,))
+
+            for collector_id in updated:
+                collector = collectors[collector_id]
+                self.__connection.execute(
+                    'INSERT INTO collectors (id, name, collector_type, alive, body) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (id) DO UPDATE SET name = excluded.name, collector_type = excluded.collector_type, '
+                    'alive = excluded.alive, body = excluded.body',
+                    (collector_id, collector.get('name'), collector.get('collectorType'), collector.get('alive'), bodies[collector_id])
+                )
+
+        # Sources are written a batch at a time as they arrive, rather than after every response has been read.
+        batch = []
+        for index, response in self.__client.map('list_sources', to_fetch, concurrency = concurrency, as_completed = True):
+            batch.append((to_fetch[index], response))
+            if len(batch) >= _MIRROR_WRITE_BATCH:
+                errors += self.__store_sources(batch, now)
+                batch = []
+        errors += self.__store_sources(batch, now)
+
+        return {
+            'collectors':           len(collectors),
+            'changed':              len(changed),
+            'removed':              len(removed),
+            'sources_fetched':      len(to_fetch) - errors,
+            'errors':               errors,
+            'seconds':              time.monotonic() - started
+        }
+
+    def __store_sources(self, fetched, fetched_at):
+        """Store the Sources of each (collector ID, list_sources response) pair, and return the number that failed.
+
+        The body of a changed Collector is already stored, so one whose Sources could not be fetched is marked as
+        never fetched, or the next refresh would see nothing to fetch again.
+        """
+        errors = 0
+        with self.__lock, self.__connection:
+            for collector_id, response in fetched:
+                if isinstance(response, Exception) or not response.ok:
+                    self.__connection.execute('UPDATE collectors SET sources_fetched_at = NULL WHERE id = ?', (collector_id,))
+                    errors += 1
+                    continue
+                self.__connection.execute('DELETE FROM sources WHERE collector_id = ?', (collector_id,))
+                self.__connection.executemany(
+                    'INSERT OR REPLACE INTO sources (id, collector_id, name, source_type, category, body) VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (source['id'], collector_id, source.get('name'), source.get('sourceType'), source.get('category'), json.dumps(source))
+                        for source in response.json().get('sources', [])
+                    ]
+                )
+                self.__connection.execute('UPDATE collectors SET sources_fetched_at = ? WHERE id = ?', (fetched_at, collector_id))
+        return errors
+
+    def refresh_content(self, folder_id = None, is_admin_mode = None, concurrency = 8, max_age = None):
+        """Mirror a content folder and every folder below it. Folders fetched less than max_age seconds ago are not
+        fetched again, but the folders below them still are if they are stale. Items no longer in a folder are removed
+        along with everything below them.
+
+        Returns a dictionary of statistics: the number of folders fetched, left as they were, and that failed, the
+        number of items removed, and the seconds taken.
+
+        Args:
+            folder_id: string, the folder to start from. Defaults to the personal folder of the access key's user.
+            is_admin_mode: bool, whether folders are fetched in admin mode.
+            concurrency: int, the maximum number of get_folder requests running at once.
+            max_age: float, overrides the mirror's max_age for this refresh.
+        """
+        started = time.monotonic()
+        now     = time.time()
+        oldest  = now - (self.__max_age if max_age is None else max_age)
+        stats   = collections.Counter(fetched = 0, fresh = 0, errors = 0, removed = 0)
+
+        if folder_id is None:
+            response = self.__client.get_personal_folder()
+            response.raise_for_status()
+            folder = response.json()
+            stats['removed'] += self.__store_folder(folder, now)
+            stats['fetched'] += 1
+            level = self.__child_folders(folder['id'])
+        else:
+            level = [folder_id]
+
+        while level:
+            with self.__lock:
+                fetched_at = {
+                    row['id']: row['fetched_at']
+                    for chunk in _chunks(level)
+                    for row in self.__connection.execute(
+                        'SELECT id, fetched_at FROM content WHERE id IN ({0})'.format(', '.join('?' * len(chunk))),
+                        chunk
+                    )
+                }
+            fresh       = [item_id for item_id in level if (fetched_at.get(item_id) or 0) >= oldest]
+            stale       = [item_id for item_id in level if item_id not in fresh]
+            responses   = self.__client.map('get_folder', stale, itertools.repeat(is_admin_mode), concurrency = concurrency)
+
+            level = []
+            for item_id in fresh:
+                stats['fresh'] += 1
+                level.extend(self.__child_folders(item_id))
+            for item_id, response in zip(stale, responses):
+                if isinstance(response, Exception) or not response.ok:
+                    stats['errors'] += 1
+                    continue
+                stats['removed'] += self.__store_folder(response.json(), now)
+                stats['fetched'] += 1
+                level.extend(self.__child_folders(item_id))
+
+        return dict(stats, seconds = time.monotonic() - started)
+
+    def __store_folder(self, folder, fetched_at):
+        """Store a folder and its children, removing children it no longer has. Returns the number of items removed."""
+        children    = folder.get('children', [])
+        body        = dict(folder)
+        body.pop('children', None)
+        with self.__lock, self.__connection:
+            self.__upsert_content(body, fetched_at)
+            for child in children:
+                self.__upsert_content(dict(child, parentId = folder['id']), None)
+
+            kept    = set(child['id'] for child in children)
+            gone    = [
+                row['id'] for row in self.__connection.execute('SELECT id FROM content WHERE parent_id = ?', (folder['id'],))
+                if row['id'] not in kept
+            ]
+            removed = 0
+            while gone:
+                below = []
+                for chunk in _chunks(gone):
+                    placeholders = ', '.join('?' * len(chunk))
+                    removed += self.__connection.execute('DELETE FROM content WHERE id IN ({0})'.format(placeholders), chunk).rowcount
+                    below.extend(
+                        row['id'] for row in self.__connection.execute(
+                            'SELECT id FROM content WHERE parent_id IN ({0})'.format(placeholders),
+                            chunk
+                        )
+                    )
+                gone = below
+            return removed
+
+    def __upsert_content(self, item, fetched_at):
+        # Listing a folder's children must not mark the child folders themselves as fetched.
+        self.__connection.execute(
+            'INSERT INTO content (id, parent_id, name, item_type, body, fetched_at) VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (id) DO UPDATE SET parent_id = excluded.parent_id, name = excluded.name, '
+            'item_type = excluded.item_type, body = excluded.body, fetched_at = coalesce(excluded.fetched_at, fetched_at)',
+            (item['id'], item.get('parentId'), item.get('name'), item.get('itemType'), json.dumps(item), fetched_at)
+        )
+
+    def __child_folders(self, folder_id):
+        with self.__lock:
+            return [
+                row['id'] for row in self.__connection.execute(
+                    "SELECT id FROM content WHERE parent_id = ? AND item_type = 'Folder'",
+                    (folder_id,)
+                )
+            ]
+
+    def collectors(self, name = None, collector_type = None, alive = None):
+        """Get the mirrored Collectors, optionally only those with the given name, type (ie - 'Hosted') or liveness."""
+        return self.__query('collectors', name = name, collector_type = collector_type, alive = alive)
+
+    def collector(self, collector_id):
+        """Get a mirrored Collector by its ID, or None."""
+        collectors = self.__query('collectors', id = collector_id)
+        return collectors[0] if collectors else None
+
+    def sources(self, collector_id = None, source_type = None, category = None):
+        """Get the mirrored Sources, optionally only those of one Collector, of a type (ie - 'HTTP') or with a
+        category."""
+        return self.__query('sources', collector_id = collector_id, source_type = source_type, category = category)
+
+    def content(self, parent_id = None, name = None, item_type = None):
+        """Get the mirrored content items, optionally only those in one folder, with a name, or of a type (ie -
+        'Folder', 'Dashboard')."""
+        return self.__query('content', parent_id = parent_id, name = name, item_type = item_type)
+
+    def __query(self, table, **filters):
+        filters = {column: value for column, value in filters.items() if value is not None}
+        query   = 'SELECT body FROM {0}'.format(table)
+        if filters:
+            query += ' WHERE ' + ' AND '.join('{0} = ?'.format(column) for column in filters)
+        with self.__lock:
+            return [json.loads(row['body']) for row in self.__connection.execute(query + ' ORDER BY rowid', list(filters.values()))]
+
+
+
+# # # ==================================================
+# # #
+# # # COLLECTOR NAME INDEX
+# # #
+# # # Looking a Collector up by name through the API costs a request each time, and the API cannot look up names
+# # # containing ; / % or \. SumoCollectorIndex instead builds a map of every Collector's name from the Collector
+# # # listing, and rebuilds it in the background, so lookups are dictionary lookups.
+
+class SumoCollectorIndex:
+    """An in-process index of Collectors by name and ID, rebuilt from list_collectors every refresh_interval seconds.
+
+    Lookups never make requests, and may be made from any number of threads. A rebuild replaces the whole index at
+    once, so a lookup sees either the old or the new listing, never a mix. If a background rebuild fails, the previous
+    index is kept and the failure is counted in stats.
+    """
+    def __init__(self, client, refresh_interval = 300, page_size = 1000, concurrency = 4):
+        """Build the index, blocking until the first listing has been read.
+
+        Args:
+            client: SumoClient, the client listing the Collectors.
+            refresh_interval: float, the number of seconds between background rebuilds, or None to only rebuild when
+                refresh() is called.
+            page_size: int, the number of Collectors to request per page.
+            concurrency: int, the maximum number of pages requested at once.
+        """
+        if isinstance(client, AsyncSumoClient):
+            raise TypeError('SumoCollectorIndex: client must be a SumoClient, not an AsyncSumoClient.')
+
+        self.__client           = client
+        self.__page_size        = page_size
+        self.__concurrency      = concurrency
+        self.__index            = ({}, {})
+        self.__stats            = collections.Counter(refreshes = 0, failures = 0)
+        self.__refreshed_at     = None
+        self.__last_error       = None
+        self.__lock             = threading.Lock()
+        self.__stop             = threading.Event()
+        self.__thread           = None
+
+        self.refresh()
+        if refresh_interval:
+            self.__thread = threading.Thread(
+                target  = self.__refresh_periodically,
+                args    = (refresh_interval,),
+                name    = 'SumoCollectorIndex',
+                daemon  = True
+            )
+            self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop the background rebuilds."""
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def refresh(self):
+        """Rebuild the index from a full Collector listing."""
+        by_name = {}
+        by_id   = {}
+        for collector in self.__client.iter_collectors(page_size = self.__page_size, concurrency = self.__concurrency):
+            by_name[collector['name']]  = collector
+            by_id[collector['id']]      = collector
+
+        # Lookups read the index without the lock, which only keeps the statistics consistent between threads.
+        with self.__lock:
+            self.__index        = (by_name, by_id)
+            self.__refreshed_at = time.time()
+            self.__stats['refreshes'] += 1
+
+    def __refresh_periodically(self, refresh_interval):
+        while not self.__stop.wait(refresh_interval):
+            try:
+                self.refresh()
+            except Exception as error:
+                with self.__lock:
+                    self.__last_error = error
+                    self.__stats['failures'] += 1
+
+    def get(self, collector_name, default = None):
+        """Get the Collector with the given name, as returned by list_collectors, or default."""
+        return self.__index[0].get(collector_name, default)
+
+    def id_for(self, collector_name, default = None):
+        """Get the ID of the Collector with the given name, or default."""
+        collector = self.__index[0].get(collector_name)
+        return default if collector is None else collector['id']
+
+    def by_id(self, collector_id, default = None):
+        """Get the Collector with the given ID, as returned by list_collectors, or default."""
+        return self.__index[1].get(collector_id, default)
+
+    def __contains__(self, collector_name):
+        return collector_name in self.__index[0]
+
+    def __len__(self):
+        return len(self.__index[0])
+
+    @property
+    def stats(self):
+        """The number of Collectors indexed, of rebuilds made and failed, the time of the last rebuild (seconds since
+        the epoch), and the error of the last failed rebuild."""
+        with self.__lock:
+            return dict(
+                self.__stats,
+                collectors      = len(self.__index[0]),
+                refreshed_at    = self.__refreshed_at,
+                last_error      = self.__last_error
+            )
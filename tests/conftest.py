@@ -0,0 +1,80 @@
+import http.server
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _ApiHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.api.handle(self)
+
+    def do_PUT(self):
+        self.server.api.handle(self)
+
+    def do_POST(self):
+        self.server.api.handle(self)
+
+    def do_DELETE(self):
+        self.server.api.handle(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadedServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class FakeApi:
+    """A local HTTP server standing in for the Sumo Logic API.
+
+    respond(path) returns (status, body, delay), or (status, body, delay, headers) to send extra headers. requests
+    lists the paths requested, and received the (method, path, headers, body) of every request.
+    """
+    def __init__(self):
+        self.respond    = lambda path: (200, b'{}', 0)
+        self.requests   = []
+        self.received   = []
+        self.__lock     = threading.Lock()
+        self.__server   = _ThreadedServer(('127.0.0.1', 0), _ApiHandler)
+        self.__server.api = self
+        self.url        = 'http://127.0.0.1:{0}/api'.format(self.__server.server_address[1])
+        threading.Thread(target = self.__server.serve_forever, daemon = True).start()
+
+    def handle(self, handler):
+        request_body = handler.rfile.read(int(handler.headers.get('Content-Length') or 0))
+        with self.__lock:
+            self.requests.append(handler.path)
+            self.received.append((handler.command, handler.path, dict(handler.headers), request_body))
+        status, body, delay, *headers = self.respond(handler.path)
+        time.sleep(delay)
+        try:
+            handler.send_response(status)
+            handler.send_header('Content-Type', 'application/json')
+            handler.send_header('Content-Length', str(len(body)))
+            for name, value in (headers[0] if headers else {}).items():
+                handler.send_header(name, value)
+            handler.end_headers()
+            handler.wfile.write(body)
+        except OSError:
+            # The client gave up on the request, as it does with the losing attempt of a hedged request.
+            pass
+
+    def close(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
+@pytest.fixture
+def api():
+    fake_api = FakeApi()
+    yield fake_api
+    fake_api.close()
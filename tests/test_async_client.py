@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+
+import pytest
+
+import main
+
+pytest.importorskip('aiohttp')
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_responses_mirror_the_sync_client(api):
+    api.respond = lambda path: (200, b'{"collector": {"id": 1}}', 0)
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            return await client.get_collector_by_id(1)
+
+    response    = run(scenario())
+    sync_client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    expected    = sync_client.get_collector_by_id(1)
+    sync_client.close()
+    assert isinstance(response, main.AsyncSumoResponse)
+    assert (response.status_code, response.ok, response.json(), response.retries) == (expected.status_code, expected.ok, expected.json(), expected.retries)
+    assert api.requests == ['/api/v1/collectors/1', '/api/v1/collectors/1']
+
+
+def test_retries_is_set_before_any_retry():
+    response = main.AsyncSumoResponse(200, 'OK', {}, 'https://api.sumologic.com/api/v1/collectors', b'{}')
+    assert response.retries == 0
+
+
+def test_endpoint_is_resolved_on_the_event_loop(api, monkeypatch):
+    monkeypatch.setattr(main, '_DEFAULT_API_ENDPOINT', api.url)
+
+    def blocking_probe(self):
+        raise AssertionError('the endpoint was resolved with a blocking request')
+    monkeypatch.setattr(main.SumoClient, '_SumoClient__get_geo_endpoint', blocking_probe)
+
+    async def scenario():
+        client = main.AsyncSumoClient(str(uuid.uuid4()), 'key', rate_limiter = False)
+        assert client.endpoint == main._PENDING_ENDPOINT
+        responses = await asyncio.gather(*[client.get_collector_by_id(index) for index in range(3)])
+        assert client.endpoint == api.url
+        await client.aclose()
+        return responses
+
+    assert [response.status_code for response in run(scenario())] == [200, 200, 200]
+    # Calls made while the endpoint was unknown shared a single probe.
+    assert api.requests.count('/api') == 1
+    assert sorted(api.requests[1:]) == ['/api/v1/collectors/0', '/api/v1/collectors/1', '/api/v1/collectors/2']
+
+
+def test_close_without_awaiting_closes_the_sessions(api):
+    async def scenario():
+        client = main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+        await client.get_collector_by_id(1)
+        assert client.close() is None
+        await asyncio.sleep(0)
+
+    run(scenario())
+
+
+def test_close_outside_the_event_loop_is_refused(api):
+    async def scenario():
+        client = main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+        await client.get_collector_by_id(1)
+        return client
+
+    client = run(scenario())
+    with pytest.raises(RuntimeError):
+        client.close()
+
+
+def test_sync_context_manager_is_refused():
+    client = main.AsyncSumoClient('id', 'key', deployment = 'us2', rate_limiter = False)
+    with pytest.raises(TypeError):
+        with client:
+            pass
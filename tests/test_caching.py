@@ -0,0 +1,201 @@
+import json
+
+import pytest
+
+import main
+
+
+def etag_server(api, versions):
+    # Serves the current version of every path with its ETag, answering 304 when the client already has it.
+    def respond(path):
+        headers = api.received[-1][2]
+        etag    = '"{0}"'.format(versions.get(path, 0))
+        if headers.get('If-None-Match') == etag:
+            return 304, b'', 0, {'ETag': etag}
+        return 200, '{{"path": "{0}", "version": {1}}}'.format(path, versions.get(path, 0)).encode(), 0, {'ETag': etag}
+    return respond
+
+
+def test_unchanged_objects_are_answered_from_the_etag_cache(api):
+    versions    = {}
+    api.respond = etag_server(api, versions)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, etag_cache = True)
+    first       = client.get_collector_by_id(1)
+    second      = client.get_collector_by_id(1)
+    assert second.status_code == 200
+    assert second.json() == first.json() == {'path': '/api/v1/collectors/1', 'version': 0}
+    assert [headers.get('If-None-Match') for _, _, headers, _ in api.received] == [None, '"0"']
+    assert client.etag_cache.stats == {'hits': 1, 'misses': 1, 'bytes_saved': len(first.content), 'entries': 1}
+
+    versions['/api/v1/collectors/1'] = 1
+    assert client.get_collector_by_id(1).json()['version'] == 1
+    assert client.etag_cache.stats['misses'] == 2
+    client.close()
+
+
+def test_each_etag_hit_is_a_copy_of_its_own(api):
+    api.respond = etag_server(api, {})
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, etag_cache = True)
+    client.get_collector_by_id(1)
+    first       = client.get_collector_by_id(1)
+    first.headers['ETag'] = 'changed'
+    second      = client.get_collector_by_id(1)
+    assert second is not first
+    assert second.headers['ETag'] == '"0"'
+    assert api.received[-1][2]['If-None-Match'] == '"0"'
+    client.close()
+
+
+def test_responses_without_etag_are_not_cached(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, etag_cache = True)
+    client.get_collector_by_id(1)
+    client.get_collector_by_id(1)
+    assert all('If-None-Match' not in headers for _, _, headers, _ in api.received)
+    assert client.etag_cache.stats['entries'] == 0
+    client.close()
+
+
+def test_etag_cache_evicts_the_least_recently_used():
+    cache = main.SumoETagCache(max_entries = 2)
+    for key in 'abc':
+        response = main.AsyncSumoResponse(200, 'OK', {'ETag': key}, key, b'{}')
+        assert cache.resolve(key, None, response) is response
+    assert cache.get('a') is None
+    assert cache.get('c').headers['ETag'] == 'c'
+    with pytest.raises(ValueError):
+        main.SumoETagCache(max_entries = 0)
+
+
+def collector_server(api):
+    # Answers every request with a fresh version number, so a cached response can be told apart from a new one.
+    def respond(path):
+        return 200, '{{"collector": {{"id": 1, "version": {0}}}}}'.format(len(api.requests)).encode(), 0, {'ETag': '"etag"'}
+    return respond
+
+
+def test_read_cache_answers_repeated_reads(api):
+    api.respond = collector_server(api)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, read_cache = True)
+    first       = client.get_collector_by_id(1)
+    second      = client.get_collector_by_id(1)
+    assert second.json() == first.json()
+    assert second is not first
+    assert len(api.requests) == 1
+    assert client.read_cache.stats == {'hits': 1, 'misses': 1, 'expired': 0, 'evicted': 0, 'invalidated': 0, 'entries': 1}
+    client.close()
+
+
+def test_uncacheable_reads_skip_the_read_cache(api):
+    api.respond = lambda path: (200, b'{"status": "InProgress"}', 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, read_cache = True)
+    for _ in range(2):
+        client.get_global_folder_status('job1')
+        client.list_offline_collectors()
+    assert len(api.requests) == 4
+    assert client.read_cache.stats == {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'invalidated': 0, 'entries': 0}
+    client.close()
+
+
+def test_read_cache_entries_expire(api, monkeypatch):
+    api.respond = collector_server(api)
+    now         = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, read_cache = main.SumoReadCache({'v1/collectors/*': 10}))
+    client.get_collector_by_id(1)
+    now[0]     += 11
+    client.get_collector_by_id(1)
+    assert len(api.requests) == 2
+    assert client.read_cache.stats['expired'] == 1
+    client.close()
+
+
+def test_writes_invalidate_related_reads(api):
+    api.respond = collector_server(api)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, read_cache = True)
+    client.get_collector_by_id(1)
+    client.get_collector_by_id(2)
+    client.delete_collector_by_id(1)
+    client.get_collector_by_id(2)
+    client.get_collector_by_id(1)
+    assert api.requests == ['/api/v1/collectors/1', '/api/v1/collectors/2', '/api/v1/collectors/1', '/api/v1/collectors/1']
+    assert client.read_cache.stats['invalidated'] == 1
+    client.close()
+
+
+def test_update_reads_a_fresh_etag(api):
+    api.respond = collector_server(api)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, read_cache = True, validation = 'off')
+    client.get_collector_by_id(1)
+    client.update_collector(1, {'description': 'updated'})
+    assert [method for method, _, _, _ in api.received] == ['GET', 'GET', 'PUT']
+    assert api.received[-1][2]['If-Match'] == '"etag"'
+    client.close()
+
+
+def test_read_cache_ttls():
+    cache = main.SumoReadCache()
+    assert cache.ttl('https://api.sumologic.com/api/v1/collectors/1') == 60
+    assert cache.ttl('https://api.sumologic.com/api/v1/collectors/offline') is None
+    assert cache.ttl('https://api.sumologic.com/api/v1/collectors/upgrades/targets') == 3600
+    assert cache.ttl('https://api.sumologic.com/api/v1/collectors') is None
+    assert cache.ttl('https://api.sumologic.com/api/v2/content/folders/global/job1/status') is None
+
+
+def test_reads_finished_after_a_write_are_not_cached():
+    cache       = main.SumoReadCache()
+    key         = ('https://api.sumologic.com/api/v1/collectors/1', None, None)
+    generation  = cache.generation
+    cache.invalidate('https://api.sumologic.com/api/v1/collectors/1')
+    cache.store(key, main.AsyncSumoResponse(200, 'OK', {}, key[0], b'{}'), generation)
+    assert cache.stats['entries'] == 0
+
+
+CONTENT_URL = 'https://api.sumologic.com/api/v2/content'
+
+
+def content_response(body):
+    return main.AsyncSumoResponse(200, 'OK', {}, CONTENT_URL, json.dumps(body).encode())
+
+
+def learned_cache():
+    cache = main.SumoContentCache()
+    cache.observe('GET', CONTENT_URL + '/path', {'path': '/Library/Users/me'}, content_response({
+        'id': 'home', 'name': 'me', 'children': [{'id': 'reports', 'name': 'Reports'}]
+    }))
+    cache.observe('GET', CONTENT_URL + '/folders/reports', None, content_response({
+        'id': 'reports', 'name': 'Reports', 'parentId': 'home', 'children': [{'id': 'weekly', 'name': 'Weekly'}]
+    }))
+    return cache
+
+
+def test_content_paths_below_a_known_folder_are_derived():
+    cache = learned_cache()
+    assert cache.id_for('/Library/Users/me/Reports/Weekly') == 'weekly'
+    assert cache.path_for('weekly') == '/Library/Users/me/Reports/Weekly'
+    assert cache.path_for('unknown') is None
+    assert (cache.stats['hits'], cache.stats['misses']) == (2, 1)
+
+
+def test_moving_content_forgets_its_paths():
+    cache = learned_cache()
+    assert cache.path_for('weekly') is not None
+    cache.observe('POST', CONTENT_URL + '/reports/move', {'destinationFolderId': 'elsewhere'}, content_response({}))
+    assert cache.path_for('reports') is None
+    assert cache.path_for('weekly') is None
+    assert cache.id_for('/Library/Users/me/Reports') is None
+
+
+def test_failed_content_responses_teach_nothing():
+    cache = main.SumoContentCache()
+    cache.observe('GET', CONTENT_URL + '/home/path', None, main.AsyncSumoResponse(404, 'Not Found', {}, CONTENT_URL, b'{}'))
+    assert cache.path_for('home') is None
+
+
+def test_client_resolves_content_from_the_cache(api):
+    api.respond = lambda path: (200, b'{"id": "home", "name": "me", "children": []}', 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, content_cache = True)
+    assert client.resolve_content_id('/Library/Users/me') == 'home'
+    assert client.resolve_content_id('/Library/Users/me/') == 'home'
+    assert client.resolve_content_path('home') == '/Library/Users/me'
+    assert len(api.requests) == 1
+    client.close()
@@ -0,0 +1,104 @@
+import pytest
+
+import main
+
+URL = 'https://api.sumologic.com/api/v1/collectors/1'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(main.time, 'monotonic', clock)
+    return clock
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.release(breaker.acquire(URL), False)
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = main.SumoCircuitBreaker(failure_threshold = 3, reset_timeout = 30)
+    fail(breaker, 2)
+    breaker.release(breaker.acquire(URL), True)
+    fail(breaker, 2)
+    assert breaker.state('collectors') == 'closed'
+
+    fail(breaker, 1)
+    assert breaker.state('collectors') == 'open'
+    with pytest.raises(main.SumoCircuitOpen) as raised:
+        breaker.acquire(URL)
+    assert raised.value.family == 'collectors'
+    assert raised.value.retry_in == pytest.approx(30)
+    assert breaker.stats == {'opened': 1, 'rejected': 1}
+
+
+def test_families_are_isolated(clock):
+    breaker = main.SumoCircuitBreaker(failure_threshold = 1)
+    fail(breaker, 1)
+    breaker.release(breaker.acquire('https://api.sumologic.com/api/v2/content/folders/1'), True)
+    assert breaker.states == {'collectors': 'open', 'content': 'closed'}
+
+
+def test_half_open_probes_close_the_circuit(clock):
+    breaker = main.SumoCircuitBreaker(failure_threshold = 1, reset_timeout = 10, half_open_probes = 2)
+    fail(breaker, 1)
+    clock.now += 10
+    assert breaker.state('collectors') == 'half-open'
+
+    first   = breaker.acquire(URL)
+    second  = breaker.acquire(URL)
+    with pytest.raises(main.SumoCircuitOpen):
+        breaker.acquire(URL)
+
+    breaker.release(first, True)
+    assert breaker.state('collectors') == 'half-open'
+    breaker.release(second, True)
+    assert breaker.state('collectors') == 'closed'
+    breaker.release(breaker.acquire(URL), True)
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = main.SumoCircuitBreaker(failure_threshold = 1, reset_timeout = 10, half_open_probes = 2)
+    fail(breaker, 1)
+    clock.now += 10
+    first   = breaker.acquire(URL)
+    second  = breaker.acquire(URL)
+    breaker.release(first, False)
+    assert breaker.state('collectors') == 'open'
+
+    # The other probe finishing later belongs to the previous half-open period, and is ignored.
+    breaker.release(second, True)
+    assert breaker.state('collectors') == 'open'
+    assert breaker.stats['opened'] == 2
+
+
+def test_cancelled_probe_frees_its_slot(clock):
+    breaker = main.SumoCircuitBreaker(failure_threshold = 1, reset_timeout = 10, half_open_probes = 1)
+    fail(breaker, 1)
+    clock.now += 10
+    probe = breaker.acquire(URL)
+    breaker.release(probe, None)
+    assert breaker.state('collectors') == 'half-open'
+    breaker.release(breaker.acquire(URL), True)
+    assert breaker.state('collectors') == 'closed'
+
+
+def test_client_fails_fast_while_open(api):
+    api.respond = lambda path: (503, b'{}', 0)
+    breaker = main.SumoCircuitBreaker(failure_threshold = 2, reset_timeout = 60)
+    client  = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, retry_policy = False, circuit_breaker = breaker)
+    assert client.get_collector_by_id(1).status_code == 503
+    assert client.get_collector_by_id(1).status_code == 503
+    with pytest.raises(main.SumoCircuitOpen):
+        client.get_collector_by_id(1)
+    assert len(api.requests) == 2
+    client.close()
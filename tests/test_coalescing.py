@@ -0,0 +1,86 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import main
+
+
+def test_identical_concurrent_gets_share_one_request(api):
+    api.respond = lambda path: (200, '{{"path": "{0}"}}'.format(path).encode(), 0.2)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, coalesce_requests = True)
+    with concurrent.futures.ThreadPoolExecutor(10) as executor:
+        responses = list(executor.map(lambda index: client.get_collector_by_id(index % 2), range(10)))
+    assert [response.json()['path'] for response in responses[:2]] == ['/api/v1/collectors/0', '/api/v1/collectors/1']
+    assert len(api.requests) == 2
+    assert client.coalesce_stats == {'sent': 2, 'coalesced': 8}
+    client.close()
+
+
+def test_errors_are_shared_and_the_flight_ends():
+    client  = main.SumoClient('id', 'key', deployment = 'https://api.sumologic.com/api', rate_limiter = False, coalesce_requests = True)
+    release = threading.Event()
+    calls   = []
+
+    def send():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        raise ConnectionError('unreachable')
+
+    def call():
+        try:
+            client._coalesce(('key',), send)
+        except ConnectionError as error:
+            return error
+
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        results = [executor.submit(call) for _ in range(3)]
+        while client.coalesce_stats['coalesced'] < 2:
+            time.sleep(0.01)
+        release.set()
+        errors = [result.result() for result in results]
+    assert len(calls) == 1
+    assert all(isinstance(error, ConnectionError) for error in errors)
+
+    # Once the request has finished, the next call sends a request of its own.
+    assert client._coalesce(('key',), lambda: 'fresh') == 'fresh'
+    client.close()
+
+
+def test_sequential_gets_are_not_coalesced(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, coalesce_requests = True)
+    client.get_collector_by_id(1)
+    client.get_collector_by_id(1)
+    assert len(api.requests) == 2
+    client.close()
+
+
+def test_each_caller_gets_a_response_of_its_own(api):
+    api.respond = lambda path: (200, b'{"id": 1}', 0.2)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, coalesce_requests = True)
+    with concurrent.futures.ThreadPoolExecutor(5) as executor:
+        responses = list(executor.map(lambda _: client.get_collector_by_id(1), range(5)))
+    assert len(api.requests) == 1
+    assert len({id(response) for response in responses}) == 5
+    responses[0].headers['X-Changed'] = 'yes'
+    assert all('X-Changed' not in response.headers for response in responses[1:])
+    assert all(response.json() == {'id': 1} for response in responses)
+    client.close()
+
+
+def test_async_callers_get_responses_of_their_own(api):
+    pytest.importorskip('aiohttp')
+    api.respond = lambda path: (200, b'{"id": 1}', 0.2)
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False, coalesce_requests = True) as client:
+            responses = await asyncio.gather(*[client.get_collector_by_id(1) for _ in range(5)])
+            return responses, client.coalesce_stats
+
+    responses, stats = asyncio.run(scenario())
+    assert stats == {'sent': 1, 'coalesced': 4}
+    assert len({id(response) for response in responses}) == 5
+    responses[0].headers['X-Changed'] = 'yes'
+    assert all('X-Changed' not in response.headers for response in responses[1:])
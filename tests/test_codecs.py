@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+import main
+
+
+class RecordingCodec:
+    """Encodes and decodes with the standard library, recording what it was asked to do."""
+    def __init__(self):
+        self.calls = []
+
+    def dumps(self, value):
+        self.calls.append('dumps')
+        return json.dumps(value).encode('utf-8')
+
+    def loads(self, content):
+        self.calls.append('loads')
+        return json.loads(content)
+
+
+def test_codec_encodes_requests_and_decodes_responses(api):
+    api.respond = lambda path: (200, b'{"collector": {"id": 1}}', 0)
+    codec       = RecordingCodec()
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, validation = 'off', json_codec = codec)
+    response    = client.create_hosted_collector({'collector': {'collectorType': 'Hosted', 'name': 'web'}})
+    assert response.json() == {'collector': {'id': 1}}
+    assert codec.calls == ['dumps', 'loads']
+    assert json.loads(api.received[0][3]) == {'collector': {'collectorType': 'Hosted', 'name': 'web'}}
+
+    # Keyword arguments are only understood by the standard library, which decodes the call instead.
+    assert response.json(parse_int = str) == {'collector': {'id': '1'}}
+    assert codec.calls == ['dumps', 'loads']
+    assert client.json_codec is codec
+    client.close()
+
+
+def test_requests_without_data_have_no_body(api):
+    codec   = RecordingCodec()
+    client  = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, json_codec = codec)
+    client.delete_collector_by_id(1)
+    method, _, headers, body = api.received[0]
+    assert (method, body) == ('DELETE', b'')
+    assert 'Content-Type' not in headers
+    assert 'dumps' not in codec.calls
+    client.close()
+
+
+def test_orjson_codec(api):
+    orjson      = pytest.importorskip('orjson')
+    api.respond = lambda path: (200, b'{"collector": {"id": 1}}', 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, validation = 'off', json_codec = orjson)
+    assert client.create_hosted_collector({'collector': {'collectorType': 'Hosted', 'name': 'web'}}).json() == {'collector': {'id': 1}}
+    assert json.loads(api.received[0][3])['collector']['name'] == 'web'
+    client.close()
+
+
+def test_async_responses_use_the_codec(api):
+    pytest.importorskip('aiohttp')
+    api.respond = lambda path: (200, b'{"collector": {"id": 1}}', 0)
+    codec       = RecordingCodec()
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False, json_codec = codec) as client:
+            return (await client.get_collector_by_id(1)).json()
+
+    assert asyncio.run(scenario()) == {'collector': {'id': 1}}
+    assert codec.calls == ['loads']
+
+
+COLLECTOR = {'collector': {'collectorType': 'Hosted', 'name': 'web', 'description': 'x' * 2000}}
+
+
+def test_large_request_bodies_are_compressed(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, validation = 'off', compress_requests = 1024)
+    client.create_hosted_collector(COLLECTOR)
+    client.create_hosted_collector({'collector': {'collectorType': 'Hosted', 'name': 'small'}})
+    (_, _, large_headers, large_body), (_, _, small_headers, small_body) = api.received
+    assert large_headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(large_body)) == COLLECTOR
+    assert 'Content-Encoding' not in small_headers
+    assert json.loads(small_body)['collector']['name'] == 'small'
+
+    stats = client.transfer_stats
+    assert stats['requests_compressed'] == 1
+    assert stats['request_bytes'] == len(json.dumps(COLLECTOR)) + len(small_body)
+    assert stats['request_wire_bytes'] == len(large_body) + len(small_body)
+    client.close()
+
+
+def test_request_bodies_are_not_compressed_by_default(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, validation = 'off')
+    client.create_hosted_collector(COLLECTOR)
+    assert 'Content-Encoding' not in api.received[0][2]
+    assert client.transfer_stats['requests_compressed'] == 0
+    client.close()
+
+
+def gzipped_response(path):
+    body = json.dumps({'data': ['x' * 100] * 100}).encode()
+    return 200, gzip.compress(body), 0, {'Content-Encoding': 'gzip'}
+
+
+def test_compressed_responses_are_decompressed_and_counted(api):
+    api.respond = gzipped_response
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    assert client.get_collector_by_id(1).json() == {'data': ['x' * 100] * 100}
+    assert 'gzip' in api.received[0][2]['Accept-Encoding']
+    stats = client.transfer_stats
+    assert stats['response_wire_bytes'] < stats['response_bytes']
+    assert stats['bytes_saved'] == stats['response_bytes'] - stats['response_wire_bytes']
+    client.close()
+
+
+def test_async_compressed_responses(api):
+    pytest.importorskip('aiohttp')
+    api.respond = gzipped_response
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            response = await client.get_collector_by_id(1)
+            return response.json(), client.transfer_stats
+
+    body, stats = asyncio.run(scenario())
+    assert body == {'data': ['x' * 100] * 100}
+    assert stats['response_wire_bytes'] < stats['response_bytes']
@@ -0,0 +1,72 @@
+import concurrent.futures
+import json
+import time
+
+import pytest
+
+import main
+
+
+def collector_listing(api, names):
+    def respond(path):
+        if '/v1/collectors' not in path:
+            return 404, b'{}', 0
+        collectors = [{'id': index, 'name': name} for index, name in enumerate(names) if 'offset=0' in path]
+        return 200, json.dumps({'collectors': collectors}).encode(), 0
+    api.respond = respond
+
+
+@pytest.fixture
+def client(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, retry_policy = False)
+    yield client
+    client.close()
+
+
+def test_lookups_never_make_requests(api, client):
+    collector_listing(api, ['web', 'db;primary'])
+    index = main.SumoCollectorIndex(client, refresh_interval = None)
+    sent  = len(api.requests)
+    assert index.id_for('db;primary') == 1
+    assert index.get('web') == {'id': 0, 'name': 'web'}
+    assert index.by_id(1)['name'] == 'db;primary'
+    assert index.get('missing', 'default') == 'default'
+    assert 'web' in index and len(index) == 2
+    assert len(api.requests) == sent
+    index.close()
+
+
+def test_refresh_replaces_the_index(api, client):
+    names = ['web']
+    collector_listing(api, names)
+    index = main.SumoCollectorIndex(client, refresh_interval = None)
+    names[0] = 'renamed'
+    index.refresh()
+    assert 'web' not in index
+    assert index.id_for('renamed') == 0
+    assert index.stats['refreshes'] == 2
+    index.close()
+
+
+def test_failed_background_refresh_keeps_the_index(api, client):
+    collector_listing(api, ['web'])
+    index = main.SumoCollectorIndex(client, refresh_interval = 0.05)
+    api.respond = lambda path: (500, b'{}', 0)
+    deadline = time.monotonic() + 2
+    while index.stats['failures'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    index.close()
+    stats = index.stats
+    assert stats['failures'] >= 1
+    assert stats['collectors'] == 1
+    assert index.id_for('web') == 0
+    assert stats['last_error'] is not None
+
+
+def test_stats_are_counted_under_concurrent_refreshes(api, client):
+    collector_listing(api, ['web'])
+    index = main.SumoCollectorIndex(client, refresh_interval = None)
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: index.refresh(), range(40)))
+    assert index.stats['refreshes'] == 41
+    index.close()
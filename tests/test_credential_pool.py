@@ -0,0 +1,82 @@
+import base64
+import collections
+import uuid
+
+import pytest
+
+import main
+
+
+def access_ids(count):
+    # Every key of a pool is paced by the limiter shared by its access ID, so each test uses IDs of its own.
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+def pool_of(ids, **kwargs):
+    return main.SumoCredentialPool([(access_id, 'key') for access_id in ids], **kwargs)
+
+
+def access_id_of(headers):
+    return base64.b64decode(headers['Authorization'].split()[1]).decode().split(':')[0]
+
+
+def test_pools_need_unique_keys():
+    with pytest.raises(ValueError):
+        main.SumoCredentialPool([])
+    with pytest.raises(ValueError):
+        main.SumoCredentialPool([('a', 'key'), ('a', 'other')])
+
+
+def test_least_loaded_key_is_chosen():
+    first, second = ids = access_ids(2)
+    pool    = pool_of(ids)
+    a       = pool.acquire()
+    b       = pool.acquire()
+    assert (a.access_id, b.access_id) == (first, second)
+    pool.release(a, 200)
+    assert pool.acquire() is a
+    assert pool.stats[first] == {'in_flight': 1, 'requests': 2, 'quarantines': 0, 'quarantined_for': 0.0}
+
+
+def test_rejected_and_throttled_keys_are_quarantined():
+    first, second, third = ids = access_ids(3)
+    pool = pool_of(ids, unauthorized_quarantine = 300, throttled_quarantine = 10)
+    pool.release(pool.acquire(), 401)
+    pool.release(pool.acquire(), 429, {'Retry-After': '60'})
+    assert pool.stats[first]['quarantined_for'] == pytest.approx(300, abs = 1)
+    assert pool.stats[second]['quarantined_for'] == pytest.approx(60, abs = 1)
+    assert [pool.acquire().access_id for _ in range(2)] == [third, third]
+
+    # With every key quarantined, the one released soonest is used.
+    pool.release(pool.acquire(), 429)
+    assert not pool.available
+    assert pool.acquire().access_id == third
+
+
+def test_client_spreads_requests_across_keys(api):
+    ids     = access_ids(3)
+    client  = main.SumoClient(None, None, deployment = api.url, credential_pool = pool_of(ids))
+    for collector_id in range(9):
+        client.get_collector_by_id(collector_id)
+    assert collections.Counter(access_id_of(headers) for _, _, headers, _ in api.received) == {access_id: 3 for access_id in ids}
+    assert client.rate_limiter is False
+    client.close()
+
+
+def test_unauthorized_request_is_sent_again_with_another_key(api):
+    revoked, valid = ids = access_ids(2)
+    api.respond = lambda path: (401 if access_id_of(api.received[-1][2]) == revoked else 200, b'{}', 0)
+    client      = main.SumoClient(None, None, deployment = api.url, credential_pool = pool_of(ids), retry_policy = False)
+    assert client.get_collector_by_id(1).status_code == 200
+    assert [access_id_of(headers) for _, _, headers, _ in api.received] == [revoked, valid]
+    assert client.credential_pool.stats[revoked]['quarantines'] == 1
+    client.close()
+
+
+def test_unauthorized_response_is_returned_once_every_key_is_revoked(api):
+    ids         = access_ids(2)
+    api.respond = lambda path: (401, b'{}', 0)
+    client      = main.SumoClient(None, None, deployment = api.url, credential_pool = pool_of(ids), retry_policy = False)
+    assert client.get_collector_by_id(1).status_code == 401
+    assert sorted(access_id_of(headers) for _, _, headers, _ in api.received) == sorted(ids)
+    client.close()
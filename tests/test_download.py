@@ -0,0 +1,91 @@
+import asyncio
+import bz2
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import stat
+
+import pytest
+import requests
+
+import main
+
+BODY = b'{"data": [' + b', '.join(b'{"id": %d}' % index for index in range(5000)) + b']}'
+
+
+@pytest.fixture
+def client(api):
+    api.respond = lambda path: (200, BODY, 0)
+    limiter     = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 4)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = limiter, retry_policy = False)
+    yield client
+    client.close()
+
+
+@pytest.mark.parametrize('compression, decompress', [(None, bytes), ('gzip', gzip.decompress), ('bz2', bz2.decompress), ('xz', lzma.decompress)])
+def test_body_is_written_to_the_path(client, tmp_path, compression, decompress):
+    destination = tmp_path / 'out' / 'export.json'
+    stats       = client.download(client.get_global_folder_result('job1', stream = True), str(destination), compression = compression, chunk_size = 1000)
+    written     = destination.read_bytes()
+    assert decompress(written) == BODY
+    assert stats == {'path': str(destination), 'bytes': len(BODY), 'sha256': hashlib.sha256(BODY).hexdigest(), 'written_bytes': len(written)}
+    assert os.listdir(str(tmp_path / 'out')) == ['export.json']
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_body_is_written_to_a_file_object(client):
+    destination = io.BytesIO()
+    stats       = client.download(client.get_global_folder_result('job1', stream = True), destination)
+    assert destination.getvalue() == BODY
+    assert stats['path'] is None
+
+
+def test_failed_download_leaves_the_destination_untouched(api, client, tmp_path):
+    api.respond = lambda path: (500, b'{"error": true}', 0)
+    destination = tmp_path / 'export.json'
+    destination.write_bytes(b'previous')
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.download(client.get_global_folder_result('job1', stream = True), str(destination))
+    assert destination.read_bytes() == b'previous'
+    assert os.listdir(str(tmp_path)) == ['export.json']
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_invalid_compression_closes_the_response(client, tmp_path):
+    response = client.get_global_folder_result('job1', stream = True)
+    with pytest.raises(ValueError):
+        client.download(response, str(tmp_path / 'export.json'), compression = 'zip')
+    assert client.rate_limiter.in_flight == 0
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_new_files_follow_the_umask_and_replaced_files_keep_their_mode(client, tmp_path):
+    umask = os.umask(0o027)
+    try:
+        created = tmp_path / 'created.json'
+        client.download(client.get_global_folder_result('job1', stream = True), str(created))
+        assert stat.S_IMODE(os.stat(str(created)).st_mode) == 0o640
+
+        replaced = tmp_path / 'replaced.json'
+        replaced.write_bytes(b'')
+        os.chmod(str(replaced), 0o604)
+        client.download(client.get_global_folder_result('job1', stream = True), str(replaced))
+        assert stat.S_IMODE(os.stat(str(replaced)).st_mode) == 0o604
+    finally:
+        os.umask(umask)
+
+
+def test_async_download(api, tmp_path):
+    pytest.importorskip('aiohttp')
+    api.respond = lambda path: (200, BODY, 0)
+    destination = tmp_path / 'export.json.gz'
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            return await client.download(client.get_global_folder_result('job1', stream = True), str(destination), compression = 'gzip')
+
+    stats = asyncio.run(scenario())
+    assert gzip.decompress(destination.read_bytes()) == BODY
+    assert stats['bytes'] == len(BODY)
@@ -0,0 +1,96 @@
+import concurrent.futures
+import json
+import threading
+import time
+import uuid
+
+import main
+
+
+def test_deployments_map_to_endpoints():
+    assert main._deployment_endpoint('us1') == 'https://api.sumologic.com/api'
+    assert main._deployment_endpoint('AU') == 'https://api.au.sumologic.com/api'
+    assert main._deployment_endpoint('https://api.us2.sumologic.com/api/') == 'https://api.us2.sumologic.com/api'
+
+
+def test_only_successful_probes_say_where_the_account_lives():
+    assert main._probed_endpoint('https://api.au.sumologic.com/api/', 401, True) == 'https://api.au.sumologic.com/api'
+    assert main._probed_endpoint('https://api.sumologic.com/api', 200, False) == 'https://api.sumologic.com/api'
+    assert main._probed_endpoint('https://api.sumologic.com/api', 401, False) is None
+    assert main._probed_endpoint('https://api.sumologic.com/api', 503, False) is None
+
+
+def test_concurrent_resolutions_share_one_fetch():
+    resolver    = main._SumoEndpointResolver()
+    fetches     = []
+    release     = threading.Event()
+
+    def fetch():
+        fetches.append(1)
+        release.wait(5)
+        return 'https://api.au.sumologic.com/api/'
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        results = [executor.submit(resolver.resolve, 'id', fetch, None, 60) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        assert {result.result() for result in results} == {'https://api.au.sumologic.com/api'}
+    assert len(fetches) == 1
+
+
+def test_failed_probe_is_not_remembered():
+    resolver = main._SumoEndpointResolver()
+    assert resolver.resolve('id', lambda: None, None, 60) == main._DEFAULT_API_ENDPOINT
+    assert resolver.cached('id', None, 60) is None
+    assert resolver.resolve('id', lambda: 'https://api.us2.sumologic.com/api', None, 60) == 'https://api.us2.sumologic.com/api'
+
+
+def test_disk_cache_is_shared_between_processes(tmp_path):
+    cache_path = str(tmp_path / 'cache' / 'endpoints.json')
+    main._SumoEndpointResolver().store('id', 'https://api.au.sumologic.com/api', cache_path)
+
+    # A new resolver stands in for a new process.
+    fetched = []
+    assert main._SumoEndpointResolver().resolve('id', lambda: fetched.append(1), cache_path, 60) == 'https://api.au.sumologic.com/api'
+    assert fetched == []
+
+
+def test_disk_cache_entries_expire(tmp_path):
+    cache_path = tmp_path / 'endpoints.json'
+    cache_path.write_text(json.dumps({'id': {'endpoint': 'https://api.au.sumologic.com/api', 'resolved_at': time.time() - 120}}))
+    assert main._SumoEndpointResolver().cached('id', str(cache_path), 60) is None
+    assert main._SumoEndpointResolver().cached('id', str(cache_path), 600) == 'https://api.au.sumologic.com/api'
+
+
+def test_corrupt_disk_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / 'endpoints.json'
+    cache_path.write_text('{not json')
+    resolver = main._SumoEndpointResolver()
+    assert resolver.cached('id', str(cache_path), 60) is None
+    resolver.store('id', 'https://api.au.sumologic.com/api', str(cache_path))
+    assert json.loads(cache_path.read_text())['id']['endpoint'] == 'https://api.au.sumologic.com/api'
+
+
+def test_client_resolves_lazily_and_once(api, monkeypatch):
+    monkeypatch.setattr(main, '_DEFAULT_API_ENDPOINT', api.url)
+    access_id   = str(uuid.uuid4())
+    client      = main.SumoClient(access_id, 'key', rate_limiter = False)
+    assert api.requests == []
+    client.get_collector_by_id(1)
+    client.get_collector_by_id(2)
+    other       = main.SumoClient(access_id, 'key', rate_limiter = False)
+    other.get_collector_by_id(3)
+    assert api.requests == ['/api', '/api/v1/collectors/1', '/api/v1/collectors/2', '/api/v1/collectors/3']
+    client.close()
+    other.close()
+
+
+def test_client_probes_again_after_a_failed_probe(api, monkeypatch):
+    monkeypatch.setattr(main, '_DEFAULT_API_ENDPOINT', api.url)
+    api.respond = lambda path: (401 if path == '/api' else 200, b'{}', 0)
+    access_id   = str(uuid.uuid4())
+    for _ in range(2):
+        client = main.SumoClient(access_id, 'key', rate_limiter = False)
+        assert client.endpoint == api.url
+        client.close()
+    assert api.requests == ['/api', '/api']
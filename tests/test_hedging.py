@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+import main
+
+URL = 'https://api.sumologic.com/api/v1/collectors/1'
+
+
+def warmed_policy(latency = 0.05, **kwargs):
+    policy = main.SumoHedgingPolicy(min_samples = 1, budget = 1.0, **kwargs)
+    policy.record(URL, latency)
+    return policy
+
+
+def slow_first(delay = 1.0):
+    # The first request is slow, and every later one answers straight away.
+    counter = itertools.count()
+    return lambda path: (200, b'{"id": 1}', delay if next(counter) == 0 else 0)
+
+
+def test_delay_follows_the_percentile_of_recent_latencies():
+    policy = main.SumoHedgingPolicy(percentile = 90, min_samples = 10, min_delay = 0, max_delay = 10)
+    assert policy.hedge_delay(URL) is None
+    for latency in range(1, 11):
+        policy.record(URL, latency / 10)
+    assert policy.hedge_delay(URL) == pytest.approx(1.0)
+    assert policy.hedge_delay('https://api.sumologic.com/api/v2/content/1') is None
+
+
+def test_budget_limits_hedges():
+    policy = main.SumoHedgingPolicy(budget = 0.5, min_samples = 1)
+    policy.hedge_delay(URL)
+    assert not policy.try_hedge()
+    policy.hedge_delay(URL)
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+
+
+def test_only_gets_are_hedged():
+    policy = main.SumoHedgingPolicy(families = ['collectors'])
+    assert policy.applies('GET', URL)
+    assert not policy.applies('PUT', URL)
+    assert not policy.applies('GET', 'https://api.sumologic.com/api/v2/content/1')
+
+
+def test_hedge_answers_a_slow_request(api):
+    api.respond = slow_first()
+    policy  = warmed_policy()
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 10)
+    client  = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = limiter, hedging = policy)
+    started = time.monotonic()
+    assert client.get_collector_by_id(1).json() == {'id': 1}
+    assert time.monotonic() - started < 0.5
+    assert policy.stats == {'requests': 1, 'hedged': 1, 'hedges_won': 1}
+    assert len(api.requests) == 2
+
+    # The losing attempt is still waiting for its response, but already gave its slot back.
+    assert limiter.in_flight == 0
+    time.sleep(1.0)
+    assert limiter.in_flight == 0
+    client.close()
+
+
+def test_job_start_gets_are_never_hedged(api):
+    policy = main.SumoHedgingPolicy()
+    assert policy.applies('GET', 'https://api.sumologic.com/api/v2/content/folders/personal')
+    assert policy.applies('GET', 'https://api.sumologic.com/api/v2/content/folders/global/job1/status')
+    for path in ('global', 'adminRecommended'):
+        assert not policy.applies('GET', 'https://api.sumologic.com/api/v2/content/folders/' + path)
+
+    api.respond = slow_first(delay = 0.3)
+    policy      = warmed_policy(latency = 0.01)
+    policy.record('https://api.sumologic.com/api/v2/content/folders', 0.01)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, hedging = policy)
+    client.get_global_folder_job()
+    assert api.requests == ['/api/v2/content/folders/global']
+    assert policy.stats['hedged'] == 0
+    client.close()
+
+
+def test_queued_request_is_not_hedged(api):
+    api.respond = lambda path: (200, b'{}', 0)
+    policy  = warmed_policy(latency = 0.01)
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 1)
+    client  = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = limiter, hedging = policy)
+
+    # Holding the only slot keeps the request queued for much longer than its hedging delay.
+    limiter.acquire()
+    threading.Timer(0.3, limiter.release).start()
+    assert client.get_collector_by_id(1).status_code == 200
+    assert policy.stats['hedged'] == 0
+    assert len(api.requests) == 1
+    client.close()
+
+
+def test_async_hedge_cancels_the_losing_attempt(api):
+    pytest.importorskip('aiohttp')
+    api.respond = slow_first()
+    policy  = warmed_policy()
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 10)
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = limiter, hedging = policy) as client:
+            response = await client.get_collector_by_id(1)
+            assert response.json() == {'id': 1}
+            # The losing attempt was cancelled rather than left running, so it already gave its slot back.
+            await asyncio.sleep(0)
+            assert limiter.in_flight == 0
+
+    started = time.monotonic()
+    asyncio.run(scenario())
+    assert time.monotonic() - started < 0.5
+    assert policy.stats == {'requests': 1, 'hedged': 1, 'hedges_won': 1}
@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+
+import pytest
+
+import main
+
+
+def global_folder_job(statuses):
+    # The job starts, reports each of statuses in turn (repeating the last), then has a result.
+    statuses = itertools.chain(statuses, itertools.repeat(statuses[-1]))
+
+    def respond(path):
+        if path.endswith('/global'):
+            return 200, b'{"id": "job1"}', 0
+        if path.endswith('/status'):
+            return 200, json.dumps({'status': next(statuses)}).encode(), 0
+        return 200, b'{"data": [{"id": "folder1"}]}', 0
+    return respond
+
+
+def test_polls_until_the_job_succeeds(api):
+    api.respond = global_folder_job(['InProgress', 'InProgress', 'Success'])
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    result      = client.run_job('global_folder', initial_interval = 0.01)
+    assert result.json() == {'data': [{'id': 'folder1'}]}
+    assert api.requests == [
+        '/api/v2/content/folders/global',
+        '/api/v2/content/folders/global/job1/status',
+        '/api/v2/content/folders/global/job1/status',
+        '/api/v2/content/folders/global/job1/status',
+        '/api/v2/content/folders/global/job1/result'
+    ]
+    client.close()
+
+
+def test_failed_job_raises(api):
+    api.respond = global_folder_job(['InProgress', 'Failed'])
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    with pytest.raises(main.SumoJobError) as raised:
+        client.wait_for_job('global_folder', 'job1', initial_interval = 0.01)
+    assert (raised.value.job_type, raised.value.job_id, raised.value.status) == ('global_folder', 'job1', {'status': 'Failed'})
+    client.close()
+
+
+def test_intervals_back_off_up_to_the_maximum():
+    poll = main._JobPoll('global_folder', 'job1', None, None, initial_interval = 1, max_interval = 3)
+    assert [poll.next_wait() for _ in range(5)] == [1, 1.5, 2.25, 3, 3]
+
+
+def test_numeric_upgrade_statuses():
+    job = main._JOB_TYPES['collector_upgrade']
+    assert job.state({'upgrade': {'status': 1}}) == (1, None)
+    assert job.state({'upgrade': {'status': 2}}) == (2, True)
+    assert job.state({'upgrade': {'status': 3}}) == (3, False)
+
+
+def test_wait_times_out(api):
+    api.respond = global_folder_job(['InProgress'])
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    started     = time.monotonic()
+    with pytest.raises(main.SumoJobTimeout):
+        client.wait_for_job('global_folder', 'job1', timeout = 0.3, initial_interval = 0.05, max_interval = 0.05)
+    assert time.monotonic() - started < 1
+    client.close()
+
+
+def test_cancel_event_stops_the_wait_at_once(api):
+    api.respond = global_folder_job(['InProgress'])
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    cancel      = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    started     = time.monotonic()
+    with pytest.raises(main.SumoJobCancelled):
+        client.wait_for_job('global_folder', 'job1', cancel_event = cancel, initial_interval = 10)
+    assert time.monotonic() - started < 1
+    assert api.requests == []
+    client.close()
+
+
+def test_sync_client_refuses_an_asyncio_event():
+    client = main.SumoClient('id', 'key', deployment = 'us2', rate_limiter = False)
+    with pytest.raises(TypeError):
+        client.wait_for_job('global_folder', 'job1', cancel_event = asyncio.Event())
+    with pytest.raises(ValueError):
+        client.wait_for_job('report', 'job1')
+    client.close()
+
+
+@pytest.mark.parametrize('event_type', [threading.Event, asyncio.Event])
+def test_async_poller_is_cancelled_by_either_event(api, event_type):
+    pytest.importorskip('aiohttp')
+    api.respond = global_folder_job(['InProgress'])
+
+    async def scenario():
+        cancel = event_type()
+        asyncio.get_running_loop().call_later(0.1, cancel.set)
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            with pytest.raises(main.SumoJobCancelled):
+                await client.wait_for_job('global_folder', 'job1', cancel_event = cancel, initial_interval = 10)
+
+    started = time.monotonic()
+    asyncio.run(scenario())
+    assert time.monotonic() - started < 1
+
+
+def test_async_run_job(api):
+    pytest.importorskip('aiohttp')
+    api.respond = global_folder_job(['InProgress', 'Success'])
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            return await client.run_job('global_folder', initial_interval = 0.01)
+
+    assert asyncio.run(scenario()).json() == {'data': [{'id': 'folder1'}]}
@@ -0,0 +1,159 @@
+import json
+import re
+import urllib.parse
+
+import pytest
+
+import main
+
+
+class Account:
+    """The Collectors, Sources and folders of a fake account, served through the fake API."""
+    def __init__(self, api):
+        self.collectors     = {}
+        self.sources        = {}
+        self.folders        = {}
+        self.failing        = set()
+        api.respond         = self.respond
+
+    def add_collector(self, collector_id, name, sources, **fields):
+        self.collectors[collector_id]   = dict({'id': collector_id, 'name': name, 'collectorType': 'Hosted', 'alive': True}, **fields)
+        self.sources[collector_id]      = [{'id': collector_id * 100 + index, 'name': source, 'sourceType': 'HTTP'} for index, source in enumerate(sources)]
+
+    def respond(self, path):
+        parsed  = urllib.parse.urlparse(path)
+        params  = dict(urllib.parse.parse_qsl(parsed.query))
+        match   = re.fullmatch(r'/api/v1/collectors/(\d+)/sources', parsed.path)
+        if match:
+            collector_id = int(match.group(1))
+            if collector_id in self.failing:
+                return 500, b'{}', 0
+            return 200, json.dumps({'sources': self.sources[collector_id]}).encode(), 0
+        if parsed.path == '/api/v1/collectors':
+            offset, limit = int(params.get('offset', 0)), int(params.get('limit', 1000))
+            return 200, json.dumps({'collectors': list(self.collectors.values())[offset:offset + limit]}).encode(), 0
+        match = re.fullmatch(r'/api/v2/content/folders/(\w+)', parsed.path)
+        if match and match.group(1) in self.folders:
+            return 200, json.dumps(self.folders[match.group(1)]).encode(), 0
+        return 404, b'{}', 0
+
+
+@pytest.fixture
+def account(api):
+    return Account(api)
+
+
+@pytest.fixture
+def mirror(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, retry_policy = False)
+    mirror = main.SumoMirror(client, ':memory:')
+    yield mirror
+    mirror.close()
+    client.close()
+
+
+def source_fetches(api):
+    return [path for path in api.requests if path.endswith('/sources')]
+
+
+def test_first_refresh_mirrors_everything(api, account, mirror):
+    account.add_collector(1, 'web', ['access', 'error'])
+    account.add_collector(2, 'db', ['slow'], collectorType = 'Installable')
+    stats = mirror.refresh_collectors()
+    assert {key: stats[key] for key in ('collectors', 'changed', 'removed', 'sources_fetched', 'errors')} == {
+        'collectors': 2, 'changed': 2, 'removed': 0, 'sources_fetched': 2, 'errors': 0
+    }
+    assert [collector['name'] for collector in mirror.collectors(collector_type = 'Installable')] == ['db']
+    assert [source['name'] for source in mirror.sources(collector_id = 1)] == ['access', 'error']
+    assert mirror.collector(2)['collectorType'] == 'Installable'
+    assert mirror.collector(3) is None
+
+
+def test_only_changed_collectors_are_fetched_again(api, account, mirror):
+    account.add_collector(1, 'web', ['access'])
+    account.add_collector(2, 'db', ['slow'])
+    mirror.refresh_collectors()
+    api.requests.clear()
+
+    # A change to liveness alone is stored, but does not mean the Sources changed.
+    account.collectors[1]['alive'] = False
+    account.add_collector(2, 'db', ['slow', 'audit'], description = 'primary')
+    stats = mirror.refresh_collectors()
+    assert (stats['changed'], stats['sources_fetched']) == (1, 1)
+    assert source_fetches(api) == ['/api/v1/collectors/2/sources']
+    assert mirror.collector(1)['alive'] is False
+    assert [source['name'] for source in mirror.sources(collector_id = 2)] == ['slow', 'audit']
+
+
+def test_removed_collectors_lose_their_sources(account, mirror):
+    account.add_collector(1, 'web', ['access'])
+    account.add_collector(2, 'db', ['slow'])
+    mirror.refresh_collectors()
+    del account.collectors[2]
+    assert mirror.refresh_collectors()['removed'] == 1
+    assert mirror.collector(2) is None
+    assert mirror.sources(collector_id = 2) == []
+
+
+def test_failed_source_fetch_is_retried_next_refresh(api, account, mirror):
+    account.add_collector(1, 'web', ['access'])
+    mirror.refresh_collectors()
+    account.add_collector(1, 'web', ['access', 'error'], description = 'changed')
+    account.failing.add(1)
+    assert mirror.refresh_collectors()['errors'] == 1
+
+    account.failing.clear()
+    api.requests.clear()
+    stats = mirror.refresh_collectors()
+    assert (stats['changed'], stats['sources_fetched'], stats['errors']) == (0, 1, 0)
+    assert [source['name'] for source in mirror.sources(collector_id = 1)] == ['access', 'error']
+
+
+def test_sources_are_written_in_batches(account, mirror, monkeypatch):
+    monkeypatch.setattr(main, '_MIRROR_WRITE_BATCH', 2)
+    for collector_id in range(1, 6):
+        account.add_collector(collector_id, 'collector{0}'.format(collector_id), ['source'])
+    account.failing.add(3)
+    stats = mirror.refresh_collectors(concurrency = 2)
+    assert (stats['sources_fetched'], stats['errors']) == (4, 1)
+    assert sorted(source['id'] for source in mirror.sources()) == [100, 200, 400, 500]
+
+
+def test_stale_sources_are_fetched_again(api, account, mirror):
+    account.add_collector(1, 'web', ['access'])
+    mirror.refresh_collectors()
+    api.requests.clear()
+    assert mirror.refresh_collectors()['sources_fetched'] == 0
+    assert mirror.refresh_collectors(max_age = 0)['sources_fetched'] == 1
+
+
+def test_content_folders_are_mirrored_and_pruned(account, mirror):
+    account.folders['personal'] = {'id': 'personal', 'name': 'Personal', 'itemType': 'Folder', 'children': [
+        {'id': 'reports', 'name': 'Reports', 'itemType': 'Folder'},
+        {'id': 'search', 'name': 'Errors', 'itemType': 'Search'}
+    ]}
+    account.folders['reports'] = {'id': 'reports', 'name': 'Reports', 'itemType': 'Folder', 'children': [
+        {'id': 'weekly', 'name': 'Weekly', 'itemType': 'Dashboard'}
+    ]}
+    stats = mirror.refresh_content()
+    assert (stats['fetched'], stats['errors']) == (2, 0)
+    assert [item['name'] for item in mirror.content(parent_id = 'reports')] == ['Weekly']
+
+    # Folders fetched recently are kept as they are.
+    assert mirror.refresh_content()['fresh'] == 1
+
+    account.folders['personal']['children'].pop(0)
+    stats = mirror.refresh_content(max_age = 0)
+    assert stats['removed'] == 2
+    assert mirror.content(parent_id = 'reports') == []
+
+
+def test_chunks():
+    assert main._chunks(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+    assert main._chunks([], 2) == []
+
+
+def test_mirror_needs_a_blocking_client():
+    pytest.importorskip('aiohttp')
+    with pytest.raises(TypeError):
+        main.SumoMirror(main.AsyncSumoClient('id', 'key', deployment = 'us2', rate_limiter = False), ':memory:')
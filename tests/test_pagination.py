@@ -0,0 +1,132 @@
+import asyncio
+import json
+import urllib.parse
+
+import pytest
+import requests
+
+import main
+
+
+def query(path):
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlparse(path).query))
+
+
+def token_pages(pages):
+    # pages maps each token (None for the first page) to (items, next token).
+    def respond(path):
+        items, token = pages[query(path).get('token')]
+        return 200, json.dumps({'data': items, 'next': token}).encode(), 0
+    return respond
+
+
+PAGES = {
+    None: ([1, 2], 'second'),
+    'second': ([3, 4], 'third'),
+    'third': ([5], None)
+}
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_token_pages_are_followed_to_the_end(api, prefetch):
+    api.respond = token_pages(PAGES)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    assert list(client.iter_health_events({'limit': 2}, prefetch = prefetch)) == [1, 2, 3, 4, 5]
+    assert [query(path).get('token') for path in api.requests] == [None, 'second', 'third']
+    assert all(query(path)['limit'] == '2' for path in api.requests)
+    client.close()
+
+
+def test_pages_are_only_requested_as_they_are_consumed(api):
+    api.respond = token_pages(PAGES)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    items       = client.iter_health_events()
+    assert next(items) == 1
+    assert len(api.requests) == 1
+    items.close()
+    client.close()
+
+
+def test_failed_page_raises(api):
+    api.respond = lambda path: (200, b'{"data": [1], "next": "second"}', 0) if 'token' not in path else (500, b'{}', 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, retry_policy = False)
+    items       = client.iter_health_events()
+    assert next(items) == 1
+    with pytest.raises(requests.exceptions.HTTPError):
+        next(items)
+    client.close()
+
+
+def test_async_token_pages(api):
+    pytest.importorskip('aiohttp')
+    api.respond = token_pages(PAGES)
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            return [item async for item in client.iter_health_events(prefetch = True)]
+
+    assert asyncio.run(scenario()) == [1, 2, 3, 4, 5]
+
+
+def collector_listing(total, delays = {}):
+    def respond(path):
+        params      = query(path)
+        offset      = int(params.get('offset', 0))
+        limit       = int(params.get('limit', 1000))
+        collectors  = [{'id': index} for index in range(offset, min(offset + limit, total))]
+        return 200, json.dumps({'collectors': collectors}).encode(), delays.get(offset, 0)
+    return respond
+
+
+@pytest.mark.parametrize('total', [23, 20, 0])
+def test_offset_pages_are_yielded_in_order(api, total):
+    # Earlier pages answering last must not change the order of the items.
+    api.respond = collector_listing(total, {0: 0.2, 5: 0.1})
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    collectors  = list(client.iter_collectors(page_size = 5, concurrency = 3))
+    assert [collector['id'] for collector in collectors] == list(range(total))
+
+    # Requests stop once a short page is seen, so at most concurrency pages are requested past the end.
+    offsets = sorted(int(query(path)['offset']) for path in api.requests)
+    assert offsets == list(range(0, len(offsets) * 5, 5))
+    assert total // 5 * 5 in offsets
+    assert len(offsets) <= total // 5 + 3
+    client.close()
+
+
+def test_unordered_offset_pages_yield_every_item(api):
+    api.respond = collector_listing(23, {0: 0.2})
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    collectors  = [collector['id'] for collector in client.iter_collectors(page_size = 5, concurrency = 3, ordered = False)]
+    assert sorted(collectors) == list(range(23))
+    assert collectors[:5] != list(range(5))
+    client.close()
+
+
+def test_pager_ignores_pages_past_the_end():
+    pager = main._OffsetPager(page_size = 2, concurrency = 3, ordered = True)
+    assert pager.offsets_to_fetch() == [0, 2, 4]
+    assert pager.page_fetched(4, []) == []
+    assert pager.page_fetched(2, ['c']) == []
+    assert pager.offsets_to_fetch() == []
+    assert pager.page_fetched(0, ['a', 'b']) == [['a', 'b'], ['c']]
+
+
+def test_pager_rejects_invalid_sizes():
+    with pytest.raises(ValueError):
+        main._OffsetPager(page_size = 0, concurrency = 1, ordered = True)
+    client = main.SumoClient('id', 'key', deployment = 'us2', rate_limiter = False)
+    with pytest.raises(ValueError):
+        next(client.iter_collectors(concurrency = 0))
+    client.close()
+
+
+def test_async_offset_pages(api):
+    pytest.importorskip('aiohttp')
+    api.respond = collector_listing(12, {0: 0.1})
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = False) as client:
+            return [collector['id'] async for collector in client.iter_collectors(page_size = 5, concurrency = 2)]
+
+    assert asyncio.run(scenario()) == list(range(12))
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import main
+
+
+def test_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        main.SumoRateLimiter(requests_per_second = 0)
+    with pytest.raises(ValueError):
+        main.SumoRateLimiter(burst = 0)
+
+
+def test_concurrency_cap_admits_waiters_in_order():
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 2)
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.in_flight == 2
+
+    admitted = []
+
+    def wait(name):
+        limiter.acquire()
+        admitted.append(name)
+
+    first = threading.Thread(target = wait, args = ('first',))
+    first.start()
+    time.sleep(0.05)
+    second = threading.Thread(target = wait, args = ('second',))
+    second.start()
+    time.sleep(0.05)
+    assert admitted == []
+
+    # A released slot is handed straight to the longest waiting request, so in_flight never drops below the cap.
+    limiter.release()
+    first.join(1)
+    assert admitted == ['first']
+    assert limiter.in_flight == 2
+
+    limiter.release()
+    second.join(1)
+    assert admitted == ['first', 'second']
+
+    limiter.release()
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+def test_requests_are_spaced_at_the_configured_rate():
+    limiter = main.SumoRateLimiter(requests_per_second = 20, burst = 1, max_concurrent = None)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release()
+    # The first request goes straight away, and each of the other four waits 1/20th of a second.
+    assert time.monotonic() - started >= 0.18
+
+
+def test_burst_is_sent_without_waiting():
+    limiter = main.SumoRateLimiter(requests_per_second = 1, burst = 3, max_concurrent = None)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release()
+    assert time.monotonic() - started < 0.1
+
+
+def test_cancelled_async_waiter_passes_its_slot_on():
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 1)
+
+    async def scenario():
+        await limiter.acquire_async()
+        cancelled   = asyncio.ensure_future(limiter.acquire_async())
+        waiting     = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        assert limiter.in_flight == 1
+        limiter.release()
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
+
+
+def test_shared_limiter_is_per_access_id():
+    assert main.SumoRateLimiter.shared('test-a') is main.SumoRateLimiter.shared('test-a')
+    assert main.SumoRateLimiter.shared('test-a') is not main.SumoRateLimiter.shared('test-b')
+    configured = main.SumoRateLimiter.configure('test-a', requests_per_second = 2)
+    assert main.SumoRateLimiter.shared('test-a') is configured
+
+
+def test_streamed_body_holds_its_slot_until_closed(api):
+    api.respond = lambda path: (200, b'{"data": [1, 2, 3]}', 0)
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 2)
+    client  = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = limiter)
+
+    closed = client.get_global_folder_result('job', stream = True)
+    read   = client.get_global_folder_result('job', stream = True)
+    assert limiter.in_flight == 2
+    closed.close()
+    assert limiter.in_flight == 1
+    assert read.json() == {'data': [1, 2, 3]}
+    assert limiter.in_flight == 0
+
+    # Closing a response whose body was already read does not release its slots a second time.
+    read.close()
+    assert limiter.in_flight == 0
+    assert list(client.iter_global_folder_result('job')) == [1, 2, 3]
+    assert limiter.in_flight == 0
+    client.close()
+
+
+def test_async_streamed_body_holds_its_slot_until_read(api):
+    pytest.importorskip('aiohttp')
+    api.respond = lambda path: (200, b'{"data": [1, 2, 3]}', 0)
+    limiter = main.SumoRateLimiter(requests_per_second = 1000, burst = 10, max_concurrent = 2)
+
+    async def scenario():
+        async with main.AsyncSumoClient('id', 'key', deployment = api.url, rate_limiter = limiter) as client:
+            response = await client.get_global_folder_result('job', stream = True)
+            assert limiter.in_flight == 1
+            body = b''.join([chunk async for chunk in response.iter_content()])
+            assert body == b'{"data": [1, 2, 3]}'
+            assert limiter.in_flight == 0
+            response.close()
+            assert limiter.in_flight == 0
+            assert [item async for item in client.iter_global_folder_result('job')] == [1, 2, 3]
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
@@ -0,0 +1,55 @@
+import email.utils
+import itertools
+import time
+
+import main
+
+
+def test_should_retry_only_idempotent_requests_and_retryable_statuses():
+    policy = main.SumoRetryPolicy(max_retries = 2)
+    assert policy.should_retry('GET', 0, 503)
+    assert policy.should_retry('GET', 1, None)
+    assert not policy.should_retry('GET', 2, 503)
+    assert not policy.should_retry('GET', 0, 404)
+    assert not policy.should_retry('POST', 0, 503)
+
+
+def test_delays_stay_within_bounds():
+    policy  = main.SumoRetryPolicy(base_delay = 0.5, max_delay = 4.0)
+    delay   = 0
+    for _ in range(50):
+        delay = policy.next_delay(delay)
+        assert 0.5 <= delay <= 4.0
+
+
+def test_retry_after_is_the_minimum_wait():
+    policy = main.SumoRetryPolicy(base_delay = 0.1, max_delay = 1.0)
+    assert policy.next_delay(0, {'Retry-After': '7'}) == 7.0
+    retry_at = email.utils.formatdate(time.time() + 60, usegmt = True)
+    assert 55 <= policy.next_delay(0, {'Retry-After': retry_at}) <= 60
+    assert policy.next_delay(0, {'Retry-After': 'soon'}) <= 1.0
+
+
+def test_api_family():
+    assert main._api_family('https://api.sumologic.com/api/v1/collectors/123') == 'collectors'
+    assert main._api_family('https://api.sumologic.com/api/v2/content/folders/1') == 'content'
+    assert main._api_family('https://api.sumologic.com/api') is None
+
+
+def test_client_retries_unavailable_responses(api):
+    statuses    = itertools.chain([503, 502], itertools.repeat(200))
+    api.respond = lambda path: (next(statuses), b'{}', 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, retry_policy = main.SumoRetryPolicy(base_delay = 0.01, max_delay = 0.02))
+    response    = client.get_collector_by_id(1)
+    assert response.status_code == 200
+    assert response.retries == 2
+    assert client.retry_stats == {'collectors': 2}
+    client.close()
+
+
+def test_family_policy_can_disable_retries(api):
+    api.respond = lambda path: (503, b'{}', 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, family_retry_policies = {'collectors': False})
+    assert client.get_collector_by_id(1).status_code == 503
+    assert len(api.requests) == 1
+    client.close()
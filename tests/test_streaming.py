@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import main
+
+DOCUMENT = {
+    'skipped': {'text': 'a "quoted" ] } [ { string', 'list': [1, [2, {'data': 'not this one'}]]},
+    'outer': {
+        'before': None,
+        'data': [{'id': 1, 'name': 'café ☃'}, [1, 2], 'text', 3.5, None, {'nested': {'data': [1]}}],
+        'after': True
+    }
+}
+
+
+def parse(document, path, chunk_size):
+    body    = json.dumps(document, ensure_ascii = False).encode('utf-8')
+    stream  = main._JSONItemStream(path)
+    items   = []
+    for offset in range(0, len(body), chunk_size):
+        items.extend(stream.feed(body[offset:offset + chunk_size]))
+    items.extend(stream.feed(b'', final = True))
+    return items
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 65536])
+def test_items_match_a_full_parse_whatever_the_chunking(chunk_size):
+    assert parse(DOCUMENT, ('outer', 'data'), chunk_size) == DOCUMENT['outer']['data']
+
+
+def test_empty_path_streams_a_top_level_array():
+    assert parse([{'id': 1}, {'id': 2}], (), 3) == [{'id': 1}, {'id': 2}]
+    assert parse([], (), 1) == []
+
+
+def test_items_are_returned_as_soon_as_they_complete():
+    stream = main._JSONItemStream(('data',))
+    assert stream.feed(b'{"data": [{"id": 1}, {"id"') == [{'id': 1}]
+    assert stream.feed(b': 2}]}') == [{'id': 2}]
+
+
+def test_missing_path_raises():
+    with pytest.raises(ValueError):
+        parse({'other': []}, ('data',), 4)
+    with pytest.raises(ValueError):
+        parse([1, 2], ('data',), 4)
+
+
+def test_incomplete_document_raises():
+    stream = main._JSONItemStream(('data',))
+    stream.feed(b'{"data": [1, 2')
+    with pytest.raises(ValueError):
+        stream.feed(b'', final = True)
+
+
+def test_client_streams_folder_results(api):
+    api.respond = lambda path: (200, json.dumps({'data': [{'id': index} for index in range(1000)]}).encode(), 0)
+    client      = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False)
+    assert [item['id'] for item in client.iter_global_folder_result('job1')] == list(range(1000))
+    assert client.transfer_stats['response_bytes'] > 0
+    client.close()
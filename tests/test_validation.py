@@ -0,0 +1,97 @@
+import collections
+
+import jsonschema
+import pytest
+
+import main
+
+PAYLOADS = [
+    ('source', {'sourceType': 'HTTP', 'name': 'x', 'filters': []}),
+    ('source', {'sourceType': 'HTTP', 'name': 'x', 'filters': ('a',)}),
+    ('source', {'sourceType': 'HTTP', 'name': 7}),
+    ('source', {'sourceType': 'Unknown', 'name': 'x'}),
+    ('source', collections.OrderedDict([('sourceType', 'HTTP'), ('name', 'x')])),
+    ('source', ['not', 'an', 'object']),
+    ('collector_list_params', {'limit': 10, 'offset': 0}),
+    ('collector_list_params', {'limit': 10.0}),
+    ('collector_list_params', {'limit': True}),
+    ('collector_list_params', {'aliveBeforeDays': 0}),
+    ('pagination_params', {'limit': 100, 'token': 'abc'}),
+    ('pagination_params', {'limit': '100'}),
+]
+
+
+def outcome(validate, schema_name, instance):
+    try:
+        validate(schema_name, instance)
+    except jsonschema.exceptions.ValidationError as error:
+        return error.message
+    return None
+
+
+@pytest.mark.parametrize('schema_name, instance', PAYLOADS)
+def test_registry_raises_what_jsonschema_raises(schema_name, instance):
+    expected = outcome(lambda name, value: jsonschema.validate(value, main._SCHEMAS[name]), schema_name, instance)
+    assert outcome(main._validate_json, schema_name, instance) == expected
+
+
+def test_tuples_are_not_taken_for_arrays():
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        main._validate_json('source', {'sourceType': 'HTTP', 'name': 'x', 'filters': ('a',)})
+
+
+def test_every_schema_compiles():
+    for schema_name in main._SCHEMAS:
+        main._SchemaValidator(main._SCHEMAS[schema_name])
+
+
+def test_strict_validates_every_payload():
+    policy = main.SumoValidationPolicy('strict')
+    policy.validate('pagination_params', {'limit': 1})
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        policy.validate('pagination_params', {'limit': '1'})
+    assert (policy.stats['validated'], policy.stats['skipped']) == (2, 0)
+
+
+def test_off_skips_every_payload():
+    policy = main.SumoValidationPolicy('off')
+    policy.validate('pagination_params', {'limit': '1'})
+    assert (policy.stats['validated'], policy.stats['skipped']) == (0, 1)
+
+
+def test_first_n_validates_each_shape_n_times():
+    policy = main.SumoValidationPolicy('first-n', first_n = 2)
+    for limit in range(1, 4):
+        policy.validate('pagination_params', {'limit': limit})
+    assert (policy.stats['validated'], policy.stats['skipped']) == (2, 1)
+
+    # A payload of another shape is validated even though the first shape has used up its checks.
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        policy.validate('pagination_params', {'limit': '1'})
+    assert policy.stats['estimated_seconds_skipped'] > 0
+
+
+def test_sampled_validates_a_fraction(monkeypatch):
+    samples = iter([0.05, 0.5, 0.01])
+    monkeypatch.setattr(main.random, 'random', lambda: next(samples))
+    policy = main.SumoValidationPolicy('sampled', sample_rate = 0.1)
+    for _ in range(3):
+        policy.validate('pagination_params', {'limit': 1})
+    assert (policy.stats['validated'], policy.stats['skipped']) == (2, 1)
+
+
+def test_modes_are_checked():
+    with pytest.raises(ValueError):
+        main.SumoValidationPolicy('lenient')
+    with pytest.raises(ValueError):
+        main.SumoValidationPolicy().validate('pagination_params', {}, mode = 'lenient')
+
+
+def test_a_call_can_override_the_client_mode(api):
+    client = main.SumoClient('id', 'key', deployment = api.url, rate_limiter = False, validation = 'off')
+    assert client.list_collectors({'limit': 'ten'}).status_code == 200
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        client.list_collectors({'limit': 'ten'}, validation = 'strict')
+    assert len(api.requests) == 1
+    assert client.validation_policy.stats['skipped'] == 1
+    client.close()